@@ -1,6 +1,6 @@
 // src/hooks/use-interview.ts - 面试状态管理Hook
 import { useState, useEffect, useCallback, useRef } from 'react';
-import { api, InterviewStatus, AttentionHistoryResponse, AttentionAnalysisResponse, AttentionAnalysis } from '@/services/api';
+import { api, InterviewStatus, AttentionHistoryResponse, AttentionAnalysisResponse, AttentionAnalysis, QuestionEvent } from '@/services/api';
 
 interface UseInterviewReturn {
   isRunning: boolean;
@@ -9,6 +9,7 @@ interface UseInterviewReturn {
   attentionHistory: AttentionHistoryResponse['data'] | null;
   attentionAnalysis: AttentionAnalysis | null;
   isRecording: boolean;
+  currentQuestion: QuestionEvent | null;
   videoSaved: boolean;
   videoUrl: string | null;
   startInterview: (position?: string) => Promise<void>;
@@ -29,19 +30,25 @@ export const useInterview = (): UseInterviewReturn => {
   const [attentionHistory, setAttentionHistory] = useState<AttentionHistoryResponse['data'] | null>(null);
   const [attentionAnalysis, setAttentionAnalysis] = useState<AttentionAnalysis | null>(null);
   const [isRecording, setIsRecording] = useState<boolean>(false);
+  const [currentQuestion, setCurrentQuestion] = useState<QuestionEvent | null>(null);
   const [videoSaved, setVideoSaved] = useState<boolean>(false);
   const [videoUrl, setVideoUrl] = useState<string | null>(null);
   const [error, setError] = useState<string | null>(null);
   const [isLoading, setIsLoading] = useState<boolean>(false);
   const intervalRef = useRef<NodeJS.Timeout | null>(null);
+  const eventSourceRef = useRef<EventSource | null>(null);
   const mountedRef = useRef<boolean>(true);
 
-  // 清理定时器
+  // 清理定时器和状态推送连接
   const clearStatusInterval = useCallback(() => {
     if (intervalRef.current) {
       clearInterval(intervalRef.current);
       intervalRef.current = null;
     }
+    if (eventSourceRef.current) {
+      eventSourceRef.current.close();
+      eventSourceRef.current = null;
+    }
   }, []);
 
   // 获取状态
@@ -100,6 +107,11 @@ export const useInterview = (): UseInterviewReturn => {
         });
       }
     } catch (err) {
+      // 会话在开始面试时才创建，之前查询状态返回404，不视为错误
+      if ((err as { response?: { status?: number } }).response?.status === 404) {
+        setStatus(null);
+        return;
+      }
       console.error('获取状态失败:', err);
       console.error('错误详情:', err instanceof Error ? err.message : '未知错误');
       setError('无法连接到服务器');
@@ -119,6 +131,44 @@ export const useInterview = (): UseInterviewReturn => {
     }
   }, [isRunning]);
 
+  // 开始接收状态更新 - 优先使用服务器推送（SSE），只接收变化的字段；不支持时回退为每秒轮询
+  const startStatusUpdates = useCallback(() => {
+    if (intervalRef.current || eventSourceRef.current) {
+      return;
+    }
+    if (typeof EventSource === 'undefined') {
+      intervalRef.current = setInterval(fetchStatus, 1000);
+      return;
+    }
+    
+    const source = new EventSource(api.getStatusStreamUrl());
+    source.addEventListener('status', (event) => {
+      const changes = JSON.parse((event as MessageEvent).data);
+      setStatus((prev) => ({
+        attention_score: 0,
+        gaze_status: '未知',
+        pose_status: '未知',
+        gesture_status: '未知',
+        face_detected: false,
+        gaze_away_count: 0,
+        pose_issue_count: 0,
+        gesture_count: 0,
+        session_time: 0,
+        feedback: '系统运行中...',
+        ...prev,
+        ...changes,
+      }));
+    });
+    source.addEventListener('question', (event) => {
+      setCurrentQuestion(JSON.parse((event as MessageEvent).data));
+    });
+    source.onerror = () => {
+      // EventSource会自动重连，这里只记录错误
+      console.error('状态推送连接中断，正在重连...');
+    };
+    eventSourceRef.current = source;
+  }, [fetchStatus]);
+
   // 开始面试
   const startInterview = useCallback(async (position?: string) => {
     setIsLoading(true);
@@ -134,18 +184,18 @@ export const useInterview = (): UseInterviewReturn => {
         setIsRunning(true);
         // 立即获取一次状态
         await fetchStatus();
-        // 然后开始定期获取状态
-        intervalRef.current = setInterval(fetchStatus, 1000);
-        console.log('面试已开始，定时器已启动');
+        // 然后通过推送流接收状态更新
+        startStatusUpdates();
+        console.log('面试已开始，状态推送已启动');
       } else {
         // API返回失败，但仍视为面试已开始（前端状态优先）
         setIsRunning(true);
         setError(response.message || '开始面试失败');
         // 立即获取一次状态
         await fetchStatus();
-        // 然后开始定期获取状态
-        intervalRef.current = setInterval(fetchStatus, 1000);
-        console.log('面试已开始(API返回失败)，定时器已启动');
+        // 然后通过推送流接收状态更新
+        startStatusUpdates();
+        console.log('面试已开始(API返回失败)，状态推送已启动');
       }
       
       // 开始视频录制
@@ -167,9 +217,9 @@ export const useInterview = (): UseInterviewReturn => {
       setError('开始面试失败，使用本地模拟模式');
       // 立即获取一次状态
       await fetchStatus();
-      // 然后开始定期获取状态
-      intervalRef.current = setInterval(fetchStatus, 1000);
-      console.log('面试已开始(API调用失败)，定时器已启动');
+      // 然后通过推送流接收状态更新
+      startStatusUpdates();
+      console.log('面试已开始(API调用失败)，状态推送已启动');
       
       // 尝试开始视频录制
       try {
@@ -184,7 +234,28 @@ export const useInterview = (): UseInterviewReturn => {
     } finally {
       setIsLoading(false);
     }
-  }, [fetchStatus]);
+  }, [fetchStatus, startStatusUpdates]);
+
+  // 跟踪视频保存任务，完成后更新视频状态
+  const trackSaveVideoJob = useCallback((jobId: string) => {
+    api.waitForSaveVideoJob(jobId)
+      .then((job) => {
+        if (!mountedRef.current) {
+          return;
+        }
+        if (job.status === 'done') {
+          setVideoSaved(true);
+          // 使用保存任务返回的完整视频文件，而不是目录中最新的文件
+          setVideoUrl(api.getSavedVideoUrl(job.result?.filename));
+          console.log('视频保存成功');
+        } else {
+          console.error('保存视频失败:', job.error);
+        }
+      })
+      .catch((err) => {
+        console.error('查询视频保存任务出错:', err);
+      });
+  }, []);
 
   // 停止面试
   const stopInterview = useCallback(async () => {
@@ -197,9 +268,9 @@ export const useInterview = (): UseInterviewReturn => {
       if (response.success) {
         // 重要修复：使用前端自己的状态管理
         setIsRunning(false);
-        // 停止定期获取状态
+        // 停止接收状态更新
         clearStatusInterval();
-        console.log('面试已停止，定时器已清除');
+        console.log('面试已停止，状态推送已关闭');
       } else {
         setError(response.message || '停止面试失败');
       }
@@ -212,12 +283,10 @@ export const useInterview = (): UseInterviewReturn => {
             setIsRecording(false);
             console.log('视频录制已停止');
             
-            // 保存视频
+            // 保存视频 - 后台任务，完成后再显示视频
             const saveResponse = await api.saveInterviewVideo();
-            if (saveResponse.success) {
-              setVideoSaved(true);
-              setVideoUrl(api.getSavedVideoUrl());
-              console.log('视频保存成功');
+            if (saveResponse.success && saveResponse.data) {
+              trackSaveVideoJob(saveResponse.data.job_id);
             } else {
               console.error('保存视频失败:', saveResponse.message);
             }
@@ -237,9 +306,10 @@ export const useInterview = (): UseInterviewReturn => {
         if (isRecording) {
           await api.stopRecording();
           setIsRecording(false);
-          await api.saveInterviewVideo();
-          setVideoSaved(true);
-          setVideoUrl(api.getSavedVideoUrl());
+          const saveResponse = await api.saveInterviewVideo();
+          if (saveResponse.success && saveResponse.data) {
+            trackSaveVideoJob(saveResponse.data.job_id);
+          }
         }
       } catch (err) {
         console.error('处理视频录制出错:', err);
@@ -247,7 +317,7 @@ export const useInterview = (): UseInterviewReturn => {
     } finally {
       setIsLoading(false);
     }
-  }, [clearStatusInterval, isRecording]);
+  }, [clearStatusInterval, isRecording, trackSaveVideoJob]);
 
   // 组件挂载时获取初始状态
   useEffect(() => {
@@ -264,8 +334,8 @@ export const useInterview = (): UseInterviewReturn => {
   const pauseInterview = useCallback(() => {
     console.log('暂停面试');
     setIsPaused(true);
-    if (intervalRef.current) {
-      console.log('停止状态获取定时器');
+    if (intervalRef.current || eventSourceRef.current) {
+      console.log('停止状态更新');
       clearStatusInterval();
     }
   }, [clearStatusInterval]);
@@ -343,6 +413,7 @@ export const useInterview = (): UseInterviewReturn => {
     setAttentionHistory(null);
     setAttentionAnalysis(null);
     setIsRecording(false);
+    setCurrentQuestion(null);
     setVideoSaved(false);
     setVideoUrl(null);
     setError(null);
@@ -357,27 +428,27 @@ export const useInterview = (): UseInterviewReturn => {
   const resumeInterview = useCallback(() => {
     console.log('恢复面试');
     setIsPaused(false);
-    if (isRunning && !intervalRef.current) {
-      console.log('启动状态获取定时器');
-      intervalRef.current = setInterval(fetchStatus, 1000);
+    if (isRunning) {
+      console.log('启动状态更新');
+      startStatusUpdates();
     }
-  }, [isRunning, fetchStatus, clearStatusInterval]);
+  }, [isRunning, startStatusUpdates]);
 
   // 当面试状态改变时，更新定时器
   useEffect(() => {
     console.log('面试状态改变:', isRunning, '，暂停状态:', isPaused);
-    if (isRunning && !isPaused && !intervalRef.current) {
-      console.log('启动定时器，每秒获取状态');
-      intervalRef.current = setInterval(fetchStatus, 1000);
-    } else if ((!isRunning || isPaused) && intervalRef.current) {
-      console.log('停止定时器');
+    if (isRunning && !isPaused) {
+      console.log('启动状态推送');
+      startStatusUpdates();
+    } else if (!isRunning || isPaused) {
+      console.log('停止状态推送');
       clearStatusInterval();
     }
     
     return () => {
       clearStatusInterval();
     };
-  }, [isRunning, isPaused, fetchStatus, clearStatusInterval]);
+  }, [isRunning, isPaused, startStatusUpdates, clearStatusInterval]);
 
   // 添加一个标志位，确保总结只获取一次
   const summaryFetchedRef = useRef(false);
@@ -430,6 +501,7 @@ export const useInterview = (): UseInterviewReturn => {
     attentionHistory,
     attentionAnalysis,
     isRecording,
+    currentQuestion,
     videoSaved,
     videoUrl,
     startInterview,
@@ -3,7 +3,7 @@ import { Button } from '@/components/ui/button';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Input } from '@/components/ui/input';
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@/components/ui/select';
-import { api } from '@/services/api';
+import { api, getSessionId } from '@/services/api';
 
 const VoiceTest: React.FC = () => {
   const [message, setMessage] = useState<string>('');
@@ -18,6 +18,7 @@ const VoiceTest: React.FC = () => {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          'X-Session-ID': getSessionId(),
         },
         body: JSON.stringify({
           question: message || '这是一个直接的语音测试，不经过任何封装',
@@ -4,6 +4,18 @@ import axios from 'axios';
 // API基础URL - 使用相对路径，通过Vite代理访问后端
 const API_BASE_URL = '';
 
+// 会话ID - 每个浏览器标签页对应一个独立的后端面试会话
+const SESSION_STORAGE_KEY = 'interview_session_id';
+
+export const getSessionId = (): string => {
+  let sessionId = sessionStorage.getItem(SESSION_STORAGE_KEY);
+  if (!sessionId) {
+    sessionId = Math.random().toString(36).slice(2) + Date.now().toString(36);
+    sessionStorage.setItem(SESSION_STORAGE_KEY, sessionId);
+  }
+  return sessionId;
+};
+
 // 创建axios实例
 const apiClient = axios.create({
   baseURL: API_BASE_URL,
@@ -17,6 +29,7 @@ const apiClient = axios.create({
 apiClient.interceptors.request.use(
   (config) => {
     // 可以在这里添加认证token等
+    config.headers['X-Session-ID'] = getSessionId();
     return config;
   },
   (error) => {
@@ -52,6 +65,35 @@ export interface InterviewStatus {
   is_running: boolean;
 }
 
+// 状态推送流中的问题事件
+export interface QuestionEvent {
+  question: string;
+  position: string;
+  time_limit: number;
+}
+
+// 注意力曲线数据点：原始数据只有各项分数；汇总数据的分数为均值，另含记录数和最小/最大值
+export interface AttentionTimelinePoint {
+  timestamp: number;
+  score: number;
+  face_score: number;
+  gaze_score: number;
+  posture_score: number;
+  gesture_score: number;
+  count?: number;
+  [key: string]: number | undefined;
+}
+
+export interface AttentionTimelineResponse {
+  success: boolean;
+  message?: string;
+  data?: {
+    resolution: string;
+    bucket_seconds: number;
+    points: AttentionTimelinePoint[];
+  };
+}
+
 // 注意力历史记录项
 export interface AttentionHistoryItem {
   timestamp: number;
@@ -147,6 +189,26 @@ export interface ApiResponse {
   message: string;
 }
 
+// 后台任务状态（如视频保存）
+export interface BackgroundJob<T = unknown> {
+  job_id: string;
+  name: string;
+  status: 'pending' | 'running' | 'done' | 'failed';
+  progress: number;
+  message: string;
+  result: T | null;
+  error: string | null;
+}
+
+// 视频保存结果
+export interface SavedVideoResult {
+  video_path: string;
+  save_dir: string;
+  filename: string;
+  segments: string[];
+  frames_written: number;
+}
+
 // 问题接口
 export interface Question {
   id: string;
@@ -188,14 +250,28 @@ export const api = {
     return apiClient.get('/api/attention/history');
   },
 
+  // 按时间范围获取注意力曲线（后端根据范围自动选择原始数据或1秒/10秒汇总）
+  getAttentionTimeline: (params: { start?: number; end?: number; last?: number; max_points?: number } = {}): Promise<AttentionTimelineResponse> => {
+    return apiClient.get('/api/attention/timeline', { params });
+  },
+
   // 获取注意力分析报告
   getAttentionAnalysis: (): Promise<AttentionAnalysisResponse> => {
     return apiClient.get('/api/attention/analysis');
   },
 
+  // 获取状态推送流（SSE）URL - 使用绝对路径，避免代理缓冲推送数据
+  getStatusStreamUrl: (minInterval?: number): string => {
+    const params = new URLSearchParams({ session_id: getSessionId() });
+    if (minInterval !== undefined) {
+      params.set('min_interval', String(minInterval));
+    }
+    return `http://127.0.0.1:5000/api/status/stream?${params.toString()}`;
+  },
+
   // 获取视频流URL - 使用绝对路径，因为视频流不能通过代理
   getVideoStreamUrl: (): string => {
-    return 'http://127.0.0.1:5000/api/video_feed';
+    return `http://127.0.0.1:5000/api/video_feed?session_id=${encodeURIComponent(getSessionId())}`;
   },
 
   // 获取快照 - 使用绝对路径，因为快照不能通过代理
@@ -204,6 +280,7 @@ export const api = {
       timeout: 10000,
       headers: {
         'Content-Type': 'application/json',
+        'X-Session-ID': getSessionId(),
       },
     });
   },
@@ -233,14 +310,42 @@ export const api = {
     return apiClient.post('/api/stop_recording');
   },
 
-  // 保存面试视频
-  saveInterviewVideo: (): Promise<ApiResponse> => {
+  // 保存面试视频 - 返回后台任务，通过 getSaveVideoJob 查询进度
+  saveInterviewVideo: (): Promise<ApiResponse & { data?: BackgroundJob<SavedVideoResult> }> => {
     return apiClient.post('/api/save_video');
   },
 
-  // 获取保存的视频URL
-  getSavedVideoUrl: (): string => {
-    return 'http://127.0.0.1:5000/api/saved_video';
+  // 查询视频保存任务
+  getSaveVideoJob: (jobId: string): Promise<ApiResponse & { data?: BackgroundJob<SavedVideoResult> }> => {
+    return apiClient.get(`/api/save_video/${jobId}`);
+  },
+
+  // 等待视频保存任务结束
+  waitForSaveVideoJob: async (
+    jobId: string,
+    onProgress?: (job: BackgroundJob<SavedVideoResult>) => void,
+    intervalMs = 500,
+  ): Promise<BackgroundJob<SavedVideoResult>> => {
+    for (;;) {
+      const response = await api.getSaveVideoJob(jobId);
+      if (!response.success || !response.data) {
+        throw new Error(response.message || '查询视频保存任务失败');
+      }
+      onProgress?.(response.data);
+      if (response.data.status === 'done' || response.data.status === 'failed') {
+        return response.data;
+      }
+      await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+  },
+
+  // 获取保存的视频URL - 传入保存任务结果中的文件名时指向该文件，否则指向最近一次保存的视频
+  getSavedVideoUrl: (filename?: string): string => {
+    const params = new URLSearchParams({ session_id: getSessionId() });
+    if (filename) {
+      params.set('filename', filename);
+    }
+    return `http://127.0.0.1:5000/api/saved_video?${params.toString()}`;
   },
 
   // 切换到下一个问题
@@ -0,0 +1,383 @@
+# src/attention_history.py - 注意力历史记录的列式环形缓冲区
+import threading
+
+import numpy as np
+
+# 注意力状态分档阈值：高度集中（85-100分）、中等集中（60-84分）、注意力分散（0-59分）
+HIGH_ATTENTION_THRESHOLD = 85
+MEDIUM_ATTENTION_THRESHOLD = 60
+
+
+class AttentionAggregates:
+    """会话级增量统计 - 每条记录到来时更新计数、总和、极值和注意力状态分布
+
+    覆盖整个会话（不受环形缓冲区容量限制），查询为O(1)，可在面试进行中实时轮询。
+    """
+
+    FIELDS = ('score', 'face_score', 'gaze_score', 'posture_score', 'gesture_score')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """清空统计"""
+        self.count = 0
+        self._sums = [0.0] * len(self.FIELDS)
+        self._mins = [float('inf')] * len(self.FIELDS)
+        self._maxs = [float('-inf')] * len(self.FIELDS)
+        self.states = {'high': 0, 'medium': 0, 'low': 0, 'face_missing': 0}
+
+    def update(self, score, face_score, gaze_score, posture_score, gesture_score):
+        """加入一条记录
+
+        Args:
+            score: 综合注意力分数
+            face_score: 面部检测得分
+            gaze_score: 视线得分
+            posture_score: 姿态得分
+            gesture_score: 手势得分
+        """
+        values = (score, face_score, gaze_score, posture_score, gesture_score)
+        self.count += 1
+        for i, value in enumerate(values):
+            self._sums[i] += value
+            if value < self._mins[i]:
+                self._mins[i] = value
+            if value > self._maxs[i]:
+                self._maxs[i] = value
+
+        if score >= HIGH_ATTENTION_THRESHOLD:
+            self.states['high'] += 1
+        elif score >= MEDIUM_ATTENTION_THRESHOLD:
+            self.states['medium'] += 1
+        else:
+            self.states['low'] += 1
+        if face_score == 0:
+            self.states['face_missing'] += 1
+
+    def summary(self):
+        """各字段的均值、最大值和最小值
+
+        Returns:
+            dict: {字段名: {'mean', 'max', 'min'}}，没有记录时返回空字典
+        """
+        if not self.count:
+            return {}
+        return {
+            name: {'mean': self._sums[i] / self.count, 'max': self._maxs[i], 'min': self._mins[i]}
+            for i, name in enumerate(self.FIELDS)
+        }
+
+    def state_counts(self):
+        """注意力状态分布（副本）"""
+        return dict(self.states)
+
+
+class RollupSeries:
+    """按固定时间粒度汇总的历史序列 - 每个时间桶保存各字段的均值、最小值和最大值
+
+    使用预分配的列式环形缓冲区，内存占用固定；当前未结束的时间桶在内存中累加，
+    跨入下一个时间桶时写入缓冲区。
+    """
+
+    def __init__(self, bucket_seconds, capacity, fields):
+        """初始化汇总序列
+
+        Args:
+            bucket_seconds: 时间桶长度（秒）
+            capacity: 最多保存的时间桶数
+            fields: 需要汇总的字段名
+        """
+        self.bucket_seconds = bucket_seconds
+        self.capacity = capacity
+        self.fields = tuple(fields)
+        # 列布局：时间桶起点、记录数，然后每个字段依次为均值、最小值、最大值
+        self.columns = ('timestamp', 'count') + tuple(
+            f"{name}{suffix}" for name in self.fields for suffix in ('', '_min', '_max'))
+        self._data = np.zeros((len(self.columns), capacity), dtype=np.float64)
+        self.clear()
+
+    def __len__(self):
+        return self._size + (1 if self._count else 0)
+
+    def clear(self):
+        """清空所有时间桶"""
+        self._cursor = 0
+        self._size = 0
+        self._bucket_start = None
+        self._reset_bucket()
+
+    def add(self, timestamp, values):
+        """加入一条记录
+
+        Args:
+            timestamp: 时间戳（秒）
+            values: 与 fields 对应的字段值
+        """
+        bucket_start = timestamp - timestamp % self.bucket_seconds
+        if bucket_start != self._bucket_start:
+            self._flush()
+            self._bucket_start = bucket_start
+
+        self._count += 1
+        for i, value in enumerate(values):
+            self._sums[i] += value
+            if value < self._mins[i]:
+                self._mins[i] = value
+            if value > self._maxs[i]:
+                self._maxs[i] = value
+
+    def covers(self, start):
+        """是否保存了从 start 开始的完整数据
+
+        Args:
+            start: 起始时间戳，None表示会话开始
+
+        Returns:
+            bool: 缓冲区未写满（会话全部数据都在），或最早的时间桶不晚于 start
+        """
+        if self._size < self.capacity:
+            return True
+        return start is not None and self._data[0, self._cursor] <= start
+
+    def points(self, start=None, end=None):
+        """按时间顺序导出落在 [start, end] 内的时间桶（包含当前未结束的时间桶）
+
+        Args:
+            start: 起始时间戳，None表示不限
+            end: 结束时间戳，None表示不限
+
+        Returns:
+            list: 时间桶字典列表
+        """
+        if self._size < self.capacity:
+            data = self._data[:, :self._size]
+        else:
+            data = np.roll(self._data, -self._cursor, axis=1)
+        if self._count:
+            data = np.concatenate((data, self._current_row()[:, None]), axis=1)
+
+        timestamps = data[0]
+        mask = np.ones(timestamps.shape, dtype=bool)
+        if start is not None:
+            mask &= timestamps + self.bucket_seconds > start
+        if end is not None:
+            mask &= timestamps <= end
+        rows = data[:, mask].T.tolist()
+        return [dict(zip(self.columns, row)) for row in rows]
+
+    def _current_row(self):
+        """当前时间桶的汇总值"""
+        row = [self._bucket_start, self._count]
+        for i in range(len(self.fields)):
+            row.extend((self._sums[i] / self._count, self._mins[i], self._maxs[i]))
+        return np.array(row, dtype=np.float64)
+
+    def _flush(self):
+        """将当前时间桶写入环形缓冲区"""
+        if not self._count:
+            return
+        self._data[:, self._cursor] = self._current_row()
+        self._cursor = (self._cursor + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+        self._reset_bucket()
+
+    def _reset_bucket(self):
+        """重置当前时间桶的累加值"""
+        self._count = 0
+        self._sums = [0.0] * len(self.fields)
+        self._mins = [float('inf')] * len(self.fields)
+        self._maxs = [float('-inf')] * len(self.fields)
+
+
+class AttentionHistory:
+    """注意力历史记录 - 预分配的列式环形缓冲区
+
+    每个字段一列NumPy数组，追加记录为O(1)，写满后覆盖最早的记录。
+    统计类查询直接在底层数组的视图上做向量化计算，不复制数据；
+    totals 为整个会话的增量统计，不受缓冲区容量限制。
+
+    原始逐帧数据只保留最近一段时间，另外按1秒和10秒粒度分层汇总，
+    在固定内存内覆盖长时间的面试，query() 按时间范围自动选择合适的粒度。
+    """
+
+    FIELDS = ('timestamp', 'score', 'face_score', 'gaze_score', 'posture_score', 'gesture_score')
+
+    # 汇总层级：(时间桶长度（秒）, 保存的时间桶数)，分别覆盖1小时和24小时
+    ROLLUP_TIERS = ((1, 3600), (10, 8640))
+
+    def __init__(self, capacity=1000):
+        """初始化历史记录缓冲区
+
+        Args:
+            capacity: 最多保存的原始记录数
+        """
+        self.capacity = capacity
+        self._columns = np.zeros((len(self.FIELDS), capacity), dtype=np.float64)
+        self._index = {name: i for i, name in enumerate(self.FIELDS)}
+        self._cursor = 0  # 下一条记录的写入位置
+        self._size = 0
+        self._lock = threading.Lock()
+        self.totals = AttentionAggregates()
+        self.rollups = [RollupSeries(bucket_seconds, tier_capacity, self.FIELDS[1:])
+                        for bucket_seconds, tier_capacity in self.ROLLUP_TIERS]
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    def append(self, timestamp, score, face_score, gaze_score, posture_score, gesture_score):
+        """追加一条记录
+
+        Args:
+            timestamp: 时间戳（秒）
+            score: 综合注意力分数
+            face_score: 面部检测得分
+            gaze_score: 视线得分
+            posture_score: 姿态得分
+            gesture_score: 手势得分
+        """
+        with self._lock:
+            self._columns[:, self._cursor] = (timestamp, score, face_score, gaze_score,
+                                              posture_score, gesture_score)
+            self._cursor = (self._cursor + 1) % self.capacity
+            if self._size < self.capacity:
+                self._size += 1
+            values = (score, face_score, gaze_score, posture_score, gesture_score)
+            self.totals.update(*values)
+            for rollup in self.rollups:
+                rollup.add(timestamp, values)
+
+    def clear(self):
+        """清空所有记录、汇总层级和会话统计"""
+        with self._lock:
+            self._cursor = 0
+            self._size = 0
+            self.totals.reset()
+            for rollup in self.rollups:
+                rollup.clear()
+
+    def values(self, name):
+        """获取某一列的有效数据视图（不复制，顺序不保证按时间排列）
+
+        适用于求均值、极值、计数等与顺序无关的统计。
+
+        Args:
+            name: 字段名
+
+        Returns:
+            numpy.ndarray: 只读视图
+        """
+        view = self._columns[self._index[name], :self._size]
+        view.flags.writeable = False
+        return view
+
+    def column(self, name):
+        """获取某一列按时间排列的数据
+
+        缓冲区未写满时返回视图；写满后需要拼接两段，返回副本。
+
+        Args:
+            name: 字段名
+
+        Returns:
+            numpy.ndarray: 按时间排列的数据
+        """
+        with self._lock:
+            row = self._columns[self._index[name]]
+            if self._size < self.capacity:
+                view = row[:self._size]
+                view.flags.writeable = False
+                return view
+            return np.concatenate((row[self._cursor:], row[:self._cursor]))
+
+    def summary(self):
+        """计算各字段的均值、最大值和最小值
+
+        Returns:
+            dict: {字段名: {'mean', 'max', 'min'}}，没有记录时返回空字典
+        """
+        if not self._size:
+            return {}
+        data = self._columns[:, :self._size]
+        means, maxes, mins = data.mean(axis=1), data.max(axis=1), data.min(axis=1)
+        return {
+            name: {'mean': float(means[i]), 'max': float(maxes[i]), 'min': float(mins[i])}
+            for i, name in enumerate(self.FIELDS)
+        }
+
+    def count_where(self, name, low=None, high=None):
+        """统计某字段落在 [low, high) 区间内的记录数
+
+        Args:
+            name: 字段名
+            low: 下界（包含），None表示不限
+            high: 上界（不包含），None表示不限
+
+        Returns:
+            int: 记录数
+        """
+        values = self.values(name)
+        mask = np.ones(values.shape, dtype=bool)
+        if low is not None:
+            mask &= values >= low
+        if high is not None:
+            mask &= values < high
+        return int(np.count_nonzero(mask))
+
+    def to_records(self):
+        """按时间顺序导出为字典列表（用于JSON序列化）
+
+        Returns:
+            list: 记录列表
+        """
+        with self._lock:
+            rows = self._ordered_columns().T.tolist()
+        return [dict(zip(self.FIELDS, row)) for row in rows]
+
+    def query(self, start=None, end=None, max_points=600):
+        """按时间范围查询历史，自动选择不超过 max_points 个点的最细粒度
+
+        某一层级只有在完整覆盖起始时间时才会被使用；范围超出所有层级时使用最粗的汇总层级。
+
+        Args:
+            start: 起始时间戳，None表示会话开始
+            end: 结束时间戳，None表示最新
+            max_points: 期望返回的最大点数
+
+        Returns:
+            dict: {'resolution': 'raw'或汇总粒度（如'10s'）, 'bucket_seconds': 时间桶长度, 'points': 数据点列表}
+        """
+        with self._lock:
+            # 原始数据：缓冲区未写满时包含会话全部数据，否则要求最早记录不晚于起始时间
+            if self._size:
+                data = self._ordered_columns()
+                timestamps = data[0]
+                if self._size < self.capacity or (start is not None and timestamps[0] <= start):
+                    mask = np.ones(timestamps.shape, dtype=bool)
+                    if start is not None:
+                        mask &= timestamps >= start
+                    if end is not None:
+                        mask &= timestamps <= end
+                    if np.count_nonzero(mask) <= max_points:
+                        rows = data[:, mask].T.tolist()
+                        return {'resolution': 'raw', 'bucket_seconds': 0,
+                                'points': [dict(zip(self.FIELDS, row)) for row in rows]}
+
+            # 汇总层级：从细到粗选择第一个覆盖起始时间且点数不超限的层级
+            for i, rollup in enumerate(self.rollups):
+                is_coarsest = i == len(self.rollups) - 1
+                if rollup.covers(start) or is_coarsest:
+                    points = rollup.points(start, end)
+                    if len(points) <= max_points or is_coarsest:
+                        return {'resolution': f"{rollup.bucket_seconds}s",
+                                'bucket_seconds': rollup.bucket_seconds, 'points': points}
+
+    def _ordered_columns(self):
+        """按时间顺序排列的有效数据（未写满时为视图，写满后为副本）"""
+        if self._size < self.capacity:
+            return self._columns[:, :self._size]
+        return np.roll(self._columns, -self._cursor, axis=1)
@@ -0,0 +1,206 @@
+# src/audio_stream.py - MP3流式解码，边接收合成结果边解码为PCM，用于语音的流式播放
+import os
+import queue
+import shutil
+import subprocess
+import threading
+
+from logging_utils import get_logger
+
+logger = get_logger("voice")
+
+# 优先使用 PyAV 在进程内增量解码
+try:
+    import av
+    av_available = True
+except ImportError:
+    av_available = False
+
+# 没有 PyAV 时使用 ffmpeg 子进程解码
+FFMPEG_PATH = os.environ.get('INTERVIEW_FFMPEG_PATH') or shutil.which('ffmpeg')
+
+
+class PyAVMP3Decoder:
+    """基于 PyAV 的MP3增量解码器 - 每次送入任意长度的数据，返回已能解码出的PCM"""
+
+    def __init__(self, sample_rate):
+        """初始化解码器
+
+        Args:
+            sample_rate: 输出采样率
+        """
+        self._codec = av.CodecContext.create('mp3', 'r')
+        self._resampler = av.AudioResampler(format='s16', layout='mono', rate=sample_rate)
+
+    def feed(self, data):
+        """送入一段MP3数据
+
+        Args:
+            data: MP3字节数据
+
+        Returns:
+            bytes: 新解码出的16位单声道PCM数据（可能为空）
+        """
+        return self._decode(self._codec.parse(data))
+
+    def flush(self):
+        """结束输入，取出剩余的PCM数据
+
+        Returns:
+            bytes: 剩余的PCM数据
+        """
+        pcm = self._decode(self._codec.parse(b''))
+        pcm += self._convert(self._codec.decode(None))
+        pcm += b''.join(frame.to_ndarray().tobytes() for frame in _as_list(self._resampler.resample(None)))
+        return pcm
+
+    def close(self):
+        """释放解码器（PyAV 对象由垃圾回收释放）"""
+
+    def _decode(self, packets):
+        """解码数据包
+
+        Args:
+            packets: 数据包列表
+
+        Returns:
+            bytes: PCM数据
+        """
+        return b''.join(self._convert(self._codec.decode(packet)) for packet in packets)
+
+    def _convert(self, frames):
+        """将解码得到的音频帧重采样为16位单声道PCM
+
+        Args:
+            frames: 音频帧列表
+
+        Returns:
+            bytes: PCM数据
+        """
+        chunks = []
+        for frame in frames:
+            for resampled in _as_list(self._resampler.resample(frame)):
+                chunks.append(resampled.to_ndarray().tobytes())
+        return b''.join(chunks)
+
+
+class FFmpegMP3Decoder:
+    """基于 ffmpeg 子进程的MP3增量解码器 - 写入标准输入，后台线程读取标准输出的PCM"""
+
+    def __init__(self, sample_rate, ffmpeg_path=FFMPEG_PATH):
+        """初始化解码器并启动 ffmpeg 进程
+
+        Args:
+            sample_rate: 输出采样率
+            ffmpeg_path: ffmpeg 可执行文件路径
+        """
+        self._process = subprocess.Popen(
+            [ffmpeg_path, '-hide_banner', '-loglevel', 'error',
+             '-fflags', 'nobuffer', '-probesize', '32', '-analyzeduration', '0',
+             '-f', 'mp3', '-i', 'pipe:0',
+             '-f', 's16le', '-ac', '1', '-ar', str(sample_rate), 'pipe:1'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        self._output = queue.Queue()
+        self._remainder = b''
+        self._reader = threading.Thread(target=self._read_loop, name="ffmpeg-decoder")
+        self._reader.daemon = True
+        self._reader.start()
+
+    def feed(self, data):
+        """送入一段MP3数据
+
+        Args:
+            data: MP3字节数据
+
+        Returns:
+            bytes: 目前已解码出的16位单声道PCM数据（可能为空）
+        """
+        self._process.stdin.write(data)
+        self._process.stdin.flush()
+        return self._drain(block=False)
+
+    def flush(self, timeout=5.0):
+        """结束输入，等待 ffmpeg 解码完剩余数据
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            bytes: 剩余的PCM数据
+        """
+        self._process.stdin.close()
+        pcm = self._drain(block=True, timeout=timeout)
+        self._process.wait(timeout=timeout)
+        return pcm
+
+    def close(self):
+        """结束 ffmpeg 进程"""
+        if self._process.poll() is None:
+            self._process.kill()
+            self._process.wait()
+
+    def _read_loop(self):
+        """读取线程：把 ffmpeg 输出的PCM数据放入队列，输出结束时放入None"""
+        try:
+            fd = self._process.stdout.fileno()
+            while True:
+                data = os.read(fd, 65536)
+                if not data:
+                    break
+                self._output.put(data)
+        except OSError:
+            pass
+        finally:
+            self._output.put(None)
+
+    def _drain(self, block, timeout=None):
+        """取出已解码的数据，保证返回的字节数为偶数（完整的16位采样）
+
+        Args:
+            block: 是否等待 ffmpeg 输出结束
+            timeout: 等待输出结束的最长时间（秒）
+
+        Returns:
+            bytes: PCM数据
+        """
+        chunks = [self._remainder]
+        while True:
+            try:
+                data = self._output.get(block=block, timeout=timeout if block else None)
+            except queue.Empty:
+                break
+            if data is None:
+                break
+            chunks.append(data)
+        pcm = b''.join(chunks)
+        split = len(pcm) - len(pcm) % 2
+        self._remainder = pcm[split:]
+        return pcm[:split]
+
+
+def create_mp3_decoder(sample_rate):
+    """创建可用的MP3增量解码器，优先使用 PyAV，其次使用 ffmpeg
+
+    Args:
+        sample_rate: 输出采样率
+
+    Returns:
+        object: 解码器（提供 feed、flush、close 方法），都不可用时返回None
+    """
+    if av_available:
+        return PyAVMP3Decoder(sample_rate)
+    if FFMPEG_PATH:
+        try:
+            return FFmpegMP3Decoder(sample_rate)
+        except OSError as e:
+            logger.warning("⚠️ 启动 ffmpeg 解码器失败: %s", e)
+    return None
+
+
+def _as_list(value):
+    """兼容不同版本的 PyAV（resample 可能返回单个帧、帧列表或None）"""
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
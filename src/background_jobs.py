@@ -0,0 +1,153 @@
+# src/background_jobs.py - 后台任务，用于把耗时操作移出HTTP请求线程
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from logging_utils import get_logger
+
+logger = get_logger("jobs")
+
+
+class BackgroundJob:
+    """后台任务 - 在独立线程中运行，提供状态和进度查询
+
+    状态依次为 pending、running，最终为 done 或 failed。
+    """
+
+    def __init__(self, name, target):
+        """初始化后台任务
+
+        Args:
+            name: 任务名称
+            target: 任务函数，接收任务对象作为参数（用于汇报进度），返回值作为任务结果
+        """
+        self.job_id = uuid.uuid4().hex
+        self.name = name
+        self.status = 'pending'
+        self.progress = 0.0
+        self.message = ''
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._target = target
+        self._thread = None
+
+    def start(self):
+        """启动任务线程"""
+        self._thread = threading.Thread(target=self._run, name=f"job-{self.name}")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def set_progress(self, progress, message=None):
+        """汇报任务进度
+
+        Args:
+            progress: 进度（0到1）
+            message: 进度说明（可选）
+        """
+        self.progress = max(0.0, min(1.0, progress))
+        if message is not None:
+            self.message = message
+
+    def wait(self, timeout=None):
+        """等待任务结束
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            bool: 任务是否已结束
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.status in ('done', 'failed')
+
+    def to_dict(self):
+        """转换为可JSON序列化的字典"""
+        return {
+            'job_id': self.job_id,
+            'name': self.name,
+            'status': self.status,
+            'progress': round(self.progress, 3),
+            'message': self.message,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at
+        }
+
+    def _run(self):
+        """任务线程入口"""
+        self.status = 'running'
+        try:
+            self.result = self._target(self)
+            self.progress = 1.0
+            self.status = 'done'
+        except Exception as e:
+            logger.exception("❌ 后台任务 %s 失败: %s", self.name, e)
+            self.error = str(e)
+            self.status = 'failed'
+        finally:
+            self.finished_at = time.time()
+
+
+class JobRegistry:
+    """后台任务注册表 - 保留最近的任务，供进度查询"""
+
+    def __init__(self, max_jobs=20):
+        """初始化任务注册表
+
+        Args:
+            max_jobs: 保留的最大任务数，超出时丢弃最早的已结束任务
+        """
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, name, target):
+        """创建并启动后台任务
+
+        Args:
+            name: 任务名称
+            target: 任务函数
+
+        Returns:
+            BackgroundJob: 任务对象
+        """
+        job = BackgroundJob(name, target)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            finished = [job_id for job_id, item in self._jobs.items() if item.status in ('done', 'failed')]
+            while len(self._jobs) > self.max_jobs and finished:
+                del self._jobs[finished.pop(0)]
+        job.start()
+        return job
+
+    def get(self, job_id):
+        """获取任务
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            BackgroundJob: 任务对象，不存在时返回None
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def latest(self, name):
+        """获取指定名称的最近一个任务
+
+        Args:
+            name: 任务名称
+
+        Returns:
+            BackgroundJob: 任务对象，不存在时返回None
+        """
+        with self._lock:
+            for job in reversed(self._jobs.values()):
+                if job.name == name:
+                    return job
+        return None
@@ -1,20 +1,29 @@
 import cv2
 import numpy as np
+import threading
 import time
 from datetime import datetime
 import os
 
+from logging_utils import get_logger, PER_FRAME
+
+logger = get_logger("camera")
+
 
 class CameraManager:
     """摄像头管理器 - 处理摄像头操作和图像处理"""
     
-    def __init__(self, camera_id=0, resolution=(640, 480), fps=30):
+    def __init__(self, camera_id=0, resolution=(640, 480), fps=30, low_latency=False,
+                 buffer_size=1, fourcc="MJPG"):
         """初始化摄像头管理器
         
         Args:
             camera_id: 摄像头ID（默认0）
             resolution: 分辨率（默认640x480）
             fps: 帧率（默认30）
+            low_latency: 低延迟模式，使用后台线程持续抓帧（只取出不解码），消费者需要时才解码最新一帧
+            buffer_size: 低延迟模式下的驱动缓冲区大小（后端支持时生效）
+            fourcc: 低延迟模式下的采集压缩格式（后端支持时生效），None表示不设置
         """
         self.camera_id = camera_id
         self.resolution = resolution
@@ -25,6 +34,23 @@ class CameraManager:
         self.start_time = None
         self.last_frame_time = 0
         
+        # 低延迟模式：后台抓帧线程 + 条件变量，消费者阻塞等待新帧而不是轮询
+        # 抓帧线程持续 grab() 清空驱动缓冲区，只有消费者请求时才 retrieve() 解码，不解码会被覆盖的帧
+        self.low_latency = low_latency
+        self.buffer_size = buffer_size
+        self.fourcc = fourcc
+        self._frame_cond = threading.Condition()
+        self._grab_thread = None
+        self._grabbing = False
+        self._latest_frame = None
+        self._grab_failed = False
+        self._frame_requested = False  # 是否有消费者在等待解码新帧
+        self.grab_seq = 0            # 已抓取（未必解码）的帧数
+        self.frame_seq = 0           # 最新解码帧的抓取序号
+        self.frame_timestamp = 0.0   # 最新一帧的采集时间（time.monotonic）
+        self._consumed_seq = 0       # read_frame 上次取走的帧序号
+        self.dropped_frames = 0      # 抓取后未被解码就被新帧覆盖的帧数
+        
         # 性能统计
         self.fps_actual = 0
         self.frame_times = []
@@ -35,7 +61,7 @@ class CameraManager:
         self.brightness = 0          # 亮度调整
         self.contrast = 1.0          # 对比度调整
         
-        print(f"✅ 摄像头管理器已初始化 (ID: {camera_id}, 分辨率: {resolution}, FPS: {fps})")
+        logger.info("✅ 摄像头管理器已初始化 (ID: %s, 分辨率: %s, FPS: %s)", camera_id, resolution, fps)
     
     def open(self):
         """打开摄像头
@@ -44,13 +70,22 @@ class CameraManager:
             bool: 是否成功打开摄像头
         """
         try:
-            print(f"正在尝试打开摄像头 {self.camera_id}...")
+            logger.info("正在尝试打开摄像头 %s...", self.camera_id)
+            # 重新打开时先停止抓帧线程并释放旧的采集对象
+            self._stop_grabber()
+            if self.cap is not None:
+                self.cap.release()
+                self.is_opened = False
             self.cap = cv2.VideoCapture(self.camera_id)
             
             if not self.cap.isOpened():
-                print(f"❌ 无法打开摄像头 {self.camera_id}")
+                logger.error("❌ 无法打开摄像头 %s", self.camera_id)
                 return False
             
+            # 低延迟模式：压缩采集格式需在设置分辨率之前指定；缩小驱动缓冲区避免读到积压的旧帧
+            if self.low_latency:
+                self._configure_low_latency()
+            
             # 设置分辨率
             self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.resolution[0])
             self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.resolution[1])
@@ -61,7 +96,7 @@ class CameraManager:
             # 尝试读取一帧来验证摄像头是否正常工作
             ret, test_frame = self.cap.read()
             if not ret or test_frame is None:
-                print(f"❌ 摄像头 {self.camera_id} 无法读取帧")
+                logger.error("❌ 摄像头 %s 无法读取帧", self.camera_id)
                 self.cap.release()
                 return False
             
@@ -73,11 +108,14 @@ class CameraManager:
             actual_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
             actual_fps = self.cap.get(cv2.CAP_PROP_FPS)
             
-            print(f"✅ 摄像头已打开 (实际分辨率: {actual_width}x{actual_height}, 实际FPS: {actual_fps})")
+            logger.info("✅ 摄像头已打开 (实际分辨率: %sx%s, 实际FPS: %s)", actual_width, actual_height, actual_fps)
+            
+            if self.low_latency:
+                self._start_grabber()
             return True
             
         except Exception as e:
-            print(f"❌ 打开摄像头时出错: {e}")
+            logger.error("❌ 打开摄像头时出错: %s", e)
             if self.cap is not None:
                 self.cap.release()
                 self.cap = None
@@ -85,42 +123,45 @@ class CameraManager:
     
     def close(self):
         """关闭摄像头"""
+        self._stop_grabber()
         if self.cap is not None:
             self.cap.release()
             self.is_opened = False
-            print("✅ 摄像头已关闭")
+            logger.info("✅ 摄像头已关闭")
     
-    def read_frame(self):
+    def is_open(self):
+        """摄像头是否已打开"""
+        return self.is_opened and self.cap is not None
+    
+    def read_frame(self, timeout=1.0):
         """读取一帧图像
         
+        低延迟模式下阻塞等待抓帧线程产生比上次读取更新的帧，直接返回最新一帧。
+        
+        Args:
+            timeout: 低延迟模式下等待新帧的最长时间（秒）
+        
         Returns:
             tuple: (是否成功读取, 图像帧)
         """
         if not self.is_opened or self.cap is None:
             return False, None
         
+        if self._grab_thread is not None:
+            ret, frame, seq, _ = self.read_latest(self._consumed_seq, timeout)
+            if not ret:
+                return False, None
+            self._consumed_seq = seq
+            return True, self._process_frame(frame)
+        
         try:
             ret, frame = self.cap.read()
             
             if not ret:
-                print("❌ 无法读取摄像头帧")
+                logger.warning("❌ 无法读取摄像头帧", extra=PER_FRAME)
                 return False, None
             
-            # 更新帧计数
-            self.frame_count += 1
-            current_time = time.time()
-            
-            # 计算实际FPS
-            if self.frame_count > 1:
-                self.frame_times.append(current_time)
-                if len(self.frame_times) > self.max_frame_times:
-                    self.frame_times.pop(0)
-                
-                if len(self.frame_times) >= 2:
-                    time_diff = self.frame_times[-1] - self.frame_times[0]
-                    self.fps_actual = (len(self.frame_times) - 1) / time_diff
-            
-            self.last_frame_time = current_time
+            self._update_frame_stats()
             
             # 应用图像处理
             frame = self._process_frame(frame)
@@ -128,9 +169,125 @@ class CameraManager:
             return True, frame
             
         except Exception as e:
-            print(f"❌ 读取帧时出错: {e}")
+            logger.warning("❌ 读取帧时出错: %s", e, extra=PER_FRAME)
             return False, None
     
+    def read_latest(self, last_seq=0, timeout=1.0):
+        """请求抓帧线程解码下一个抓取到的帧，等待并获取该帧（未经图像处理）
+        
+        Args:
+            last_seq: 调用方已处理过的帧序号，只返回序号更大的帧
+            timeout: 等待新帧的最长时间（秒）
+        
+        Returns:
+            tuple: (是否成功, 原始图像帧, 帧序号, 采集时间)
+        """
+        with self._frame_cond:
+            if self.frame_seq <= last_seq:
+                self._frame_requested = True
+            ready = self._frame_cond.wait_for(
+                lambda: self.frame_seq > last_seq or self._grab_failed or not self._grabbing,
+                timeout=timeout)
+            if not ready or self.frame_seq <= last_seq:
+                return False, None, last_seq, 0.0
+            return True, self._latest_frame, self.frame_seq, self.frame_timestamp
+    
+    def _configure_low_latency(self):
+        """设置驱动缓冲区大小和压缩采集格式，后端不支持时忽略"""
+        if self.fourcc:
+            if not self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.fourcc)):
+                logger.warning("⚠️ 摄像头后端不支持采集格式 %s", self.fourcc)
+        if self.buffer_size:
+            if not self.cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size):
+                logger.warning("⚠️ 摄像头后端不支持设置缓冲区大小")
+    
+    def _start_grabber(self):
+        """启动后台抓帧线程"""
+        self._stop_grabber()
+        with self._frame_cond:
+            self._grabbing = True
+            self._grab_failed = False
+            self._frame_requested = False
+            self._latest_frame = None
+            self._consumed_seq = self.frame_seq
+        self._grab_thread = threading.Thread(target=self._grab_loop, name="camera-grabber")
+        self._grab_thread.daemon = True
+        self._grab_thread.start()
+    
+    def _stop_grabber(self):
+        """停止后台抓帧线程，并唤醒所有等待中的消费者"""
+        thread = self._grab_thread
+        if thread is None:
+            return
+        with self._frame_cond:
+            self._grabbing = False
+            self._frame_cond.notify_all()
+        if thread is not threading.current_thread():
+            thread.join(timeout=2)
+        self._grab_thread = None
+    
+    def _grab_loop(self):
+        """抓帧线程：持续 grab() 取出摄像头帧，有消费者等待时才 retrieve() 解码最新抓取的帧"""
+        cap = self.cap
+        while self._grabbing:
+            try:
+                ret = cap.grab()
+            except Exception as e:
+                logger.warning("❌ 抓帧线程读取失败: %s", e, extra=PER_FRAME)
+                ret = False
+            
+            with self._frame_cond:
+                if not ret:
+                    logger.warning("❌ 无法读取摄像头帧", extra=PER_FRAME)
+                    self._grab_failed = True
+                    self._grabbing = False
+                    self._frame_cond.notify_all()
+                    break
+                self.grab_seq += 1
+                self._update_frame_stats()
+                requested = self._frame_requested
+                if not requested:
+                    # 没有消费者等待，这一帧不解码，会被下一次抓取覆盖
+                    self.dropped_frames += 1
+                    continue
+                self._frame_requested = False
+                seq = self.grab_seq
+                timestamp = time.monotonic()
+            
+            # 解码在锁外进行，不阻塞其他线程读取帧状态
+            try:
+                ret, frame = cap.retrieve()
+            except Exception as e:
+                logger.warning("❌ 抓帧线程读取失败: %s", e, extra=PER_FRAME)
+                ret, frame = False, None
+            
+            with self._frame_cond:
+                if not ret or frame is None:
+                    # 解码失败时让消费者等待下一次抓取
+                    self._frame_requested = True
+                    continue
+                self._latest_frame = frame
+                self.frame_seq = seq
+                self.frame_timestamp = timestamp
+                self._frame_cond.notify_all()
+    
+    def _update_frame_stats(self):
+        """更新帧计数和实际FPS"""
+        self.frame_count += 1
+        current_time = time.time()
+        
+        # 计算实际FPS
+        if self.frame_count > 1:
+            self.frame_times.append(current_time)
+            if len(self.frame_times) > self.max_frame_times:
+                self.frame_times.pop(0)
+            
+            if len(self.frame_times) >= 2:
+                time_diff = self.frame_times[-1] - self.frame_times[0]
+                self.fps_actual = (len(self.frame_times) - 1) / time_diff
+        
+        self.last_frame_time = current_time
+    
     def _process_frame(self, frame):
         """处理图像帧
         
@@ -162,7 +319,9 @@ class CameraManager:
             'fps': self.fps,
             'is_opened': self.is_opened,
             'frame_count': self.frame_count,
-            'fps_actual': round(self.fps_actual, 1)
+            'fps_actual': round(self.fps_actual, 1),
+            'low_latency': self.low_latency,
+            'dropped_frames': self.dropped_frames
         }
         
         if self.is_opened and self.start_time:
@@ -179,7 +338,7 @@ class CameraManager:
             flip: 是否水平翻转
         """
         self.flip_horizontal = flip
-        print(f"水平翻转已设置为: {flip}")
+        logger.info("水平翻转已设置为: %s", flip)
     
     def set_brightness(self, brightness):
         """设置亮度
@@ -188,7 +347,7 @@ class CameraManager:
             brightness: 亮度值（-100到100）
         """
         self.brightness = max(-100, min(100, brightness))
-        print(f"亮度已设置为: {self.brightness}")
+        logger.info("亮度已设置为: %s", self.brightness)
     
     def set_contrast(self, contrast):
         """设置对比度
@@ -197,7 +356,7 @@ class CameraManager:
             contrast: 对比度值（0.1到3.0）
         """
         self.contrast = max(0.1, min(3.0, contrast))
-        print(f"对比度已设置为: {self.contrast}")
+        logger.info("对比度已设置为: %s", self.contrast)
     
     def save_frame(self, frame, filename=None, directory="captures"):
         """保存当前帧
@@ -224,11 +383,11 @@ class CameraManager:
             
             # 保存图像
             cv2.imwrite(filepath, frame)
-            print(f"✅ 帧已保存: {filepath}")
+            logger.info("✅ 帧已保存: %s", filepath)
             return filepath
             
         except Exception as e:
-            print(f"❌ 保存帧时出错: {e}")
+            logger.error("❌ 保存帧时出错: %s", e)
             return None
     
     def test_camera(self, duration=5):
@@ -0,0 +1,206 @@
+# src/cosyvoice_client.py - 常驻CosyVoice合成服务的客户端及通信协议
+"""
+协议（TCP，本机）：
+    请求: 一行JSON，如 {"text": "...", "speaker": "中文女", "speed": 1.0}；{"type": "ping"} 用于探测服务
+    响应: 一行JSON头部，如 {"sample_rate": 24000, "channels": 1, "format": "pcm_s16le"}，出错时为 {"error": "..."}
+          之后是若干音频块，每块为4字节大端长度 + 16位PCM数据，长度为0的块表示合成完成；
+          合成中途失败时以长度 0xFFFFFFFF 的块结束，其后是一行JSON错误信息，如 {"error": "..."}
+"""
+import json
+import os
+import socket
+import struct
+import time
+
+# 合成服务地址
+COSYVOICE_HOST = os.environ.get('INTERVIEW_COSYVOICE_HOST', '127.0.0.1')
+COSYVOICE_PORT = int(os.environ.get('INTERVIEW_COSYVOICE_PORT', 50321))
+
+_CHUNK_HEADER = struct.Struct('>I')
+
+# 音频流中表示合成失败的块长度
+ERROR_CHUNK_SIZE = 0xFFFFFFFF
+
+
+def encode_message(message):
+    """将消息编码为一行JSON
+
+    Args:
+        message: 消息字典
+
+    Returns:
+        bytes: 以换行结尾的UTF-8数据
+    """
+    return json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+def encode_chunk(data):
+    """将音频块编码为带长度前缀的数据，空数据表示结束
+
+    Args:
+        data: PCM字节数据
+
+    Returns:
+        bytes: 编码后的数据
+    """
+    return _CHUNK_HEADER.pack(len(data)) + data
+
+
+def encode_error_trailer(message):
+    """将合成中途的错误编码为音频流的结束块，客户端据此丢弃已收到的不完整音频
+
+    Args:
+        message: 错误信息
+
+    Returns:
+        bytes: 编码后的数据
+    """
+    return _CHUNK_HEADER.pack(ERROR_CHUNK_SIZE) + encode_message({'error': message})
+
+
+class CosyVoiceClient:
+    """CosyVoice合成服务客户端 - 逐块接收合成结果，收到第一块即可开始播放"""
+
+    def __init__(self, host=COSYVOICE_HOST, port=COSYVOICE_PORT, connect_timeout=1.0,
+                 read_timeout=30.0, retry_interval=30.0):
+        """初始化客户端
+
+        Args:
+            host: 服务地址
+            port: 服务端口
+            connect_timeout: 连接超时（秒）
+            read_timeout: 等待音频数据的超时（秒）
+            retry_interval: 服务不可用后，再次尝试连接前的等待时间（秒）
+        """
+        self.host = host
+        self.port = port
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retry_interval = retry_interval
+        self._unavailable_until = 0.0
+
+    def is_available(self):
+        """探测服务是否可用（不可用的结果会缓存 retry_interval 秒，避免反复等待连接超时）
+
+        Returns:
+            bool: 服务是否可用
+        """
+        if time.monotonic() < self._unavailable_until:
+            return False
+        try:
+            with self._connect() as sock:
+                sock.sendall(encode_message({'type': 'ping'}))
+                reply = json.loads(self._recv_line(sock, None))
+            return bool(reply.get('ok'))
+        except (OSError, ValueError):
+            self._unavailable_until = time.monotonic() + self.retry_interval
+            return False
+
+    def stream(self, text, speaker="中文女", speed=1.0, cancel_check=None):
+        """请求合成并逐块返回PCM数据
+
+        Args:
+            text: 文本
+            speaker: 说话人
+            speed: 语速
+            cancel_check: 返回是否应中止的函数，等待数据期间会定期调用；中止时关闭连接，服务端随即停止合成
+
+        Yields:
+            tuple: (采样率, 16位单声道PCM字节数据)
+
+        Raises:
+            ConnectionError: 服务不可用、返回错误或合成中途失败（已返回的音频不完整）
+        """
+        if time.monotonic() < self._unavailable_until:
+            raise ConnectionError("CosyVoice服务不可用（稍后重试）")
+        try:
+            sock = self._connect()
+        except OSError as e:
+            self._unavailable_until = time.monotonic() + self.retry_interval
+            raise ConnectionError(f"CosyVoice服务不可用: {e}")
+
+        with sock:
+            try:
+                sock.sendall(encode_message({'text': text, 'speaker': speaker, 'speed': speed}))
+                header = json.loads(self._recv_line(sock, cancel_check))
+            except _Cancelled:
+                return
+            except (OSError, ValueError) as e:
+                raise ConnectionError(f"CosyVoice服务通信失败: {e}")
+            if 'error' in header:
+                raise ConnectionError(f"CosyVoice合成失败: {header['error']}")
+
+            sample_rate = header.get('sample_rate', 24000)
+            while True:
+                try:
+                    size = _CHUNK_HEADER.unpack(self._recv_exact(sock, _CHUNK_HEADER.size, cancel_check))[0]
+                    if size == 0:
+                        return
+                    if size == ERROR_CHUNK_SIZE:
+                        trailer = json.loads(self._recv_line(sock, cancel_check))
+                    else:
+                        data = self._recv_exact(sock, size, cancel_check)
+                except _Cancelled:
+                    return
+                except (OSError, ValueError) as e:
+                    raise ConnectionError(f"CosyVoice服务通信失败: {e}")
+                if size == ERROR_CHUNK_SIZE:
+                    raise ConnectionError(f"CosyVoice合成中断: {trailer.get('error')}")
+                yield sample_rate, data
+
+    def _connect(self):
+        """建立连接
+
+        Returns:
+            socket.socket: 已连接的套接字
+        """
+        sock = socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+        sock.settimeout(0.1)
+        return sock
+
+    def _recv_exact(self, sock, size, cancel_check):
+        """读取指定长度的数据，期间定期检查是否需要中止
+
+        Args:
+            sock: 套接字
+            size: 字节数
+            cancel_check: 返回是否应中止的函数（可选）
+
+        Returns:
+            bytes: 读取的数据
+        """
+        buffer = bytearray()
+        deadline = time.monotonic() + self.read_timeout
+        while len(buffer) < size:
+            if cancel_check is not None and cancel_check():
+                raise _Cancelled()
+            if time.monotonic() > deadline:
+                raise socket.timeout("等待音频数据超时")
+            try:
+                data = sock.recv(size - len(buffer))
+            except socket.timeout:
+                continue
+            if not data:
+                raise ConnectionResetError("连接已关闭")
+            buffer.extend(data)
+            deadline = time.monotonic() + self.read_timeout
+        return bytes(buffer)
+
+    def _recv_line(self, sock, cancel_check):
+        """读取一行数据
+
+        Args:
+            sock: 套接字
+            cancel_check: 返回是否应中止的函数（可选）
+
+        Returns:
+            str: 不含换行符的一行文本
+        """
+        line = bytearray()
+        while not line.endswith(b'\n'):
+            line.extend(self._recv_exact(sock, 1, cancel_check))
+        return line[:-1].decode('utf-8')
+
+
+class _Cancelled(Exception):
+    """等待数据期间被调用方中止"""
@@ -0,0 +1,287 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+常驻CosyVoice合成服务
+模型只在启动时加载一次，之后通过本机TCP端口接收合成请求，并以流式方式逐块返回音频。
+需使用cosyvoice自带的Python环境运行，确保依赖完整。通信协议见 cosyvoice_client.py。
+
+用法: python cosyvoice_server.py [--port 50321] [--model-dir 模型目录]
+"""
+import argparse
+import json
+import os
+import queue
+import socketserver
+import sys
+import threading
+import time
+
+import numpy as np
+
+from cosyvoice_client import COSYVOICE_HOST, COSYVOICE_PORT, encode_chunk, encode_error_trailer, encode_message
+
+# cosyvoice 代码和模型所在目录
+COSYVOICE_PATH = os.environ.get(
+    'INTERVIEW_COSYVOICE_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cosyvoice-rainfall'))
+DEFAULT_MODEL_DIR = os.path.join(COSYVOICE_PATH, "models", "CosyVoice3-0.5B")
+
+
+class SynthesisJob:
+    """一次合成任务 - 可被多个相同的请求共享，音频块广播给所有订阅者"""
+
+    def __init__(self, key, text, speaker, speed):
+        """初始化合成任务
+
+        Args:
+            key: 去重键（文本、说话人、语速）
+            text: 文本
+            speaker: 说话人
+            speed: 语速
+        """
+        self.key = key
+        self.text = text
+        self.speaker = speaker
+        self.speed = speed
+        self.chunks = []
+        self.subscribers = []
+        self.finished = False
+        self.error = None
+        self.cancelled = False
+
+
+class SynthesisScheduler:
+    """合成调度器 - 单个推理线程独占模型，按顺序处理任务
+
+    多个会话同时请求相同的文本时合并为一次推理，后加入的请求先补发已生成的音频块；
+    所有订阅者都断开后，正在进行的推理在下一个音频块处停止。
+    """
+
+    def __init__(self, model):
+        """初始化调度器
+
+        Args:
+            model: 已加载的CosyVoice模型
+        """
+        self.model = model
+        self.sample_rate = model.sample_rate
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="cosyvoice-inference")
+        self._thread.daemon = True
+        self._thread.start()
+
+        # 统计信息
+        self.requests = 0
+        self.coalesced = 0
+        self.completed = 0
+
+    def subscribe(self, text, speaker, speed):
+        """订阅一次合成，相同的合成正在排队或进行时直接加入
+
+        Args:
+            text: 文本
+            speaker: 说话人
+            speed: 语速
+
+        Returns:
+            tuple: (合成任务, 接收音频块的队列)；队列中None表示结束，异常对象表示失败
+        """
+        key = (text, speaker, float(speed))
+        subscriber = queue.Queue()
+        with self._lock:
+            self.requests += 1
+            job = self._jobs.get(key)
+            if job is None:
+                job = SynthesisJob(key, text, speaker, speed)
+                self._jobs[key] = job
+                self._queue.put(job)
+            else:
+                self.coalesced += 1
+            for chunk in job.chunks:
+                subscriber.put(chunk)
+            job.subscribers.append(subscriber)
+        return job, subscriber
+
+    def unsubscribe(self, job, subscriber):
+        """取消订阅，没有订阅者的任务会被取消
+
+        Args:
+            job: 合成任务
+            subscriber: 订阅时返回的队列
+        """
+        with self._lock:
+            if subscriber in job.subscribers:
+                job.subscribers.remove(subscriber)
+            if not job.subscribers and not job.finished:
+                job.cancelled = True
+                if self._jobs.get(job.key) is job:
+                    del self._jobs[job.key]
+
+    def _publish(self, job, item):
+        """向任务的所有订阅者发送数据
+
+        Args:
+            job: 合成任务
+            item: 音频块、None（结束）或异常
+        """
+        with self._lock:
+            if isinstance(item, bytes):
+                job.chunks.append(item)
+            else:
+                job.finished = True
+                if self._jobs.get(job.key) is job:
+                    del self._jobs[job.key]
+            for subscriber in job.subscribers:
+                subscriber.put(item)
+
+    def _run(self):
+        """推理线程：依次执行任务，每生成一个音频块立即推送"""
+        while True:
+            job = self._queue.get()
+            if job.cancelled:
+                continue
+            start_time = time.time()
+            try:
+                for output in self.model.inference_sft(
+                    tts_text=job.text,
+                    spk_id=job.speaker,
+                    stream=True,
+                    speed=job.speed
+                ):
+                    if job.cancelled:
+                        break
+                    audio = output['tts_speech'].squeeze(0).clamp(-1.0, 1.0).cpu().numpy()
+                    self._publish(job, (audio * 32767).astype(np.int16).tobytes())
+                self._publish(job, None)
+                self.completed += 1
+                print(f"✅ 合成完成（{time.time() - start_time:.2f} 秒）: {job.text}")
+            except Exception as e:
+                print(f"❌ 合成失败: {e}")
+                self._publish(job, e)
+
+
+class SynthesisRequestHandler(socketserver.StreamRequestHandler):
+    """处理单个连接：读取一行JSON请求，流式返回音频块"""
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline().decode('utf-8'))
+        except (OSError, ValueError) as e:
+            self._send(encode_message({'error': f"请求格式错误: {e}"}))
+            return
+
+        scheduler = self.server.scheduler
+        if request.get('type') == 'ping':
+            self._send(encode_message({'ok': True, 'sample_rate': scheduler.sample_rate}))
+            return
+
+        text = request.get('text', '').strip()
+        if not text:
+            self._send(encode_message({'error': "文本不能为空"}))
+            return
+
+        job, subscriber = scheduler.subscribe(text, request.get('speaker', "中文女"), request.get('speed', 1.0))
+        try:
+            self._send(encode_message({'sample_rate': scheduler.sample_rate, 'channels': 1, 'format': 'pcm_s16le'}))
+            while True:
+                item = subscriber.get()
+                if item is None:
+                    self._send(encode_chunk(b''))
+                    break
+                if isinstance(item, Exception):
+                    # 头部已发送，以错误块结束音频流，客户端不会把不完整的音频当作完整结果
+                    self._send(encode_error_trailer(str(item)))
+                    break
+                self._send(encode_chunk(item))
+        except OSError:
+            # 客户端已断开（如语音被取消）
+            pass
+        finally:
+            scheduler.unsubscribe(job, subscriber)
+
+    def _send(self, data):
+        self.wfile.write(data)
+        self.wfile.flush()
+
+
+class SynthesisServer(socketserver.ThreadingTCPServer):
+    """合成服务 - 每个连接一个线程，推理统一交给调度器"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, scheduler):
+        super().__init__(address, SynthesisRequestHandler)
+        self.scheduler = scheduler
+
+
+def load_model(model_dir, fp16=False):
+    """加载CosyVoice模型
+
+    Args:
+        model_dir: 模型目录
+        fp16: 是否使用半精度推理
+
+    Returns:
+        object: 模型对象
+    """
+    sys.path.append(COSYVOICE_PATH)
+
+    # 修复whisper库在Windows上的导入问题
+    import ctypes
+    original_cdll = ctypes.CDLL
+
+    def patched_cdll(name, *args, **kwargs):
+        if name is None:
+            class MockCDLL:
+                def __getattr__(self, attr):
+                    return lambda *args, **kwargs: None
+            return MockCDLL()
+        return original_cdll(name, *args, **kwargs)
+
+    ctypes.CDLL = patched_cdll
+
+    from cosyvoice.cli.cosyvoice import AutoModel
+
+    if not os.path.exists(model_dir):
+        raise FileNotFoundError(f"模型目录不存在: {model_dir}")
+    print(f"🔄 加载CosyVoice模型: {model_dir}")
+    start_time = time.time()
+    model = AutoModel(model_dir=model_dir, fp16=fp16)
+    print(f"✅ 模型加载成功（{time.time() - start_time:.1f} 秒），采样率: {model.sample_rate}")
+    return model
+
+
+def main(argv=None):
+    """命令行入口
+
+    Args:
+        argv: 命令行参数（默认读取 sys.argv）
+    """
+    parser = argparse.ArgumentParser(description="常驻CosyVoice合成服务")
+    parser.add_argument("--host", default=COSYVOICE_HOST, help="监听地址（建议只监听本机）")
+    parser.add_argument("--port", type=int, default=COSYVOICE_PORT, help="监听端口")
+    parser.add_argument("--model-dir", default=DEFAULT_MODEL_DIR, help="模型目录")
+    parser.add_argument("--fp16", action="store_true", help="使用半精度推理")
+    parser.add_argument("--warmup", default="你好", help="启动后预热合成的文本，为空则不预热")
+    args = parser.parse_args(argv)
+
+    scheduler = SynthesisScheduler(load_model(args.model_dir, args.fp16))
+    if args.warmup:
+        job, subscriber = scheduler.subscribe(args.warmup, "中文女", 1.0)
+        while subscriber.get() is not None and not job.finished:
+            pass
+        scheduler.unsubscribe(job, subscriber)
+
+    with SynthesisServer((args.host, args.port), scheduler) as server:
+        print(f"✅ CosyVoice合成服务已启动: {args.host}:{args.port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("👋 合成服务已停止")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,13 +6,16 @@ from .face_detector import FaceDetector
 class GazeDetector:
     """视线检测器 - 检测用户是否看向摄像头"""
     
-    def __init__(self, offset_threshold=0.15):
+    def __init__(self, offset_threshold=0.15, face_detector=None):
         """初始化视线检测器
         
         Args:
             offset_threshold: 视线偏移阈值（相对于画面中心的比例）
+            face_detector: 共享的面部检测器（可选，不提供则自行创建）
         """
-        self.face_detector = FaceDetector()
+        # 共享外部面部检测器时，由外部负责释放
+        self._owns_face_detector = face_detector is None
+        self.face_detector = face_detector if face_detector is not None else FaceDetector()
         self.offset_threshold = offset_threshold
         
         # 状态跟踪
@@ -21,18 +24,25 @@ class GazeDetector:
         
         print("✅ 视线检测器已初始化")
     
-    def detect_gaze(self, frame, draw_annotations=True):
+    def detect_gaze(self, frame, face_landmarks=None, draw_annotations=True):
         """检测视线方向
         
         Args:
             frame: 输入图像帧
+            face_landmarks: 面部关键点（可选，如果不提供会自动检测）
             draw_annotations: 是否绘制标注（默认True）
             
         Returns:
             tuple: (是否看向摄像头, 偏移比例, 带标注的图像)
         """
-        # 使用面部检测器获取关键点
-        has_face, landmarks, annotated_frame = self.face_detector.detect(frame, draw_annotations)
+        if face_landmarks is None:
+            # 使用面部检测器获取关键点
+            has_face, landmarks, annotated_frame = self.face_detector.detect(frame, draw_annotations)
+        else:
+            # 复用本帧已有的关键点，避免重复推理
+            landmarks = face_landmarks
+            has_face = len(landmarks) > 0
+            annotated_frame = frame.copy() if draw_annotations else frame
         
         if not has_face:
             return False, 1.0, annotated_frame
@@ -40,23 +50,18 @@ class GazeDetector:
         # 获取眼部关键点
         left_eye, right_eye = self.face_detector.get_eye_landmarks(landmarks)
         
-        if not left_eye or not right_eye:
+        if len(left_eye) == 0 or len(right_eye) == 0:
             return False, 1.0, annotated_frame
         
-        # 计算双眼中心
+        # 计算双眼中心（归一化坐标）
         left_center = self.face_detector.calculate_eye_center(left_eye)
         right_center = self.face_detector.calculate_eye_center(right_eye)
         
         # 计算双眼整体中心
-        eye_center_x = (left_center[0] + right_center[0]) // 2
-        eye_center_y = (left_center[1] + right_center[1]) // 2
-        
-        # 获取画面中心
-        h, w = frame.shape[:2]
-        frame_center_x = w // 2
+        eye_center = (left_center + right_center) / 2
         
-        # 计算偏移比例
-        offset_ratio = abs(eye_center_x - frame_center_x) / (w // 2)
+        # 计算偏移比例（画面中心的归一化横坐标为0.5）
+        offset_ratio = float(abs(eye_center[0] - 0.5) / 0.5)
         
         # 判断是否看向摄像头
         is_looking = offset_ratio < self.offset_threshold
@@ -69,15 +74,19 @@ class GazeDetector:
         # 平滑结果（如果历史记录中多数时间看向摄像头，则认为当前看向摄像头）
         smoothed_is_looking = sum(self.gaze_history) / len(self.gaze_history) > 0.6
         
-        # 在画面上绘制眼部中心和视线指示
-        cv2.circle(annotated_frame, (eye_center_x, eye_center_y), 5, (0, 255, 0), -1)
-        cv2.line(annotated_frame, (eye_center_x, eye_center_y), 
-                (frame_center_x, eye_center_y), 
-                (0, 255, 0) if smoothed_is_looking else (0, 0, 255), 2)
-        
-        # 绘制画面中心线
-        cv2.line(annotated_frame, (frame_center_x, 0), 
-                (frame_center_x, h), (255, 255, 255), 1)
+        # 仅在需要时绘制眼部中心和视线指示
+        if draw_annotations:
+            h, w = frame.shape[:2]
+            frame_center_x = w // 2
+            eye_center_x, eye_center_y = self.face_detector.to_pixels(eye_center, frame.shape).astype(int)
+            cv2.circle(annotated_frame, (eye_center_x, eye_center_y), 5, (0, 255, 0), -1)
+            cv2.line(annotated_frame, (eye_center_x, eye_center_y), 
+                    (frame_center_x, eye_center_y), 
+                    (0, 255, 0) if smoothed_is_looking else (0, 0, 255), 2)
+            
+            # 绘制画面中心线
+            cv2.line(annotated_frame, (frame_center_x, 0), 
+                    (frame_center_x, h), (255, 255, 255), 1)
         
         return smoothed_is_looking, offset_ratio, annotated_frame
     
@@ -102,4 +111,5 @@ class GazeDetector:
     
     def close(self):
         """释放资源"""
-        self.face_detector.close()
\ No newline at end of file
+        if self._owns_face_detector:
+            self.face_detector.close()
\ No newline at end of file
@@ -1,22 +1,39 @@
 import cv2
+import time
 import numpy as np
 import mediapipe as mp
-from .face_detector import FaceDetector
+from .face_detector import FaceDetector, landmarks_to_array
 
 
 class GestureDetector:
     """手势检测器 - 检测小动作（摸脸、摸头发等）"""
     
-    def __init__(self, detection_threshold=0.5):
+    # 门控检测使用的缩略图尺寸
+    GATE_SIZE = (64, 64)
+    # YCrCb空间的肤色范围
+    SKIN_LOWER = np.array([0, 133, 77], dtype=np.uint8)
+    SKIN_UPPER = np.array([255, 173, 127], dtype=np.uint8)
+    
+    def __init__(self, detection_threshold=0.5, face_detector=None, gating_enabled=True,
+                 roi_scale=2.5, gate_threshold=0.02, probe_interval=1.0):
         """初始化手势检测器
         
         Args:
             detection_threshold: 手势检测置信度阈值
+            face_detector: 共享的面部检测器（可选，不提供则自行创建）
+            gating_enabled: 是否启用面部邻近门控（仅在手可能靠近面部时运行手部模型）
+            roi_scale: 面部区域的扩展倍数，手部模型只在扩展后的区域内运行
+            gate_threshold: 面部周围"运动的肤色像素"占比阈值，超过时运行手部模型
+            probe_interval: 无门控信号时，低频探测运行手部模型的间隔（秒）
         """
-        self.face_detector = FaceDetector()
+        # 共享外部面部检测器时，由外部负责释放
+        self._owns_face_detector = face_detector is None
+        self.face_detector = face_detector if face_detector is not None else FaceDetector()
         self.mp_hands = mp.solutions.hands
+        # 门控模式下裁剪区域随面部移动和缩放，前后两次输入的像素坐标不一致，
+        # 且手部模型并非每帧运行，不能沿用上一次的跟踪结果，因此逐次独立检测
         self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
+            static_image_mode=gating_enabled,
             max_num_hands=2,
             min_detection_confidence=detection_threshold,
             min_tracking_confidence=0.5
@@ -28,6 +45,16 @@ class GestureDetector:
         self.last_gesture_time = 0  # 上次检测到手势的时间
         self.gesture_cooldown = 2  # 手势冷却时间（秒）
         
+        # 面部邻近门控
+        self.gating_enabled = gating_enabled
+        self.roi_scale = roi_scale
+        self.gate_threshold = gate_threshold
+        self.probe_interval = probe_interval
+        self._prev_gate_gray = None    # 上一次门控缩略图（灰度），用于运动检测
+        self._hand_in_roi = False      # 上一次是否在区域内检测到手（是则下次继续运行手部模型）
+        self._last_probe_time = 0.0    # 上一次运行手部模型的时间
+        self.gate_stats = {'hand_runs': 0, 'hand_skipped': 0}
+        
         print("✅ 手势检测器已初始化")
     
     def detect_gestures(self, frame, face_landmarks=None, draw_annotations=True):
@@ -47,41 +74,57 @@ class GestureDetector:
             if not has_face:
                 return "无", 0, frame
         
-        # 获取面部轮廓
-        face_oval = self.face_detector.get_face_oval(face_landmarks)
+        # 获取面部中心（归一化坐标）
+        face_center = self.face_detector.calculate_face_center(face_landmarks)
         
-        # 转换为RGB格式
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        # 仅在需要绘制时创建副本
+        annotated_frame = frame.copy() if draw_annotations else frame
         
-        # 处理图像检测手部
-        results = self.hands.process(rgb_frame)
-        
-        # 创建副本用于绘制
-        annotated_frame = frame.copy()
+        # 确定手部模型的运行区域：启用门控时只处理面部周围的扩展区域
+        h, w = frame.shape[:2]
+        face_roi = self._compute_face_roi(face_landmarks, frame.shape) if self.gating_enabled else None
+        if face_roi is not None:
+            roi, face_box = face_roi
+        else:
+            # 没有面部关键点时在整帧上运行（启用门控时按整帧做低频探测）
+            roi, face_box = (0, 0, w, h), None
+        x0, y0, x1, y1 = roi
         
         # 初始化手势结果
         gesture_type = "无"
         confidence = 0
         
+        results = None
+        if not self.gating_enabled or self._should_run_hands(frame, roi, face_box):
+            # 转换为RGB格式（仅转换区域内的图像）
+            rgb_roi = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2RGB)
+            
+            # 处理图像检测手部
+            results = self.hands.process(rgb_roi)
+            self._hand_in_roi = bool(results.multi_hand_landmarks)
+            self._last_probe_time = time.monotonic()
+            self.gate_stats['hand_runs'] += 1
+        else:
+            self.gate_stats['hand_skipped'] += 1
+        
         # 检查是否检测到手部
-        if results.multi_hand_landmarks:
+        if results is not None and results.multi_hand_landmarks:
+            # 区域内的归一化坐标换算回整帧归一化坐标
+            roi_offset = np.array([x0 / w, y0 / h], dtype=np.float32)
+            roi_scale = np.array([(x1 - x0) / w, (y1 - y0) / h], dtype=np.float32)
             for hand_landmarks in results.multi_hand_landmarks:
-                # 仅在需要时绘制手部关键点
+                # 仅在需要时绘制手部关键点（绘制在区域视图上，坐标自然对齐）
                 if draw_annotations:
                     self.mp_drawing = mp.solutions.drawing_utils
                     self.mp_drawing.draw_landmarks(
-                        annotated_frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
+                        annotated_frame[y0:y1, x0:x1], hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
                 
-                # 获取手部关键点坐标
-                h, w = frame.shape[:2]
-                hand_points = []
-                for landmark in hand_landmarks.landmark:
-                    x = int(landmark.x * w)
-                    y = int(landmark.y * h)
-                    hand_points.append((x, y))
+                # 获取手部关键点坐标（整帧归一化坐标数组）
+                hand_points = landmarks_to_array(hand_landmarks)
+                hand_points[:, :2] = hand_points[:, :2] * roi_scale + roi_offset
                 
                 # 检测手势类型
-                detected_gesture, conf = self._classify_gesture(hand_points, face_oval)
+                detected_gesture, conf = self._classify_gesture(hand_points, face_center, frame.shape)
                 
                 # 如果检测到的手势置信度更高，则更新结果
                 if conf > confidence:
@@ -107,26 +150,96 @@ class GestureDetector:
         
         return gesture_type, confidence, annotated_frame
     
-    def _classify_gesture(self, hand_points, face_oval):
+    def _compute_face_roi(self, face_landmarks, frame_shape):
+        """根据面部关键点计算手部检测区域
+        
+        Args:
+            face_landmarks: 面部关键点（归一化坐标数组）
+            frame_shape: 图像形状
+            
+        Returns:
+            tuple: (扩展后的区域 (x0, y0, x1, y1), 面部区域 (x0, y0, x1, y1))，均为像素坐标；
+                   没有关键点时返回None
+        """
+        if face_landmarks is None or len(face_landmarks) == 0:
+            return None
+        h, w = frame_shape[:2]
+        min_xy = face_landmarks[:, :2].min(axis=0)
+        max_xy = face_landmarks[:, :2].max(axis=0)
+        center = (min_xy + max_xy) / 2
+        half_size = (max_xy - min_xy) / 2
+        
+        face_box = self._clip_box(center - half_size, center + half_size, w, h)
+        roi = self._clip_box(center - half_size * self.roi_scale, center + half_size * self.roi_scale, w, h)
+        return roi, face_box
+    
+    @staticmethod
+    def _clip_box(min_xy, max_xy, w, h):
+        """将归一化区域换算为像素坐标并裁剪到画面内"""
+        x0 = int(np.clip(min_xy[0] * w, 0, w - 1))
+        y0 = int(np.clip(min_xy[1] * h, 0, h - 1))
+        x1 = int(np.clip(max_xy[0] * w, x0 + 1, w))
+        y1 = int(np.clip(max_xy[1] * h, y0 + 1, h))
+        return x0, y0, x1, y1
+    
+    def _should_run_hands(self, frame, roi, face_box):
+        """门控判断：是否有廉价信号表明手可能靠近面部
+        
+        依次检查：上一次检测到手（继续检测）、低频探测到期、
+        面部周围区域内同时满足肤色和运动的像素占比。
+        
+        Args:
+            frame: 输入图像帧
+            roi: 扩展后的面部区域（没有面部时为整帧）
+            face_box: 面部区域，没有面部时为None（不排除面部像素）
+            
+        Returns:
+            bool: 是否运行手部模型
+        """
+        if self._hand_in_roi:
+            return True
+        
+        x0, y0, x1, y1 = roi
+        small = cv2.resize(frame[y0:y1, x0:x1], self.GATE_SIZE, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        prev_gray, self._prev_gate_gray = self._prev_gate_gray, gray
+        
+        if time.monotonic() - self._last_probe_time >= self.probe_interval:
+            return True
+        if prev_gray is None:
+            return False
+        
+        # 肤色掩码，排除面部本身
+        skin = cv2.inRange(cv2.cvtColor(small, cv2.COLOR_BGR2YCrCb), self.SKIN_LOWER, self.SKIN_UPPER)
+        gate_w, gate_h = self.GATE_SIZE
+        sx, sy = gate_w / (x1 - x0), gate_h / (y1 - y0)
+        if face_box is not None:
+            fx0, fy0, fx1, fy1 = face_box
+            skin[int((fy0 - y0) * sy):int((fy1 - y0) * sy), int((fx0 - x0) * sx):int((fx1 - x0) * sx)] = 0
+        
+        # 运动掩码：与上一次缩略图的差异
+        motion = cv2.absdiff(gray, prev_gray) > 25
+        
+        moving_skin_ratio = np.count_nonzero(motion & (skin > 0)) / motion.size
+        return moving_skin_ratio > self.gate_threshold
+    
+    def _classify_gesture(self, hand_points, face_center, frame_shape):
         """分类手势类型
         
         Args:
-            hand_points: 手部关键点
-            face_oval: 面部轮廓关键点
+            hand_points: 手部关键点（归一化坐标数组）
+            face_center: 面部中心（归一化坐标）
+            frame_shape: 图像形状，用于换算像素距离阈值
             
         Returns:
             tuple: (手势类型, 置信度)
         """
-        if not hand_points or not face_oval:
+        if len(hand_points) == 0 or face_center is None:
             return "无", 0
         
-        # 计算手部中心点
-        hand_center_x = sum(point[0] for point in hand_points) / len(hand_points)
-        hand_center_y = sum(point[1] for point in hand_points) / len(hand_points)
-        
-        # 计算面部中心点
-        face_center_x = sum(point[0] for point in face_oval) / len(face_oval)
-        face_center_y = sum(point[1] for point in face_oval) / len(face_oval)
+        # 计算手部中心点和面部中心点（换算为像素坐标）
+        hand_center_x, hand_center_y = self.face_detector.to_pixels(hand_points[:, :2].mean(axis=0), frame_shape)
+        face_center_x, face_center_y = self.face_detector.to_pixels(face_center, frame_shape)
         
         # 计算手部与面部的距离
         distance = np.sqrt((hand_center_x - face_center_x)**2 + (hand_center_y - face_center_y)**2)
@@ -175,4 +288,5 @@ class GestureDetector:
     def close(self):
         """释放资源"""
         self.hands.close()
-        self.face_detector.close()
\ No newline at end of file
+        if self._owns_face_detector:
+            self.face_detector.close()
\ No newline at end of file
@@ -7,16 +7,15 @@ from .face_detector import FaceDetector
 class PoseDetector:
     """姿态检测器 - 检测头部姿态"""
     
-    def __init__(self):
-        """初始化姿态检测器"""
-        self.face_detector = FaceDetector()
+    def __init__(self, face_detector=None):
+        """初始化姿态检测器
         
-        # 定义用于姿态估计的关键点索引
-        self.CHIN = 152  # 下巴
-        self.LEFT_EYE_CORNER = 33  # 左眼角
-        self.RIGHT_EYE_CORNER = 362  # 右眼角
-        self.NOSE_TIP = 1  # 鼻尖
-        self.FOREHEAD = 10  # 额头
+        Args:
+            face_detector: 共享的面部检测器（可选，不提供则自行创建）
+        """
+        # 共享外部面部检测器时，由外部负责释放
+        self._owns_face_detector = face_detector is None
+        self.face_detector = face_detector if face_detector is not None else FaceDetector()
         
         # 状态跟踪
         self.pose_history = []  # 用于平滑姿态状态
@@ -24,46 +23,44 @@ class PoseDetector:
         
         print("✅ 姿态检测器已初始化")
     
-    def detect_pose(self, frame, draw_annotations=True):
+    def detect_pose(self, frame, face_landmarks=None, draw_annotations=True):
         """检测头部姿态
         
         Args:
             frame: 输入图像帧
+            face_landmarks: 面部关键点（可选，如果不提供会自动检测）
             draw_annotations: 是否绘制标注（默认True）
             
         Returns:
             tuple: (姿态状态, 偏转角度, 带标注的图像)
         """
-        # 使用面部检测器获取关键点
-        has_face, landmarks, annotated_frame = self.face_detector.detect(frame, draw_annotations)
+        if face_landmarks is None:
+            # 使用面部检测器获取关键点
+            has_face, landmarks, annotated_frame = self.face_detector.detect(frame, draw_annotations)
+        else:
+            # 复用本帧已有的关键点，避免重复推理
+            landmarks = face_landmarks
+            has_face = len(landmarks) > 0
+            annotated_frame = frame.copy() if draw_annotations else frame
         
         if not has_face:
             return "未检测到人脸", 0, annotated_frame
         
-        # 获取关键点
-        try:
-            chin = landmarks[self.CHIN]
-            left_eye_corner = landmarks[self.LEFT_EYE_CORNER]
-            right_eye_corner = landmarks[self.RIGHT_EYE_CORNER]
-            nose_tip = landmarks[self.NOSE_TIP]
-            forehead = landmarks[self.FOREHEAD]
-        except IndexError:
+        # 获取关键点（一次切片取出，转换为浮点像素坐标以沿用像素阈值）
+        pose_points = self.face_detector.get_pose_landmarks(landmarks)
+        if len(pose_points) == 0:
             return "关键点缺失", 0, annotated_frame
+        pose_pixels = self.face_detector.to_pixels(pose_points, frame.shape)
+        chin, left_eye_corner, right_eye_corner, nose_tip, forehead = pose_pixels
         
         # 计算头部偏转角度
-        # 1. 计算水平偏转（左右转头）
-        eye_center_x = (left_eye_corner[0] + right_eye_corner[0]) // 2
-        nose_offset_x = nose_tip[0] - eye_center_x
-        
-        # 2. 计算垂直偏转（抬头/低头）
-        eye_center_y = (left_eye_corner[1] + right_eye_corner[1]) // 2
-        nose_offset_y = nose_tip[1] - eye_center_y
+        eye_center = (left_eye_corner + right_eye_corner) / 2
+        # 1. 计算水平偏转（左右转头）和 2. 垂直偏转（抬头/低头）
+        nose_offset_x, nose_offset_y = nose_tip - eye_center
         
         # 3. 计算头部倾斜（歪头）
-        eye_line_angle = math.degrees(math.atan2(
-            right_eye_corner[1] - left_eye_corner[1],
-            right_eye_corner[0] - left_eye_corner[0]
-        ))
+        eye_vector = right_eye_corner - left_eye_corner
+        eye_line_angle = math.degrees(math.atan2(eye_vector[1], eye_vector[0]))
         
         # 判断姿态状态
         pose_status = self._evaluate_pose(nose_offset_x, nose_offset_y, eye_line_angle)
@@ -79,6 +76,11 @@ class PoseDetector:
         # 在画面上绘制关键点和姿态指示
         # 仅在需要时绘制关键点和连接线
         if draw_annotations:
+            # OpenCV绘制需要整数像素坐标
+            chin, left_eye_corner, right_eye_corner, nose_tip, forehead = (
+                tuple(point) for point in pose_pixels.astype(int).tolist())
+            eye_center = tuple(eye_center.astype(int).tolist())
+            
             # 绘制关键点
             cv2.circle(annotated_frame, chin, 3, (0, 255, 255), -1)
             cv2.circle(annotated_frame, left_eye_corner, 3, (255, 0, 0), -1)
@@ -88,7 +90,7 @@ class PoseDetector:
             
             # 绘制连接线
             cv2.line(annotated_frame, left_eye_corner, right_eye_corner, (255, 0, 0), 1)
-            cv2.line(annotated_frame, (eye_center_x, eye_center_y), (nose_tip[0], nose_tip[1]), (0, 0, 255), 1)
+            cv2.line(annotated_frame, eye_center, nose_tip, (0, 0, 255), 1)
             
             # 显示角度信息
             cv2.putText(annotated_frame, f"倾斜: {eye_line_angle:.1f}°", 
@@ -151,4 +153,5 @@ class PoseDetector:
     
     def close(self):
         """释放资源"""
-        self.face_detector.close()
\ No newline at end of file
+        if self._owns_face_detector:
+            self.face_detector.close()
\ No newline at end of file
@@ -0,0 +1,206 @@
+# src/logging_utils.py - 日志配置：按子系统分级、异步输出、重复日志限流、可选JSON格式
+"""
+所有模块通过 get_logger("子系统") 获取日志器（名称为 interview.子系统），首次调用时按环境变量完成配置：
+
+    INTERVIEW_LOG_LEVEL       默认级别，默认 INFO；逐帧代码只输出 DEBUG 日志，默认不输出
+    INTERVIEW_LOG_LEVELS      各子系统级别，如 "camera=DEBUG,voice=WARNING"
+    INTERVIEW_LOG_FORMAT      text（默认）或 json（每行一个JSON对象）
+    INTERVIEW_LOG_RATE_LIMIT  逐帧日志的最短输出间隔（秒），默认 5，0 表示不限流
+
+日志记录只放入内存队列，由后台线程写到控制台，调用方不会因控制台输出变慢而阻塞。
+只有带 extra=PER_FRAME 标记的逐帧日志会被限流，其余日志全部输出。
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+
+# 所有子系统日志器的公共前缀
+ROOT_LOGGER_NAME = "interview"
+
+LOG_LEVEL = os.environ.get('INTERVIEW_LOG_LEVEL', 'INFO').upper()
+LOG_LEVELS = os.environ.get('INTERVIEW_LOG_LEVELS', '')
+LOG_FORMAT = os.environ.get('INTERVIEW_LOG_FORMAT', 'text').lower()
+LOG_RATE_LIMIT = float(os.environ.get('INTERVIEW_LOG_RATE_LIMIT', 5.0))
+
+_TEXT_FORMAT = "%(asctime)s %(levelname)-7s [%(subsystem)s] %(message)s"
+
+# LogRecord 自带的属性，JSON输出时其余属性视为调用方通过 extra 传入的字段
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'subsystem',
+                                                                                'per_frame'}
+
+# 逐帧代码输出日志时传入 extra=PER_FRAME，同一模板的日志按 INTERVIEW_LOG_RATE_LIMIT 限流
+PER_FRAME = {'per_frame': True}
+
+_lock = threading.Lock()
+_listener = None
+_configured_levels = []  # 单独设置过级别的子系统日志器
+
+
+class SubsystemFilter(logging.Filter):
+    """为日志记录添加 subsystem 字段（日志器名称去掉公共前缀）"""
+
+    def filter(self, record):
+        name = record.name
+        if name.startswith(ROOT_LOGGER_NAME + "."):
+            name = name[len(ROOT_LOGGER_NAME) + 1:]
+        record.subsystem = name
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """逐帧日志限流 - 带 PER_FRAME 标记的日志按模板在间隔内只输出一次，下一次输出时附带省略的条数
+
+    逐帧日志应使用 logger.warning("读取失败: %s", e, extra=PER_FRAME) 这样的参数形式，使同一条语句的模板保持不变。
+    其他日志（如不同会话的事件、每条语音的统计）即使模板相同也各自输出，不受限流影响。
+    """
+
+    def __init__(self, interval=LOG_RATE_LIMIT):
+        """初始化过滤器
+
+        Args:
+            interval: 相同日志的最短输出间隔（秒）
+        """
+        super().__init__()
+        self.interval = interval
+        self._last = {}  # (日志器, 级别, 模板) -> [上次输出时间, 省略条数]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if self.interval <= 0 or not getattr(record, 'per_frame', False):
+            return True
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._last.get(key)
+            if entry is not None and now - entry[0] < self.interval:
+                entry[1] += 1
+                return False
+            suppressed = entry[1] if entry is not None else 0
+            self._last[key] = [now, 0]
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """JSON格式 - 每条日志输出为一行JSON，便于采集和检索"""
+
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'subsystem': getattr(record, 'subsystem', record.name),
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRS and not name.startswith('_'):
+                data[name] = value
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """文本格式 - 被限流省略过的日志在末尾注明省略条数"""
+
+    def format(self, record):
+        text = super().format(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            text += f"（已省略 {suppressed} 条重复日志）"
+        return text
+
+
+def parse_levels(spec):
+    """解析子系统级别配置
+
+    Args:
+        spec: 形如 "camera=DEBUG,voice=WARNING" 的字符串
+
+    Returns:
+        dict: 子系统 -> 级别名称
+    """
+    levels = {}
+    for item in spec.split(','):
+        if '=' in item:
+            name, level = item.split('=', 1)
+            if name.strip():
+                levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(level=None, levels=None, json_format=None, rate_limit=None, stream=None):
+    """配置日志（重复调用时先撤销之前的配置）
+
+    Args:
+        level: 默认级别，默认读取 INTERVIEW_LOG_LEVEL
+        levels: 各子系统级别（dict），默认读取 INTERVIEW_LOG_LEVELS
+        json_format: 是否输出JSON，默认读取 INTERVIEW_LOG_FORMAT
+        rate_limit: 逐帧日志的最短输出间隔（秒），默认读取 INTERVIEW_LOG_RATE_LIMIT
+        stream: 输出流，默认为标准输出
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+        root = logging.getLogger(ROOT_LOGGER_NAME)
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.setLevel(level or LOG_LEVEL)
+        root.propagate = False
+        while _configured_levels:
+            _configured_levels.pop().setLevel(logging.NOTSET)
+        for name, sub_level in (parse_levels(LOG_LEVELS) if levels is None else levels).items():
+            logger = logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+            logger.setLevel(sub_level)
+            _configured_levels.append(logger)
+
+        if json_format is None:
+            json_format = LOG_FORMAT == 'json'
+        console = logging.StreamHandler(stream or sys.stdout)
+        console.setFormatter(JSONFormatter() if json_format else TextFormatter(_TEXT_FORMAT, datefmt="%H:%M:%S"))
+
+        # 调用方只把记录放入队列，由监听线程格式化并写出
+        queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+        queue_handler.addFilter(RateLimitFilter(LOG_RATE_LIMIT if rate_limit is None else rate_limit))
+        queue_handler.addFilter(SubsystemFilter())
+        root.addHandler(queue_handler)
+
+        _listener = logging.handlers.QueueListener(queue_handler.queue, console, respect_handler_level=True)
+        _listener.start()
+
+
+def flush_logging():
+    """停止监听线程并写出队列中剩余的日志（进程退出时自动调用）"""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def get_logger(subsystem):
+    """获取子系统日志器，尚未配置日志时按环境变量完成配置
+
+    Args:
+        subsystem: 子系统名称，如 camera、voice、session、web
+
+    Returns:
+        logging.Logger: 日志器
+    """
+    if _listener is None and not logging.getLogger(ROOT_LOGGER_NAME).handlers:
+        setup_logging()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{subsystem}")
+
+
+atexit.register(flush_logging)
@@ -3,12 +3,19 @@ import cv2
 import pyttsx3
 import numpy as np
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # 导入自定义模块
 from camera_utils import CameraManager
 from voice_utils import VoiceFeedback
 from ui_manager import UIManager
+from attention_history import AttentionHistory
+from logging_utils import get_logger, PER_FRAME
+from metrics import DETECTOR_SECONDS
+from tracing import Tracer
+
+logger = get_logger("coach")
 
 # 导入检测模块
 try:
@@ -17,18 +24,48 @@ try:
     from detection.pose_detector import PoseDetector
     from detection.gesture_detector import GestureDetector
     DETECTION_MODULES_AVAILABLE = True
-    print("✅ 检测模块加载成功")
+    logger.info("✅ 检测模块加载成功")
 except ImportError as e:
     DETECTION_MODULES_AVAILABLE = False
-    print(f"⚠️ 检测模块加载失败: {e}")
-    print("将使用模拟数据运行")
+    logger.warning("⚠️ 检测模块加载失败: %s，将使用模拟数据运行", e)
+
+# 各检测器的默认运行频率（Hz），0或None表示每帧运行
+# 手部和姿态变化远慢于视线，以较低频率运行，其间复用上一次结果
+DEFAULT_DETECTION_RATES = {
+    'face': 15,     # FaceMesh推理
+    'gaze': 15,     # 视线几何计算
+    'pose': 5,      # 姿态几何计算
+    'gesture': 3    # MediaPipe Hands推理
+}
+
+# 各类语音反馈的最短间隔（秒），定期鼓励的间隔（秒）
+FEEDBACK_INTERVALS = {
+    'face': 1.0,
+    'gaze': 1.5,
+    'pose': 1.5,
+    'gesture': 1.5
+}
+ENCOURAGEMENT_INTERVAL = 10.0
+
 
 class InterviewCoachV2:
     """面试助手 - 版本2.0（集成检测功能）"""
 
-    def __init__(self, use_ui=True):
+    def __init__(self, use_ui=True, detection_rates=None, parallel_workers=0, low_latency_camera=False):
+        """初始化面试助手
+        
+        Args:
+            use_ui: 是否使用本地UI窗口
+            detection_rates: 各检测器运行频率（Hz）的覆盖值
+            parallel_workers: 并行检测线程数上限，0表示在当前线程依次运行所有检测器
+            low_latency_camera: 摄像头是否使用低延迟模式（后台抓帧，只分析最新一帧）
+        """
         # 初始化摄像头管理器
-        self.camera = CameraManager(camera_id=0, resolution=(640, 480), fps=30)
+        self.camera = CameraManager(camera_id=0, resolution=(640, 480), fps=30,
+                                    low_latency=low_latency_camera)
+        
+        # 分阶段耗时追踪（默认关闭，可在运行时开启）
+        self.tracer = Tracer()
         
         # 初始化语音反馈系统
         self.voice = VoiceFeedback()
@@ -43,22 +80,39 @@ class InterviewCoachV2:
         # 初始化检测器（如果模块可用）
         self.detection_enabled = DETECTION_MODULES_AVAILABLE
         if self.detection_enabled:
+            # 所有检测器共享同一个面部检测器，每帧只做一次FaceMesh推理
             self.face_detector = FaceDetector()
-            self.gaze_detector = GazeDetector()
-            self.pose_detector = PoseDetector()
-            self.gesture_detector = GestureDetector()
-            print("✅ 所有检测器已初始化")
+            self.gaze_detector = GazeDetector(face_detector=self.face_detector)
+            self.pose_detector = PoseDetector(face_detector=self.face_detector)
+            self.gesture_detector = GestureDetector(face_detector=self.face_detector)
+            logger.info("✅ 所有检测器已初始化")
         else:
-            print("⚠️ 检测器不可用，将使用模拟数据")
+            logger.warning("⚠️ 检测器不可用，将使用模拟数据")
 
         # 状态变量
         self.is_running = False
         self.start_time = None
         self.frame_count = 0
-        self.last_speak_time = 0
+        
+        # 检测调度：每个检测器按各自频率运行
+        self.detection_rates = dict(DEFAULT_DETECTION_RATES)
+        if detection_rates:
+            self.detection_rates.update(detection_rates)
+        self._next_run_time = {}
+        self._landmarks_version = 0      # 每次FaceMesh推理后递增
+        self._analyzed_version = {}      # 各几何检测器上次使用的关键点版本
+        self._reset_schedule()
+        
+        # 并行检测：MediaPipe推理时释放GIL，手部模型可与面部分析在不同线程中同时运行
+        self.parallel_workers = max(0, int(parallel_workers or 0))
+        self._executor = None
+        if self.detection_enabled and self.parallel_workers > 0:
+            self._executor = ThreadPoolExecutor(max_workers=self.parallel_workers,
+                                                thread_name_prefix="detector")
         
         # 检测状态
         self.face_detected = False
+        self.face_landmarks = None  # 最近一帧的面部关键点，供各检测器和UI复用
         self.gaze_status = "正常"
         self.pose_status = "正常"
         self.gesture_status = "无"
@@ -69,26 +123,23 @@ class InterviewCoachV2:
         self.pose_issue_count = 0
         self.gesture_count = 0
         
-        # 注意力历史记录
-        self.attention_history = []
+        # 注意力历史记录（列式环形缓冲区，最近1000条原始记录 + 1秒/10秒分层汇总）
+        self.attention_history = AttentionHistory(capacity=1000)
 
-        print("✅ 面试助手v2.0已初始化")
+        logger.info("✅ 面试助手v2.0已初始化")
         print("Tips: Press 's' to start/stop, 'q' to exit, 't' to test voice")
 
     def speak(self, text, urgent=False):
-        """语音输出（带冷却时间）"""
-        current_time = datetime.now().timestamp()
+        """语音输出（不阻塞，冷却时间由语音反馈系统统一控制）
 
-        # 冷却时间：紧急提示2秒，普通提示4秒
-        cooldown = 2.0 if urgent else 4.0
+        Args:
+            text: 要说的文本
+            urgent: 是否为紧急提示
 
-        if current_time - self.last_speak_time > cooldown:
-            # 使用self.voice.speak()方法替代直接访问self.engine
-            success = self.voice.speak(text, urgent=urgent, cooldown=cooldown)
-            if success:
-                self.last_speak_time = current_time
-                return True
-        return False
+        Returns:
+            SpeechRequest: 语音请求句柄
+        """
+        return self.voice.speak(text, urgent=urgent)
 
     def draw_ui(self, frame):
         """绘制UI界面
@@ -128,13 +179,15 @@ class InterviewCoachV2:
         
         # 如果检测到面部，绘制关键点和视线方向
         if self.face_detected and self.detection_enabled:
-            # 获取面部关键点
-            has_face, landmarks, _ = self.face_detector.detect(frame)
-            if has_face and landmarks:
-                frame = self.ui.draw_face_landmarks(frame, landmarks)
+            # 复用检测阶段得到的面部关键点，避免重复推理
+            landmarks = self.face_landmarks
+            if landmarks is not None and len(landmarks) > 0:
+                frame = self.ui.draw_face_landmarks(
+                    frame, self.face_detector.to_pixels(landmarks, frame.shape))
             
             # 获取视线检测结果
-            is_looking, offset_ratio, annotated_frame = self.gaze_detector.detect_gaze(frame)
+            is_looking, offset_ratio, annotated_frame = self.gaze_detector.detect_gaze(
+                frame, face_landmarks=landmarks)
             if is_looking is not None:
                 # 使用带标注的图像
                 frame = annotated_frame
@@ -197,6 +250,7 @@ class InterviewCoachV2:
                     self.start_time = datetime.now()
                     self._reset_statistics()
                     self.voice.start_session()
+                    self.start_encouragement()
                     print("⏺️ Started recording...")
                 else:
                     self.voice.end_session()
@@ -208,12 +262,14 @@ class InterviewCoachV2:
             
             # 'q'键：退出
             elif key == ord('q'):
-                self.voice.end_session()
+                # 等待结束语播放完再退出
+                self.voice.end_session().wait(timeout=10)
                 break
         
         # 清理资源
         self.camera.close()
         self.ui.destroy_window()
+        self.close()
         print("👋 Program exited")
     
     def _update_detection(self, frame):
@@ -227,9 +283,35 @@ class InterviewCoachV2:
             self._simulate_detection()
             return
         
-        # 面部检测 - 禁用绘制以提高性能
-        has_face, landmarks, _ = self.face_detector.detect(frame, draw_annotations=False)
-        self.face_detected = has_face
+        now = time.monotonic()
+        ran_heavy = False
+        gesture_future = None
+        
+        # 并行模式下，手势检测先于FaceMesh提交到线程池，使用上一帧的面部关键点（只滞后一帧，
+        # 对3Hz的手势检测可以忽略），两次模型推理真正重叠；结果在本线程汇合后再写入检测状态
+        if (self._executor and self.face_detected and self.face_landmarks is not None
+                and self._is_detector_due('gesture', now)):
+            gesture_future = self._executor.submit(self._detect_gesture, frame, self.face_landmarks)
+            self._mark_detector_run('gesture', now)
+            self._gesture_deferred = False
+        
+        # 面部检测 - 禁用绘制以提高性能；所有检测器共享本次FaceMesh推理结果
+        if self._is_detector_due('face', now):
+            start = time.perf_counter()
+            trace_start = self.tracer.begin()
+            has_face, landmarks, _ = self.face_detector.detect(frame, draw_annotations=False)
+            self.tracer.end("face_mesh", trace_start)
+            DETECTOR_SECONDS.observe(time.perf_counter() - start, detector="face_mesh")
+            if has_face and not self.face_detected:
+                # 面部重新出现时立即刷新其余检测器，避免沿用"未检测到面部"状态
+                for name in ('gaze', 'pose', 'gesture'):
+                    self._next_run_time[name] = now
+            self.face_detected = has_face
+            self.face_landmarks = landmarks if has_face else None
+            self._landmarks_version += 1
+            self._mark_detector_run('face', now)
+            ran_heavy = True
+        landmarks = self.face_landmarks
         
         # 检查面部检测结果和关键点
         if not self.face_detected or landmarks is None:
@@ -238,40 +320,196 @@ class InterviewCoachV2:
             self.pose_status = "未检测到面部"
             self.gesture_status = "未检测到面部"
             self.attention_score = max(0, self.attention_score - 2)
+            self._clear_issue_flags()
+            # 等待已提交的手势检测结束再处理下一帧，面部已丢失，结果丢弃
+            self._join_detection(gesture_future)
             return
         
+        # 视线和姿态只在有新关键点时重新计算，否则复用上一次结果
+        if self._is_geometry_due('gaze', now):
+            self._run_gaze_detection(frame, landmarks)
+            self._mark_detector_run('gaze', now)
+        
+        if self._is_geometry_due('pose', now):
+            self._run_pose_detection(frame, landmarks)
+            self._mark_detector_run('pose', now)
+        
+        # 串行模式下手势检测与FaceMesh错开到不同帧：本帧已做过推理时顺延一帧（最多顺延一次）
+        if gesture_future is not None:
+            result = self._join_detection(gesture_future)
+            if result is not None:
+                self._apply_gesture_result(*result)
+        elif self._is_detector_due('gesture', now):
+            if ran_heavy and not self._gesture_deferred:
+                self._gesture_deferred = True
+            else:
+                self._run_gesture_detection(frame, landmarks)
+                self._mark_detector_run('gesture', now)
+                self._gesture_deferred = False
+        
+        # 按帧统计问题次数（复用的结果同样计入）
+        self.gaze_away_count += self._issue_flags['gaze']
+        self.pose_issue_count += self._issue_flags['pose']
+        self.gesture_count += self._issue_flags['gesture']
+        
+        # 计算注意力分数
+        with self.tracer.span("attention_score"):
+            self._calculate_attention_score()
+    
+    def _run_gaze_detection(self, frame, landmarks):
+        """运行视线检测并更新状态"""
+        start = time.perf_counter()
+        trace_start = self.tracer.begin()
         try:
             # 视线检测（需要有效的面部关键点）- 禁用绘制
-            is_looking, offset_ratio, _ = self.gaze_detector.detect_gaze(frame, draw_annotations=False)
+            is_looking, offset_ratio, _ = self.gaze_detector.detect_gaze(
+                frame, face_landmarks=landmarks, draw_annotations=False)
             self.gaze_status = self.gaze_detector.get_gaze_status_text(is_looking, offset_ratio)
-            if self.gaze_status != "正常":
-                self.gaze_away_count += 1
+            self._issue_flags['gaze'] = self.gaze_status != "正常"
         except Exception as e:
-            print(f"视线检测失败: {e}")
+            logger.warning("视线检测失败: %s", e, extra=PER_FRAME)
             self.gaze_status = "检测失败"
-        
+            self._issue_flags['gaze'] = False
+        self.tracer.end("gaze", trace_start)
+        DETECTOR_SECONDS.observe(time.perf_counter() - start, detector="gaze")
+    
+    def _run_pose_detection(self, frame, landmarks):
+        """运行姿态检测并更新状态"""
+        start = time.perf_counter()
+        trace_start = self.tracer.begin()
         try:
             # 姿态检测 - 禁用绘制
-            pose_status, pose_angle, _ = self.pose_detector.detect_pose(frame, draw_annotations=False)
+            pose_status, pose_angle, _ = self.pose_detector.detect_pose(
+                frame, face_landmarks=landmarks, draw_annotations=False)
             self.pose_status = self.pose_detector.get_pose_status_text(pose_status)
-            if self.pose_status != "良好":
-                self.pose_issue_count += 1
+            self._issue_flags['pose'] = self.pose_status != "良好"
         except Exception as e:
-            print(f"姿态检测失败: {e}")
+            logger.warning("姿态检测失败: %s", e, extra=PER_FRAME)
             self.pose_status = "检测失败"
+            self._issue_flags['pose'] = False
+        self.tracer.end("pose", trace_start)
+        DETECTOR_SECONDS.observe(time.perf_counter() - start, detector="pose")
+    
+    def _run_gesture_detection(self, frame, landmarks):
+        """运行手势检测并更新状态"""
+        self._apply_gesture_result(*self._detect_gesture(frame, landmarks))
+    
+    def _detect_gesture(self, frame, landmarks):
+        """运行手势检测，只返回结果不修改检测状态（可在线程池中调用）
         
+        Args:
+            frame: 图像帧
+            landmarks: 面部关键点（并行模式下为上一帧的结果）
+            
+        Returns:
+            tuple: (手势状态文本, 是否有小动作)
+        """
+        start = time.perf_counter()
+        trace_start = self.tracer.begin()
         try:
             # 手势检测 - 禁用绘制
-            gesture_type, confidence, _ = self.gesture_detector.detect_gestures(frame, draw_annotations=False)
-            self.gesture_status = self.gesture_detector.get_gesture_status_text(gesture_type, confidence)
-            if self.gesture_status != "无小动作":
-                self.gesture_count += 1
+            gesture_type, confidence, _ = self.gesture_detector.detect_gestures(
+                frame, face_landmarks=landmarks, draw_annotations=False)
+            status = self.gesture_detector.get_gesture_status_text(gesture_type, confidence)
+            result = (status, status != "无小动作")
         except Exception as e:
-            print(f"手势检测失败: {e}")
-            self.gesture_status = "检测失败"
+            logger.warning("手势检测失败: %s", e, extra=PER_FRAME)
+            result = ("检测失败", False)
+        self.tracer.end("hands", trace_start)
+        DETECTOR_SECONDS.observe(time.perf_counter() - start, detector="hands")
+        return result
+    
+    def _apply_gesture_result(self, status, has_issue):
+        """写入手势检测结果（在处理帧的线程中调用）
         
-        # 计算注意力分数
-        self._calculate_attention_score()
+        Args:
+            status: 手势状态文本
+            has_issue: 是否有小动作
+        """
+        self.gesture_status = status
+        self._issue_flags['gesture'] = has_issue
+    
+    def _join_detection(self, future):
+        """等待线程池中的检测任务完成（每帧汇合一次结果）
+        
+        Args:
+            future: 检测任务，为None时直接返回
+            
+        Returns:
+            object: 任务的返回值，任务失败或为None时返回None
+        """
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            logger.warning("并行检测任务失败: %s", e, extra=PER_FRAME)
+            return None
+    
+    def close(self):
+        """释放并行检测线程池和语音工作线程"""
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.voice.close()
+    
+    def _clear_issue_flags(self):
+        """清除各检测器的问题标记（面部丢失或重置时调用）"""
+        self._issue_flags = {'gaze': False, 'pose': False, 'gesture': False}
+    
+    def set_detection_rate(self, name, rate):
+        """设置单个检测器的运行频率
+        
+        Args:
+            name: 检测器名称（face、gaze、pose、gesture）
+            rate: 运行频率（Hz），0或None表示每帧运行
+        """
+        if name not in DEFAULT_DETECTION_RATES:
+            raise ValueError(f"未知的检测器: {name}")
+        self.detection_rates[name] = rate
+        self._reset_schedule()
+        logger.info("检测频率已更新: %s = %s Hz", name, rate)
+    
+    def _detector_period(self, name):
+        """获取检测器的运行周期（秒），每帧运行时返回0"""
+        rate = self.detection_rates.get(name)
+        return 1.0 / rate if rate else 0.0
+    
+    def _reset_schedule(self):
+        """重置检测调度，并错开各检测器的相位，避免同一帧运行所有模型"""
+        now = time.monotonic()
+        face_period = self._detector_period('face')
+        self._next_run_time = {
+            'face': now,
+            'gaze': now,
+            # 姿态和手势分别错开半个周期和半个面部检测周期
+            'pose': now + self._detector_period('pose') / 2,
+            'gesture': now + face_period / 2
+        }
+        self._analyzed_version = {'gaze': -1, 'pose': -1}
+        self._gesture_deferred = False
+        self._clear_issue_flags()
+    
+    def _is_detector_due(self, name, now):
+        """检测器是否到了运行时间"""
+        return now >= self._next_run_time.get(name, 0.0)
+    
+    def _is_geometry_due(self, name, now):
+        """几何检测器是否需要运行：到达运行时间且有新的关键点"""
+        if self._analyzed_version.get(name) == self._landmarks_version:
+            return False
+        return self._is_detector_due(name, now)
+    
+    def _mark_detector_run(self, name, now):
+        """记录检测器已运行，并安排下一次运行时间"""
+        period = self._detector_period(name)
+        if name in self._analyzed_version:
+            self._analyzed_version[name] = self._landmarks_version
+        # 以计划时间为基准推进，避免累积漂移；落后过多时重新对齐到当前时间
+        next_time = self._next_run_time.get(name, now) + period
+        if next_time <= now:
+            next_time = now + period
+        self._next_run_time[name] = next_time
     
     def _simulate_detection(self):
         """模拟检测结果（当检测模块不可用时）"""
@@ -380,64 +618,54 @@ class InterviewCoachV2:
         # 限制分数范围
         self.attention_score = max(0, min(100, self.attention_score))
         
-        # 记录历史分数（用于数据分析）
+        # 记录历史分数（用于数据分析），缓冲区写满后自动覆盖最早的记录
         current_time = datetime.now().timestamp()
-        if not hasattr(self, 'attention_history'):
-            self.attention_history = []
-        self.attention_history.append({
-            'timestamp': current_time,
-            'score': self.attention_score,
-            'face_score': face_score,
-            'gaze_score': gaze_score,
-            'posture_score': posture_score,
-            'gesture_score': gesture_score
-        })
-        
-        # 限制历史记录长度（最多保存1000条）
-        if len(self.attention_history) > 1000:
-            self.attention_history.pop(0)
+        self.attention_history.append(current_time, self.attention_score, face_score,
+                                      gaze_score, posture_score, gesture_score)
     
     def _update_feedback(self):
-        """更新语音反馈"""
-        # 添加反馈计数器，控制反馈频率
-        if not hasattr(self, 'feedback_counters'):
-            self.feedback_counters = {
-                'face': 0,
-                'gaze': 0,
-                'pose': 0,
-                'gesture': 0,
-                'encouragement': 0
-            }
+        """更新语音反馈（各类反馈的频率由语音反馈系统的冷却计时控制，与帧率无关）"""
+        voice = self.voice
+        
+        # 如果没有检测到面部，提醒用户
+        if not self.face_detected:
+            self._give_feedback('face', lambda: voice.speak(
+                "请调整位置，确保面部在摄像头范围内", urgent=True, category="face"))
+            return
+        
+        # 根据视线状态提供反馈
+        if self.gaze_status != "正常":
+            self._give_feedback('gaze', lambda: voice.give_gaze_feedback(urgent=True))
         
-        # 增加所有计数器
-        for key in self.feedback_counters:
-            self.feedback_counters[key] += 1
+        # 根据姿态状态提供反馈
+        if self.pose_status != "良好":
+            self._give_feedback('pose', lambda: voice.give_pose_feedback(self.pose_status, urgent=True))
+        
+        # 根据手势状态提供反馈
+        if self.gesture_status != "无小动作":
+            self._give_feedback('gesture', lambda: voice.give_gesture_feedback(self.gesture_status, urgent=True))
+    
+    def _give_feedback(self, category, give):
+        """某类反馈已过冷却期时给出提示，提示被语音队列接受后才开始新的冷却期
         
-        # 如果没有检测到面部，提醒用户（每30帧一次）
-        if not self.face_detected and self.feedback_counters['face'] % 30 == 0:
-            self.voice.speak("请调整位置，确保面部在摄像头范围内", urgent=True)
-            self.feedback_counters['face'] = 0
+        Args:
+            category: 反馈类别
+            give: 提交语音提示的函数，返回 SpeechRequest
+        """
+        voice = self.voice
+        if not voice.feedback_ready(category):
             return
+        request = give()
+        if request.status != 'dropped':
+            voice.start_feedback_cooldown(category, FEEDBACK_INTERVALS[category])
+    
+    def start_encouragement(self, interval=ENCOURAGEMENT_INTERVAL):
+        """开始定期鼓励：面试进行中且注意力分数较高时给出鼓励
         
-        # 根据视线状态提供反馈（每45帧一次）
-        if self.gaze_status != "正常" and self.feedback_counters['gaze'] % 45 == 0:
-            self.voice.give_gaze_feedback(urgent=True)
-            self.feedback_counters['gaze'] = 0
-        
-        # 根据姿态状态提供反馈（每45帧一次）
-        if self.pose_status != "良好" and self.feedback_counters['pose'] % 45 == 0:
-            self.voice.give_pose_feedback(self.pose_status, urgent=True)
-            self.feedback_counters['pose'] = 0
-        
-        # 根据手势状态提供反馈（每45帧一次）
-        if self.gesture_status != "无小动作" and self.feedback_counters['gesture'] % 45 == 0:
-            self.voice.give_gesture_feedback(self.gesture_status, urgent=True)
-            self.feedback_counters['gesture'] = 0
-        
-        # 如果注意力分数较高，提供鼓励（每300帧一次）
-        if self.attention_score >= 85 and self.feedback_counters['encouragement'] % 300 == 0:
-            self.voice.give_encouragement(urgent=False)
-            self.feedback_counters['encouragement'] = 0
+        Args:
+            interval: 间隔时间（秒）
+        """
+        self.voice.start_encouragement(interval, condition=lambda: self.is_running and self.attention_score >= 85)
     
     def get_session_time(self):
         """获取会话时间"""
@@ -455,7 +683,8 @@ class InterviewCoachV2:
             检测结果字典
         """
         # 更新检测结果
-        self._update_detection(frame)
+        with self.tracer.span("update_detection"):
+            self._update_detection(frame)
         
         # 返回检测结果
         return {
@@ -476,41 +705,30 @@ class InterviewCoachV2:
         self.pose_issue_count = 0
         self.gesture_count = 0
         self.attention_score = 100.0  # 初始分数设为满分
-        self.attention_history = []  # 重置历史记录
+        self.attention_history.clear()  # 重置历史记录
+        self._reset_schedule()  # 重新错开各检测器的运行相位
         self.attention_states = {
             'high': 0,  # 高度集中（85-100分）
             'medium': 0,  # 中等集中（60-84分）
             'low': 0,  # 注意力分散（0-59分）
             'face_missing': 0  # 未检测到面部
         }
-        print("Statistics have been reset")
+        logger.info("Statistics have been reset")
     
     def save_final_state(self):
         """保存最终状态，确保所有数据都已正确处理"""
         try:
-            # 确保注意力历史记录已初始化
-            if not hasattr(self, 'attention_history'):
-                self.attention_history = []
-            
             # 打印最终状态摘要
-            print(f"📊 保存最终状态: ")
-            print(f"   - 总记录数: {len(self.attention_history)}")
-            print(f"   - 视线离开次数: {self.gaze_away_count}")
-            print(f"   - 姿态问题次数: {self.pose_issue_count}")
-            print(f"   - 手势次数: {self.gesture_count}")
-            print(f"   - 面试时长: {self.get_session_time()}秒")
+            logger.info("📊 保存最终状态: 总记录数 %d, 视线离开次数 %d, 姿态问题次数 %d, 手势次数 %d, 面试时长 %.1f秒",
+                        len(self.attention_history), self.gaze_away_count, self.pose_issue_count,
+                        self.gesture_count, self.get_session_time())
             
         except Exception as e:
-            print(f"❌ 保存最终状态时出错: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ 保存最终状态时出错: %s", e)
     
     def get_attention_analysis(self):
         """获取注意力分析报告"""
-        print(f"📊 get_attention_analysis 被调用")
-        print(f"   - attention_history 存在: {hasattr(self, 'attention_history')}")
-        if hasattr(self, 'attention_history'):
-            print(f"   - attention_history 长度: {len(self.attention_history)}")
+        logger.debug("📊 get_attention_analysis 被调用，attention_history 长度: %d", len(self.attention_history))
         
         # 初始化注意力状态分布
         attention_states = {
@@ -528,42 +746,26 @@ class InterviewCoachV2:
         avg_gesture = 0
         final_attention_score = self.attention_score
         
-        # 统计注意力状态分布和计算平均值
-        if hasattr(self, 'attention_history') and self.attention_history:
-            attention_history = self.attention_history
-            total_records = len(attention_history)
-            print(f"   - 处理 {total_records} 条记录")
-            
-            # 统计注意力状态
-            for record in attention_history:
-                score = record['score']
-                if score >= 85:
-                    attention_states['high'] += 1
-                elif score >= 60:
-                    attention_states['medium'] += 1
-                else:
-                    attention_states['low'] += 1
-                
-                # 统计未检测到面部的情况
-                if record['face_score'] == 0:
-                    attention_states['face_missing'] += 1
+        # 注意力状态分布和平均值来自整个会话的增量统计，查询为O(1)，面试进行中也可实时获取
+        totals = self.attention_history.totals
+        if totals.count:
+            total_records = totals.count
+            logger.debug("   - 处理 %d 条记录", total_records)
             
-            # 计算各项平均分
-            face_scores = [record['face_score'] for record in attention_history]
-            gaze_scores = [record['gaze_score'] for record in attention_history]
-            posture_scores = [record['posture_score'] for record in attention_history]
-            gesture_scores = [record['gesture_score'] for record in attention_history]
+            # 注意力状态分布（含未检测到面部的次数）
+            attention_states.update(totals.state_counts())
             
-            # 避免除以零的异常
-            avg_face = sum(face_scores) / len(face_scores) if len(face_scores) > 0 else 0
-            avg_gaze = sum(gaze_scores) / len(gaze_scores) if len(gaze_scores) > 0 else 0
-            avg_posture = sum(posture_scores) / len(posture_scores) if len(posture_scores) > 0 else 0
-            avg_gesture = sum(gesture_scores) / len(gesture_scores) if len(gesture_scores) > 0 else 0
+            # 各项平均分
+            summary = totals.summary()
+            avg_face = summary['face_score']['mean']
+            avg_gaze = summary['gaze_score']['mean']
+            avg_posture = summary['posture_score']['mean']
+            avg_gesture = summary['gesture_score']['mean']
             
             # 重新计算最终注意力分数（基于所有数据的平均分）
-            final_attention_score = sum([record['score'] for record in attention_history]) / len(attention_history) if len(attention_history) > 0 else self.attention_score
+            final_attention_score = summary['score']['mean']
         else:
-            print(f"   - 没有历史记录，使用默认数据")
+            logger.debug("   - 没有历史记录，使用默认数据")
         
         # 生成改进建议
         recommendations = []
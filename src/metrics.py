@@ -0,0 +1,297 @@
+# src/metrics.py - 运行指标：计数器、仪表和直方图，按 Prometheus 文本格式导出
+"""
+热路径（逐帧检测、JPEG编码、语音合成）只调用 observe()/inc()，开销为一次加锁和一次二分查找；
+摄像头帧率、队列深度等已有状态由采集函数在导出时读取，不在热路径上重复统计。
+"""
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# 默认的耗时直方图分桶（秒），覆盖1毫秒到10秒
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value):
+    """格式化样本值
+
+    Args:
+        value: 数值
+
+    Returns:
+        str: Prometheus 文本格式的数值
+    """
+    if value is None:
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labels):
+    """格式化标签
+
+    Args:
+        labels: 标签字典或 (名称, 值) 序列
+
+    Returns:
+        str: 形如 {a="1",b="2"} 的字符串，没有标签时为空字符串
+    """
+    items = labels.items() if isinstance(labels, dict) else labels
+    parts = []
+    for name, value in items:
+        value = str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        parts.append(f'{name}="{value}"')
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    """指标基类 - 按标签值分别保存数据"""
+
+    metric_type = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        """初始化指标
+
+        Args:
+            name: 指标名称
+            documentation: 说明
+            labelnames: 标签名称列表
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        """把标签参数转换为按标签名顺序排列的取值元组"""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"指标 {self.name} 需要标签 {self.labelnames}，实际为 {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def clear(self):
+        """清除所有标签的数据（采集函数每次导出前重建按会话划分的指标）"""
+        with self._lock:
+            self._values.clear()
+
+    def samples(self):
+        """导出样本
+
+        Returns:
+            list: (指标名后缀, 标签列表, 数值) 元组列表
+        """
+        with self._lock:
+            return [("", list(zip(self.labelnames, key)), value) for key, value in self._values.items()]
+
+
+class Counter(_Metric):
+    """计数器 - 只增不减"""
+
+    metric_type = "counter"
+
+    def inc(self, amount=1, **labels):
+        """增加计数
+
+        Args:
+            amount: 增加量
+            **labels: 标签取值
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set_total(self, value, **labels):
+        """直接设置累计值，供采集函数导出其他对象已经累计的计数
+
+        Args:
+            value: 累计值
+            **labels: 标签取值
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Gauge(_Metric):
+    """仪表 - 可任意设置的当前值"""
+
+    metric_type = "gauge"
+
+    def set(self, value, **labels):
+        """设置当前值
+
+        Args:
+            value: 数值
+            **labels: 标签取值
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def remove(self, **labels):
+        """删除一组标签的值（如会话结束后）
+
+        Args:
+            **labels: 标签取值
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values.pop(key, None)
+
+
+class Histogram(_Metric):
+    """直方图 - 按分桶统计观测值的分布，同时记录总和与次数"""
+
+    metric_type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        """初始化直方图
+
+        Args:
+            name: 指标名称
+            documentation: 说明
+            labelnames: 标签名称列表
+            buckets: 分桶上界（升序）
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        """记录一个观测值
+
+        Args:
+            value: 观测值
+            **labels: 标签取值
+        """
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                # 各分桶的计数（最后一个为 +Inf）、总和
+                data = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            data[0][index] += 1
+            data[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """统计代码块的耗时
+
+        Args:
+            **labels: 标签取值
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self._lock:
+            values = [(key, list(data[0]), data[1]) for key, data in self._values.items()]
+        samples = []
+        for key, counts, total in values:
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                samples.append(("_bucket", labels + [("le", _format_value(bound))], cumulative))
+            samples.append(("_sum", labels, total))
+            samples.append(("_count", labels, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """指标注册表 - 保存已注册的指标和导出时调用的采集函数"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        """注册指标，同名指标已存在时返回已有的指标"""
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        """注册计数器
+
+        Returns:
+            Counter: 计数器
+        """
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        """注册仪表
+
+        Returns:
+            Gauge: 仪表
+        """
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        """注册直方图
+
+        Returns:
+            Histogram: 直方图
+        """
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector):
+        """添加采集函数，每次导出前调用，用于把已有状态写入仪表等指标
+
+        Args:
+            collector: 无参数函数
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self):
+        """按 Prometheus 文本格式导出全部指标
+
+        Returns:
+            str: 指标文本
+        """
+        with self._lock:
+            collectors = list(self._collectors)
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        for collector in collectors:
+            collector()
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# 进程内共享的注册表
+REGISTRY = MetricsRegistry()
+
+# 流水线各环节的耗时指标（在热路径上直接记录）
+DETECTOR_SECONDS = REGISTRY.histogram(
+    "interview_detector_seconds", "单次检测耗时（秒）", ["detector"])
+FRAME_LOOP_SECONDS = REGISTRY.histogram(
+    "interview_frame_loop_seconds", "摄像头线程单次循环的处理耗时，不含等待新帧（秒）")
+JPEG_ENCODE_SECONDS = REGISTRY.histogram(
+    "interview_jpeg_encode_seconds", "视频流单帧JPEG编码耗时（秒）")
+TTS_SYNTHESIS_SECONDS = REGISTRY.histogram(
+    "interview_tts_synthesis_seconds", "完整合成一条语音的耗时（秒）", ["backend"])
+TTS_FIRST_AUDIO_SECONDS = REGISTRY.histogram(
+    "interview_tts_first_audio_seconds", "从开始处理语音请求到发出第一个声音的耗时（秒）")
+TTS_PLAYBACK_SECONDS = REGISTRY.histogram(
+    "interview_tts_playback_seconds", "语音请求从开始处理到播放结束的耗时（秒）",
+    buckets=(0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0))
+TTS_REQUESTS = REGISTRY.counter(
+    "interview_tts_requests_total", "语音请求数（按最终状态）", ["status"])
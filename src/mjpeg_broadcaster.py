@@ -0,0 +1,127 @@
+# src/mjpeg_broadcaster.py - MJPEG视频流广播器，每帧只编码一次并共享给所有观看者
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from metrics import JPEG_ENCODE_SECONDS
+
+
+class MJPEGBroadcaster:
+    """MJPEG广播器 - 按帧序号缓存JPEG编码结果，所有客户端共享同一份编码数据
+
+    摄像头线程调用 publish() 发布新帧；编码延迟到第一个客户端需要该帧时进行，
+    没有观看者时不产生编码开销。处理较慢的客户端直接跳到最新一帧，不会排队积压。
+    """
+
+    # 优化编码参数，优先速度
+    ENCODE_PARAMS = [
+        cv2.IMWRITE_JPEG_QUALITY, 70,  # 适当降低质量，提高速度
+        cv2.IMWRITE_JPEG_PROGRESSIVE, 0,  # 禁用渐进式编码
+        cv2.IMWRITE_JPEG_OPTIMIZE, 0,  # 禁用优化，提高速度
+        cv2.IMWRITE_JPEG_LUMA_QUALITY, 70
+    ]
+
+    def __init__(self, placeholder_size=(640, 480), keepalive_interval=1.0):
+        """初始化广播器
+
+        Args:
+            placeholder_size: 尚无画面时发送的黑色占位帧尺寸（宽, 高）
+            keepalive_interval: 没有新帧时重发上一帧的间隔（秒），用于及时发现断开的连接
+        """
+        self.keepalive_interval = keepalive_interval
+        self._cond = threading.Condition()
+        self._encode_lock = threading.Lock()
+        self._frame = None
+        self._seq = 0
+        self._jpeg = None
+        self._jpeg_seq = 0
+        self._closed = False
+
+        width, height = placeholder_size
+        self._placeholder = self._encode(np.zeros((height, width, 3), dtype=np.uint8))
+
+        # 统计信息
+        self.client_count = 0
+        self.encoded_frames = 0
+
+    def publish(self, frame):
+        """发布新的一帧（不复制，调用方发布后不应再修改该帧）
+
+        Args:
+            frame: 图像帧
+        """
+        with self._cond:
+            self._frame = frame
+            self._seq += 1
+            self._cond.notify_all()
+
+    def close(self):
+        """关闭广播器，结束所有客户端的视频流"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def get_jpeg(self, last_seq=0, timeout=1.0):
+        """等待比 last_seq 更新的帧，返回其JPEG编码
+
+        Args:
+            last_seq: 客户端已发送的帧序号
+            timeout: 等待新帧的最长时间（秒）
+
+        Returns:
+            tuple: (帧序号, JPEG字节数据)；超时时返回上一帧，尚无画面时返回占位帧
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > last_seq or self._closed, timeout=timeout)
+            seq, frame = self._seq, self._frame
+
+        if frame is None:
+            return seq, self._placeholder
+
+        # 每个帧序号只编码一次，其余客户端等待并复用编码结果
+        with self._encode_lock:
+            if self._jpeg_seq < seq:
+                start = time.perf_counter()
+                jpeg = self._encode(frame)
+                JPEG_ENCODE_SECONDS.observe(time.perf_counter() - start)
+                if jpeg is not None:
+                    self._jpeg, self._jpeg_seq = jpeg, seq
+                    self.encoded_frames += 1
+            return self._jpeg_seq, self._jpeg or self._placeholder
+
+    def frames(self):
+        """生成multipart格式的MJPEG数据流，供单个客户端连接使用
+
+        Yields:
+            bytes: multipart数据块
+        """
+        with self._cond:
+            self.client_count += 1
+        try:
+            last_seq = 0
+            while not self._closed:
+                seq, jpeg = self.get_jpeg(last_seq, timeout=self.keepalive_interval)
+                if self._closed:
+                    break
+                last_seq = seq
+                yield (b'--frame\r\n'
+                       b'Content-Type: image/jpeg\r\n\r\n' + jpeg + b'\r\n')
+        finally:
+            with self._cond:
+                self.client_count -= 1
+
+    def _encode(self, frame):
+        """将图像帧编码为JPEG
+
+        Args:
+            frame: 图像帧
+
+        Returns:
+            bytes: JPEG数据，编码失败时返回None
+        """
+        ret, buffer = cv2.imencode('.jpg', frame, self.ENCODE_PARAMS)
+        if not ret:
+            return None
+        return buffer.tobytes()
@@ -0,0 +1,241 @@
+# src/presynthesize_questions.py - 离线预合成题库中所有问题的提问语音
+"""
+遍历题库，为每个问题可能用到的提问语音调用Edge TTS合成，并写入语音缓存目录。
+运行时 VoiceFeedback 按相同的缓存键查找，命中后直接读取本地文件播放，无需联网合成。
+
+用法:
+    python presynthesize_questions.py                 # 合成全部问题
+    python presynthesize_questions.py --incremental   # 只合成新增或修改过的问题
+    python presynthesize_questions.py --variants next,start --concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from question_manager import QuestionManager
+from tts_cache import TTSCache
+from voice_utils import (EDGE_TTS_RATE, EDGE_TTS_VOICE, TTS_CACHE_DIR, edgetts_available,
+                         format_next_question_prompt, format_question_prompt, synthesize_edge_tts)
+
+# 索引文件名，记录每条预合成语音对应的问题和文本
+INDEX_FILENAME = "question_index.json"
+
+# 可选的提问语音类型
+#   start: 开始面试时的第一个问题（带岗位前缀）
+#   next: 切换到下一个问题
+#   plain: 不带岗位的提问
+#   position: 每个岗位下所有问题的带岗位前缀提问（数量较多）
+ALL_VARIANTS = ("start", "next", "plain", "position")
+DEFAULT_VARIANTS = ("start", "next", "plain")
+
+# 开始面试时后端取不到问题所用的默认问题
+FALLBACK_FIRST_QUESTION = "请介绍一下你自己"
+
+
+def build_prompts(question_manager, variants):
+    """根据题库生成需要合成的语音文本
+
+    Args:
+        question_manager: 问题管理器
+        variants: 需要生成的提问语音类型
+
+    Returns:
+        list: 条目列表，每项包含 text、variant、question、position
+    """
+    prompts = []
+
+    def add(variant, question, position=""):
+        if variant == "next":
+            text = format_next_question_prompt(question)
+        else:
+            text = format_question_prompt(question, position)
+        prompts.append({'text': text, 'variant': variant, 'question': question, 'position': position})
+
+    all_questions = [item['question'] for item in question_manager.get_all_questions()]
+    positions = question_manager.get_positions()
+
+    if "next" in variants:
+        for question in all_questions:
+            add("next", question)
+    if "plain" in variants:
+        for question in all_questions:
+            add("plain", question)
+    if "start" in variants:
+        # 每个岗位的第一个问题固定为第一个默认通用问题
+        first_question = question_manager.DEFAULT_GENERAL_QUESTIONS[0]['question']
+        for position in positions:
+            add("start", first_question, position)
+            add("start", FALLBACK_FIRST_QUESTION, position)
+    if "position" in variants:
+        for position in positions:
+            for item in question_manager.get_question_pool(position):
+                add("position", item['question'], position)
+
+    # 按文本去重（不同类型可能生成相同的文本）
+    unique = {}
+    for prompt in prompts:
+        unique.setdefault(prompt['text'], prompt)
+    return list(unique.values())
+
+
+def load_index(path):
+    """读取索引文件
+
+    Args:
+        path: 索引文件路径
+
+    Returns:
+        dict: 索引内容，文件不存在或损坏时返回空索引
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if isinstance(index.get('entries'), dict):
+            return index
+    except (OSError, ValueError):
+        pass
+    return {'entries': {}}
+
+
+def save_index(path, index):
+    """写入索引文件（先写临时文件再替换）
+
+    Args:
+        path: 索引文件路径
+        index: 索引内容
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+async def synthesize_all(cache, prompts, voice, rate, concurrency):
+    """以有限并发合成全部语音并写入缓存
+
+    Args:
+        cache: 语音缓存
+        prompts: 待合成条目（包含 key 字段）
+        voice: 说话人
+        rate: 语速
+        concurrency: 同时进行的合成请求数上限
+
+    Returns:
+        tuple: (成功的条目列表, 失败的条目列表)
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    done, failed = [], []
+    total = len(prompts)
+
+    async def worker(prompt):
+        async with semaphore:
+            try:
+                audio = await synthesize_edge_tts(prompt['text'], voice, rate)
+                if not audio:
+                    raise ValueError("未返回音频数据")
+                cache.put(prompt['key'], audio)
+                prompt['bytes'] = len(audio)
+                done.append(prompt)
+            except Exception as e:
+                print(f"⚠️ 合成失败: {prompt['text']} ({e})")
+                failed.append(prompt)
+            finished = len(done) + len(failed)
+            if finished % 20 == 0 or finished == total:
+                print(f"进度: {finished}/{total}")
+
+    await asyncio.gather(*(worker(prompt) for prompt in prompts))
+    return done, failed
+
+
+def main(argv=None):
+    """命令行入口
+
+    Args:
+        argv: 命令行参数（默认读取 sys.argv）
+
+    Returns:
+        int: 退出码，有合成失败的条目时返回1
+    """
+    parser = argparse.ArgumentParser(description="离线预合成题库中所有问题的提问语音")
+    parser.add_argument("--cache-dir", default=TTS_CACHE_DIR, help="语音缓存目录")
+    parser.add_argument("--voice", default=EDGE_TTS_VOICE, help="Edge TTS说话人")
+    parser.add_argument("--rate", default=EDGE_TTS_RATE, help="Edge TTS语速，如 +0%%")
+    parser.add_argument("--concurrency", type=int, default=4, help="同时进行的合成请求数")
+    parser.add_argument("--variants", default=",".join(DEFAULT_VARIANTS),
+                        help=f"提问语音类型，逗号分隔，可选 {','.join(ALL_VARIANTS)} 或 all")
+    parser.add_argument("--incremental", action="store_true", help="只合成索引中没有或文件已丢失的条目")
+    parser.add_argument("--prune", action="store_true", help="删除索引中已不在题库里的语音文件")
+    parser.add_argument("--dry-run", action="store_true", help="只统计需要合成的条目，不实际合成")
+    args = parser.parse_args(argv)
+
+    variants = ALL_VARIANTS if args.variants == "all" else tuple(v.strip() for v in args.variants.split(",") if v.strip())
+    unknown = [v for v in variants if v not in ALL_VARIANTS]
+    if unknown:
+        parser.error(f"未知的提问语音类型: {', '.join(unknown)}")
+    if not edgetts_available and not args.dry_run:
+        print("❌ Edge TTS库不可用，无法合成语音")
+        return 1
+
+    cache = TTSCache(args.cache_dir)
+    index_path = os.path.join(args.cache_dir, INDEX_FILENAME)
+    index = load_index(index_path)
+    if index.get('voice', args.voice) != args.voice or index.get('rate', args.rate) != args.rate:
+        print("说话人或语速与索引不一致，之前的条目不会被复用")
+
+    prompts = build_prompts(QuestionManager(), variants)
+    for prompt in prompts:
+        prompt['key'] = TTSCache.make_key(prompt['text'], args.voice, args.rate)
+    wanted_keys = {prompt['key'] for prompt in prompts}
+
+    if args.incremental:
+        pending = [prompt for prompt in prompts
+                   if prompt['key'] not in index['entries'] or not cache.contains(prompt['key'])]
+    else:
+        pending = prompts
+    print(f"共 {len(prompts)} 条提问语音，需要合成 {len(pending)} 条（并发 {args.concurrency}）")
+    if args.dry_run:
+        return 0
+
+    start_time = time.time()
+    done, failed = asyncio.run(synthesize_all(cache, pending, args.voice, args.rate, max(1, args.concurrency)))
+
+    entries = index['entries']
+    for prompt in done:
+        entries[prompt['key']] = {
+            'text': prompt['text'],
+            'variant': prompt['variant'],
+            'question': prompt['question'],
+            'position': prompt['position'],
+            'bytes': prompt['bytes']
+        }
+
+    if args.prune:
+        stale = [key for key in entries if key not in wanted_keys]
+        for key in stale:
+            try:
+                os.remove(cache.path_for(key))
+            except OSError:
+                pass
+            del entries[key]
+        print(f"已删除 {len(stale)} 条过期语音")
+
+    index.update({
+        'voice': args.voice,
+        'rate': args.rate,
+        'updated_at': datetime.now().isoformat(timespec='seconds'),
+        'entries': entries
+    })
+    save_index(index_path, index)
+
+    print(f"✅ 合成完成: 成功 {len(done)} 条，失败 {len(failed)} 条，耗时 {time.time() - start_time:.1f} 秒")
+    print(f"索引文件: {index_path}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -229,6 +229,16 @@ class QuestionManager:
         "保安": "服务/零售类"
     }
     
+    # 默认通用问题列表，每个职业的前两个问题总是取自这里
+    DEFAULT_GENERAL_QUESTIONS = [
+        {"question": "请简单介绍一下您自己。", "category": "通用问题", "difficulty": "简单", "answer_key": "包含个人基本信息、教育背景、工作经验、技能特长等"},
+        {"question": "您以前有什么相关工作经验？", "category": "通用问题", "difficulty": "简单", "answer_key": "详细描述与岗位相关的工作经验，包括具体职责、成果等"},
+        {"question": "您为什么对这个职位感兴趣？", "category": "通用问题", "difficulty": "中等", "answer_key": "结合个人职业规划和公司特点进行回答"},
+        {"question": "您认为自己最大的优势是什么？", "category": "通用问题", "difficulty": "中等", "answer_key": "突出与岗位相关的技能和特质"},
+        {"question": "您如何看待团队合作？", "category": "通用问题", "difficulty": "中等", "answer_key": "强调团队合作的重要性，分享自己的团队合作经验"},
+        {"question": "您对未来的职业规划是什么？", "category": "通用问题", "difficulty": "中等", "answer_key": "结合职位和公司特点，描述短期和长期职业目标"}
+    ]
+    
     def __init__(self, question_file: str = "data/interview_questions.json"):
         """初始化问题管理器
         
@@ -294,14 +304,7 @@ class QuestionManager:
             List[Dict]: 该职业的面试问题列表，如果没有则返回通用问题
         """
         # 默认通用问题列表
-        default_general_questions = [
-            {"question": "请简单介绍一下您自己。", "category": "通用问题", "difficulty": "简单", "answer_key": "包含个人基本信息、教育背景、工作经验、技能特长等"},
-            {"question": "您以前有什么相关工作经验？", "category": "通用问题", "difficulty": "简单", "answer_key": "详细描述与岗位相关的工作经验，包括具体职责、成果等"},
-            {"question": "您为什么对这个职位感兴趣？", "category": "通用问题", "difficulty": "中等", "answer_key": "结合个人职业规划和公司特点进行回答"},
-            {"question": "您认为自己最大的优势是什么？", "category": "通用问题", "difficulty": "中等", "answer_key": "突出与岗位相关的技能和特质"},
-            {"question": "您如何看待团队合作？", "category": "通用问题", "difficulty": "中等", "answer_key": "强调团队合作的重要性，分享自己的团队合作经验"},
-            {"question": "您对未来的职业规划是什么？", "category": "通用问题", "difficulty": "中等", "answer_key": "结合职位和公司特点，描述短期和长期职业目标"}
-        ]
+        default_general_questions = self.DEFAULT_GENERAL_QUESTIONS
         
         # 获取通用问题，如果不存在或为空则使用默认通用问题
         general_questions = default_general_questions
@@ -313,18 +316,8 @@ class QuestionManager:
         if not general_questions:
             general_questions = default_general_questions
         
-        # 1. 首先检查是否有该职业的专门问题
-        if position in self.questions:
-            # 获取职业问题
-            career_questions = self.questions[position]
-        else:
-            # 2. 如果没有专门问题，使用预定义的职业到大类映射
-            career_questions = []
-            if position in self.CAREER_TO_CATEGORY:
-                # 获取该职业对应的大类
-                category_name = self.CAREER_TO_CATEGORY[position]
-                # 获取该大类的问题
-                career_questions = self.questions.get(category_name, [])
+        # 获取职业/大类问题
+        career_questions = self._get_career_questions(position)
         
         # 3. 构建最终问题列表：前两个是默认通用问题，然后是职业/大类问题
         total_needed = 8
@@ -354,6 +347,63 @@ class QuestionManager:
         self.current_question_index = 0
         return fixed_questions
     
+    def _get_career_questions(self, position: str) -> List[Dict]:
+        """获取职业专门问题，没有时使用该职业所属大类的问题
+
+        Args:
+            position: 职业名称
+
+        Returns:
+            List[Dict]: 职业/大类问题列表
+        """
+        # 1. 首先检查是否有该职业的专门问题
+        if position in self.questions:
+            return self.questions[position]
+        # 2. 如果没有专门问题，使用预定义的职业到大类映射
+        if position in self.CAREER_TO_CATEGORY:
+            return self.questions.get(self.CAREER_TO_CATEGORY[position], [])
+        return []
+
+    def get_question_pool(self, position: str) -> List[Dict]:
+        """获取某个职业可能被问到的全部问题（不打乱顺序，不改变当前问题进度）
+
+        Args:
+            position: 职业名称
+
+        Returns:
+            List[Dict]: 问题列表
+        """
+        return list(self.DEFAULT_GENERAL_QUESTIONS) + list(self._get_career_questions(position))
+
+    def get_positions(self) -> List[str]:
+        """获取题库支持的所有职业
+
+        Returns:
+            List[str]: 职业名称列表（预定义职业和题库中的具体职业）
+        """
+        positions = list(self.CAREER_TO_CATEGORY)
+        for name in self.questions:
+            if name != "通用问题" and name not in positions and name not in self.CAREER_TO_CATEGORY.values():
+                positions.append(name)
+        return positions
+
+    def get_all_questions(self) -> List[Dict]:
+        """获取题库中的全部问题（含默认通用问题），按问题文本去重
+
+        Returns:
+            List[Dict]: 问题列表
+        """
+        all_questions = []
+        seen = set()
+        groups = [self.DEFAULT_GENERAL_QUESTIONS] + list(self.questions.values())
+        for group in groups:
+            for question in group:
+                text = question.get("question")
+                if text and text not in seen:
+                    seen.add(text)
+                    all_questions.append(question)
+        return all_questions
+
     def get_next_question(self) -> Optional[Dict]:
         """获取下一个面试问题
         
@@ -378,6 +428,26 @@ class QuestionManager:
         else:
             return None
     
+    def get_upcoming_question(self, current_question: Optional[str] = None) -> Optional[Dict]:
+        """预测接下来会被问到的问题（不改变当前问题进度）
+
+        Args:
+            current_question: 当前正在作答的问题文本（前端自行推进问题时用于定位）
+
+        Returns:
+            Optional[Dict]: 下一个问题，无法预测时（如当前问题不在列表中）返回None
+        """
+        if current_question is not None:
+            for index, question in enumerate(self.current_questions):
+                if question.get("question") == current_question:
+                    if index + 1 < len(self.current_questions):
+                        return self.current_questions[index + 1]
+                    return None
+            return None
+        if self.current_question_index < len(self.current_questions):
+            return self.current_questions[self.current_question_index]
+        return None
+    
     def reset_questions(self) -> None:
         """重置问题索引"""
         self.current_question_index = 0
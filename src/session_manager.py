@@ -0,0 +1,554 @@
+# src/session_manager.py - 面试会话管理器，支持单进程多路并发面试
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from main import InterviewCoachV2
+from background_jobs import JobRegistry
+from mjpeg_broadcaster import MJPEGBroadcaster
+from status_stream import StatusStream
+from video_recorder import VideoRecorder
+from question_manager import QuestionManager
+from logging_utils import get_logger, PER_FRAME
+from metrics import FRAME_LOOP_SECONDS, REGISTRY
+
+logger = get_logger("session")
+
+# 按会话划分的状态指标，导出时由 SessionRegistry.collect_metrics() 重新采集
+SESSIONS_GAUGE = REGISTRY.gauge("interview_sessions", "会话数", ["state"])
+CAMERA_FPS = REGISTRY.gauge("interview_camera_fps", "摄像头实际帧率", ["session"])
+CAMERA_DROPPED_FRAMES = REGISTRY.counter(
+    "interview_camera_dropped_frames_total", "未被分析就被新帧覆盖的摄像头帧数", ["session"])
+MJPEG_CLIENTS = REGISTRY.gauge("interview_mjpeg_clients", "视频流观看者数量", ["session"])
+MJPEG_ENCODED_FRAMES = REGISTRY.counter("interview_mjpeg_encoded_frames_total", "视频流编码的帧数", ["session"])
+RECORDING_QUEUE_DEPTH = REGISTRY.gauge("interview_recording_queue_depth", "等待写入的录制帧数", ["session"])
+RECORDING_DROPPED_FRAMES = REGISTRY.counter(
+    "interview_recording_dropped_frames_total", "录制队列已满时丢弃的帧数", ["session"])
+SPEECH_QUEUE_DEPTH = REGISTRY.gauge("interview_speech_queue_depth", "等待播放的语音请求数", ["session"])
+TTS_CACHE_LOOKUPS = REGISTRY.counter(
+    "interview_tts_cache_lookups_total", "语音缓存查找次数（按命中层级）", ["session", "result"])
+
+
+# 未显式指定会话ID时使用的默认会话
+DEFAULT_SESSION_ID = "default"
+
+# 面试视频保存根目录，每个会话使用独立子目录
+VIDEO_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'videos')
+
+# 每个会话的并行检测线程数，0表示依次运行各检测器
+PARALLEL_WORKERS = int(os.environ.get('INTERVIEW_PARALLEL_WORKERS', 0))
+
+# 摄像头低延迟模式：后台线程抓帧，分析循环总是处理最新一帧
+LOW_LATENCY_CAMERA = os.environ.get('INTERVIEW_LOW_LATENCY_CAMERA', '1') == '1'
+
+# 录制参数：帧率、分辨率和分段时长
+RECORD_FPS = float(os.environ.get('INTERVIEW_RECORD_FPS', 8))
+RECORD_RESOLUTION = tuple(int(v) for v in os.environ.get('INTERVIEW_RECORD_RESOLUTION', '320x240').split('x'))
+RECORD_SEGMENT_SECONDS = int(os.environ.get('INTERVIEW_RECORD_SEGMENT_SECONDS', 60))
+
+# 每个问题的作答时间（秒）
+ANSWER_TIME_LIMIT = 300
+
+
+class SessionLimitError(RuntimeError):
+    """会话数已达上限"""
+
+
+class CameraBusyError(RuntimeError):
+    """摄像头正被其他会话使用"""
+
+
+# 所有会话共用同一个摄像头设备，同一时间只允许一个会话运行摄像头线程
+_camera_lock = threading.Lock()
+_camera_owner = None
+
+
+def acquire_camera(session_id):
+    """占用摄像头
+
+    Args:
+        session_id: 会话ID
+
+    Raises:
+        CameraBusyError: 摄像头正被其他会话使用
+    """
+    global _camera_owner
+    with _camera_lock:
+        if _camera_owner is not None and _camera_owner != session_id:
+            raise CameraBusyError(f"摄像头正被会话 {_camera_owner} 使用，请先结束该会话的面试")
+        _camera_owner = session_id
+
+
+def release_camera(session_id):
+    """释放摄像头（只有当前占用者可以释放）
+
+    Args:
+        session_id: 会话ID
+    """
+    global _camera_owner
+    with _camera_lock:
+        if _camera_owner == session_id:
+            _camera_owner = None
+
+
+class InterviewSession:
+    """单个面试会话 - 拥有独立的检测流水线、问题进度、注意力历史和录像"""
+
+    def __init__(self, session_id, position="Python开发工程师"):
+        """初始化面试会话
+
+        Args:
+            session_id: 会话ID
+            position: 面试岗位
+        """
+        self.session_id = session_id
+        self.created_at = time.time()
+        self.last_active = self.created_at
+
+        # 检测流水线和问题进度
+        self.coach = None
+        self.question_manager = None
+        self.interview_position = position
+
+        # 运行状态
+        self.is_running = False
+        self.camera_thread = None
+        self.latest_frame = None
+        self.raw_frame = None  # 原始摄像头帧，不包含UI
+        self.broadcaster = MJPEGBroadcaster()  # 视频流广播器，每帧只编码一次
+        self.status_stream = StatusStream()  # 状态推送流，代替前端轮询
+
+        self.latest_data = {
+            'attention_score': 100.0,
+            'gaze_status': '正常',
+            'pose_status': '良好',
+            'gesture_status': '无小动作',
+            'face_detected': False,
+            'gaze_away_count': 0,
+            'pose_issue_count': 0,
+            'gesture_count': 0,
+            'session_time': 0,
+            'feedback': '系统运行中...',
+            'interview_position': position
+        }
+
+        # 视频录制：帧直接流式写入磁盘分段，不在内存中累积
+        self.video_dir = os.path.join(VIDEO_ROOT, session_id)
+        self.recorder = VideoRecorder(self.video_dir, fps=RECORD_FPS, resolution=RECORD_RESOLUTION,
+                                      segment_seconds=RECORD_SEGMENT_SECONDS)
+        
+        # 后台任务（如视频保存），不阻塞请求线程和摄像头线程
+        self.jobs = JobRegistry()
+
+    def touch(self):
+        """更新最近活跃时间"""
+        self.last_active = time.time()
+
+    def initialize(self):
+        """初始化面试助手和问题管理器
+
+        Returns:
+            bool: 是否初始化成功
+        """
+        try:
+            # 在Web环境下初始化时不使用UI
+            self.coach = InterviewCoachV2(use_ui=False, parallel_workers=PARALLEL_WORKERS,
+                                          low_latency_camera=LOW_LATENCY_CAMERA)
+            logger.info("✅ 会话 %s: 面试助手初始化成功", self.session_id)
+
+            # 作答超时时通知前端
+            self.coach.voice.on_question_timeout = self._on_question_timeout
+
+            # 初始化问题管理器
+            self.question_manager = QuestionManager()
+            logger.info("✅ 会话 %s: 问题管理器初始化成功", self.session_id)
+
+            return True
+        except Exception as e:
+            logger.error("❌ 会话 %s: 面试助手初始化失败: %s", self.session_id, e)
+            return False
+
+    def acquire_camera(self):
+        """占用摄像头，启动面试前调用
+
+        Raises:
+            CameraBusyError: 摄像头正被其他会话使用
+        """
+        acquire_camera(self.session_id)
+
+    def start_camera(self):
+        """启动摄像头线程
+
+        Raises:
+            CameraBusyError: 摄像头正被其他会话使用
+        """
+        self.acquire_camera()
+        self.is_running = True
+        self.publish_status()
+        self.camera_thread = threading.Thread(target=self.camera_loop)
+        self.camera_thread.daemon = True
+        self.camera_thread.start()
+
+    def stop_camera(self, timeout=2):
+        """停止摄像头线程
+
+        Args:
+            timeout: 等待线程结束的最长时间（秒）
+        """
+        self.is_running = False
+        self.publish_status()
+        if self.camera_thread and self.camera_thread.is_alive() and \
+                self.camera_thread is not threading.current_thread():
+            self.camera_thread.join(timeout=timeout)
+        self.release_camera()
+
+    def release_camera(self):
+        """释放摄像头（摄像头线程仍在运行时由线程结束时释放）"""
+        if self.camera_thread is None or not self.camera_thread.is_alive():
+            release_camera(self.session_id)
+
+    @property
+    def video_recording(self):
+        """是否正在录制视频"""
+        return self.recorder.is_recording
+
+    def start_recording(self):
+        """开始新的视频录制"""
+        self.recorder.start()
+
+    def stop_recording(self):
+        """停止视频录制（不等待写入完成）"""
+        self.recorder.stop()
+
+    def finalize_recording(self, progress_callback=None):
+        """结束录制，等待剩余帧写入磁盘并关闭当前分段
+
+        Args:
+            progress_callback: 进度回调，参数为已写完的比例（0到1）
+
+        Returns:
+            dict: 录制结果（分段文件列表、写入帧数等）
+        """
+        return self.recorder.finalize(progress_callback=progress_callback)
+
+    def close(self):
+        """释放会话持有的资源"""
+        # 先停止摄像头线程，避免录制结束后仍有帧写入录制器
+        self.stop_camera()
+        self.finalize_recording()
+        self.broadcaster.close()
+        self.status_stream.close()
+        if self.coach:
+            self.coach.is_running = False
+            self.coach.close()
+
+    def update_latest_data(self, face_detected=None):
+        """根据面试助手的当前状态刷新最新数据
+
+        Args:
+            face_detected: 覆盖面部检测状态（可选）
+        """
+        coach = self.coach
+        self.latest_data.update({
+            'attention_score': coach.attention_score,
+            'gaze_status': coach.gaze_status,
+            'pose_status': coach.pose_status,
+            'gesture_status': coach.gesture_status,
+            'face_detected': coach.face_detected if face_detected is None else face_detected,
+            'gaze_away_count': coach.gaze_away_count,
+            'pose_issue_count': coach.pose_issue_count,
+            'gesture_count': coach.gesture_count,
+            'session_time': coach.get_session_time(),
+            'feedback': coach.voice.get_latest_feedback() or "系统运行中..."
+        })
+        self.publish_status()
+    
+    def publish_status(self):
+        """将最新状态写入推送流（只有变化的字段会推送给前端）"""
+        status = dict(self.latest_data)
+        # 会话时间按整秒推送，避免每帧都产生变化
+        status['session_time'] = int(status.get('session_time') or 0) if self.is_running else 0
+        status['is_running'] = self.is_running
+        self.status_stream.update(status)
+    
+    def emit_event(self, event_type, data):
+        """向前端推送一个事件（问题、计时等）
+        
+        Args:
+            event_type: 事件类型
+            data: 事件数据
+        """
+        self.status_stream.emit_event(event_type, data)
+
+    def _on_question_timeout(self, question):
+        """作答时间到（在定时器调度线程中调用）
+
+        Args:
+            question: 超时的问题
+        """
+        self.emit_event('timer', {'action': 'timeout', 'question': question, 'time_limit': ANSWER_TIME_LIMIT})
+
+    def _read_camera_frame(self):
+        """读取一帧摄像头画面，失败时尝试重新打开摄像头
+
+        Returns:
+            tuple: (摄像头是否可用, 图像帧或None)
+        """
+        camera = self.coach.camera
+        try:
+            ret, frame = camera.read_frame()
+            if ret and frame is not None:
+                return True, frame
+            logger.warning("读取到空帧，尝试重新打开摄像头", extra=PER_FRAME)
+        except Exception as e:
+            logger.warning("读取摄像头帧失败: %s", e, extra=PER_FRAME)
+
+        # 尝试重新打开摄像头
+        try:
+            if not camera.open():
+                logger.warning("摄像头重新打开失败，继续使用模拟数据", extra=PER_FRAME)
+                return False, None
+            ret, frame = camera.read_frame()
+            return True, frame if ret else None
+        except Exception as e:
+            logger.warning("重新打开摄像头失败: %s", e, extra=PER_FRAME)
+            return False, None
+
+    def camera_loop(self):
+        """摄像头循环线程"""
+        logger.info("会话 %s: 摄像头线程已启动", self.session_id)
+        coach = self.coach
+
+        # 检查摄像头是否可用
+        camera_available = False
+        try:
+            logger.info("正在尝试打开摄像头...")
+            camera_available = coach.camera.open()
+            logger.info("摄像头打开结果: %s", camera_available)
+        except Exception as e:
+            logger.warning("摄像头打开异常: %s", e)
+            camera_available = False
+
+        if not camera_available:
+            logger.warning("摄像头不可用，将使用模拟数据")
+
+        tracer = coach.tracer
+        frame_index = 0
+        try:
+            while self.is_running:
+                try:
+                    frame = None
+                    frame_index += 1
+                    if camera_available:
+                        trace_start = tracer.begin()
+                        camera_available, frame = self._read_camera_frame()
+                        tracer.end("camera_read", trace_start)
+                        if frame is not None:
+                            # 更新raw_frame，用于视频流
+                            self.raw_frame = frame.copy()
+                            self.broadcaster.publish(self.raw_frame)
+
+                    # 处理帧或使用模拟数据（循环耗时从读到帧之后开始计算，不含等待新帧的时间）
+                    loop_start = time.perf_counter()
+                    frame_trace_start = tracer.begin()
+                    if frame is not None and len(frame.shape) > 0:
+                        # 处理帧并更新状态
+                        try:
+                            # 使用真实帧进行检测
+                            with tracer.span("process_frame"):
+                                coach.process_frame(frame)
+                            with tracer.span("publish_status"):
+                                self.update_latest_data()
+                            # 更新latest_frame，用于快照
+                            self.latest_frame = frame.copy()
+                        except Exception as e:
+                            logger.warning("处理帧时发生错误: %s", e, extra=PER_FRAME)
+
+                        # 如果正在录制视频，提交帧给录制器（按录制帧率抽帧）
+                        if self.video_recording:
+                            with tracer.span("record_frame"):
+                                self.recorder.write(self.raw_frame)
+                    else:
+                        # 使用模拟数据（逐帧日志只在DEBUG级别输出）
+                        logger.debug("使用模拟数据更新状态", extra=PER_FRAME)
+                        self.update_latest_data(face_detected=False)
+                        # 如果没有真实帧，创建一个黑色帧用于视频流
+                        if self.raw_frame is None:
+                            self.raw_frame = np.zeros((480, 640, 3), dtype=np.uint8)
+                            self.broadcaster.publish(self.raw_frame)
+
+                        # 如果正在录制视频，提交模拟帧给录制器
+                        if self.video_recording:
+                            # 创建一个带有时间戳的模拟帧
+                            sim_frame = np.zeros((480, 640, 3), dtype=np.uint8)
+                            # 添加时间戳文本
+                            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                            cv2.putText(sim_frame, timestamp, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                            cv2.putText(sim_frame, '模拟视频帧', (10, 70), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                            cv2.putText(sim_frame, '摄像头不可用', (10, 110), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+                            self.recorder.write(sim_frame)
+
+                    FRAME_LOOP_SECONDS.observe(time.perf_counter() - loop_start)
+                    if frame_trace_start:
+                        tracer.end("frame", frame_trace_start, {'frame': frame_index, 'simulated': frame is None})
+
+                    # 添加小延迟，控制CPU占用；低延迟模式下读帧本身会阻塞等待新帧，无需额外等待
+                    if frame is None or not coach.camera.low_latency:
+                        time.sleep(0.01)  # 约100 FPS的上限
+                except Exception as e:
+                    logger.exception("处理帧时发生错误: %s", e, extra=PER_FRAME)
+                    time.sleep(0.1)  # 出错时稍作等待
+        finally:
+            # 清理资源
+            logger.info("会话 %s: 摄像头线程结束，清理资源", self.session_id)
+            try:
+                if camera_available:
+                    coach.camera.close()
+            except Exception as e:
+                logger.warning("关闭摄像头时发生错误: %s", e)
+            # 本会话已启动新的摄像头线程时由新线程继续占用摄像头
+            if self.camera_thread is threading.current_thread():
+                release_camera(self.session_id)
+
+
+class SessionRegistry:
+    """会话注册表 - 按会话ID管理多个并发面试会话"""
+
+    def __init__(self, max_sessions=8, idle_timeout=3600):
+        """初始化会话注册表
+
+        Args:
+            max_sessions: 同时存在的最大会话数
+            idle_timeout: 未运行会话的空闲回收时间（秒）
+        """
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+
+    def get(self, session_id):
+        """获取已存在的会话
+
+        Args:
+            session_id: 会话ID
+
+        Returns:
+            InterviewSession: 会话对象，不存在时返回None
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session:
+            session.touch()
+        return session
+
+    def get_or_create(self, session_id=None):
+        """获取会话，不存在时创建
+
+        Args:
+            session_id: 会话ID（为空时自动生成）
+
+        Returns:
+            InterviewSession: 会话对象
+
+        Raises:
+            SessionLimitError: 会话数已达上限
+        """
+        session_id = session_id or uuid.uuid4().hex
+        evicted = []
+        try:
+            with self._lock:
+                session = self._sessions.get(session_id)
+                if session is None:
+                    evicted = self._pop_idle_locked()
+                    if len(self._sessions) >= self.max_sessions:
+                        raise SessionLimitError(f"会话数已达上限({self.max_sessions})")
+                    session = InterviewSession(session_id)
+                    self._sessions[session_id] = session
+                    logger.info("✅ 已创建会话 %s，当前会话数: %d", session_id, len(self._sessions))
+        finally:
+            # 关闭会话需要等待摄像头和录制线程结束，在锁外进行，不阻塞其他会话的请求
+            for idle_id, idle_session in evicted:
+                idle_session.close()
+                logger.info("会话 %s 空闲超时，已回收", idle_id)
+        session.touch()
+        return session
+
+    def remove(self, session_id):
+        """移除会话并释放资源
+
+        Args:
+            session_id: 会话ID
+
+        Returns:
+            bool: 是否找到并移除了会话
+        """
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        session.close()
+        logger.info("会话 %s 已移除", session_id)
+        return True
+
+    def list_sessions(self):
+        """列出所有会话的摘要信息
+
+        Returns:
+            list: 会话摘要列表
+        """
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return [{
+            'session_id': session.session_id,
+            'is_running': session.is_running,
+            'interview_position': session.interview_position,
+            'created_at': session.created_at,
+            'last_active': session.last_active
+        } for session in sessions]
+
+    def collect_metrics(self):
+        """把各会话的当前状态写入指标（导出 /metrics 前调用）"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+        with self._metrics_lock:
+            for metric in (SESSIONS_GAUGE, CAMERA_FPS, CAMERA_DROPPED_FRAMES, MJPEG_CLIENTS, MJPEG_ENCODED_FRAMES,
+                           RECORDING_QUEUE_DEPTH, RECORDING_DROPPED_FRAMES, SPEECH_QUEUE_DEPTH, TTS_CACHE_LOOKUPS):
+                metric.clear()
+            running = sum(1 for session in sessions if session.is_running)
+            SESSIONS_GAUGE.set(running, state="running")
+            SESSIONS_GAUGE.set(len(sessions) - running, state="idle")
+
+            for session in sessions:
+                sid = session.session_id
+                MJPEG_CLIENTS.set(session.broadcaster.client_count, session=sid)
+                MJPEG_ENCODED_FRAMES.set_total(session.broadcaster.encoded_frames, session=sid)
+                RECORDING_QUEUE_DEPTH.set(session.recorder.queue_depth, session=sid)
+                RECORDING_DROPPED_FRAMES.set_total(session.recorder.frames_dropped, session=sid)
+                coach = session.coach
+                if coach is None:
+                    continue
+                CAMERA_FPS.set(coach.camera.fps_actual if session.is_running else 0, session=sid)
+                CAMERA_DROPPED_FRAMES.set_total(coach.camera.dropped_frames, session=sid)
+                SPEECH_QUEUE_DEPTH.set(coach.voice.pending_count, session=sid)
+                cache_stats = coach.voice.audio_cache.get_stats()
+                for result in ('memory_hits', 'disk_hits', 'misses'):
+                    TTS_CACHE_LOOKUPS.set_total(cache_stats[result], session=sid, result=result)
+
+    def _pop_idle_locked(self):
+        """从注册表中移除长时间空闲且未运行的会话（调用方需持有锁，并在释放锁后关闭返回的会话）
+
+        Returns:
+            list: (会话ID, 会话对象) 列表
+        """
+        now = time.time()
+        idle_ids = [
+            session_id for session_id, session in self._sessions.items()
+            if not session.is_running and now - session.last_active > self.idle_timeout
+        ]
+        return [(session_id, self._sessions.pop(session_id)) for session_id in idle_ids]
@@ -0,0 +1,141 @@
+# src/status_stream.py - 会话状态推送流（Server-Sent Events），只推送发生变化的字段
+import json
+import threading
+import time
+from collections import deque
+
+# 用于区分"字段不存在"和"字段值为None"
+_MISSING = object()
+
+
+class StatusStream:
+    """状态推送流 - 代替前端每秒轮询 /api/status
+
+    摄像头线程通过 update() 写入最新状态，业务代码通过 emit_event() 发布问题、计时等事件。
+    每个订阅者在两次状态推送之间至少间隔 min_interval 秒，期间的多次变化会合并为一次推送，
+    且只发送与该订阅者上次收到的内容不同的字段。
+    """
+
+    def __init__(self, max_events=100, keepalive_interval=15.0):
+        """初始化状态推送流
+
+        Args:
+            max_events: 缓存的最近事件数量，处理较慢的订阅者最多补发这么多事件
+            keepalive_interval: 无数据时发送心跳注释的间隔（秒），防止代理断开空闲连接
+        """
+        self.keepalive_interval = keepalive_interval
+        self._cond = threading.Condition()
+        self._state = {}
+        self._version = 0
+        self._events = deque(maxlen=max_events)
+        self._event_seq = 0
+        self._closed = False
+        self.subscriber_count = 0
+
+    def update(self, fields):
+        """合并状态字段，只有值发生变化时才唤醒订阅者
+
+        Args:
+            fields: 状态字段字典
+        """
+        with self._cond:
+            changed = False
+            for key, value in fields.items():
+                if self._state.get(key, _MISSING) != value:
+                    self._state[key] = value
+                    changed = True
+            if changed:
+                self._version += 1
+                self._cond.notify_all()
+
+    def emit_event(self, event_type, data):
+        """发布一个事件（如新问题、计时开始/结束）
+
+        Args:
+            event_type: 事件类型，对应SSE的event字段
+            data: 事件数据（可JSON序列化）
+        """
+        with self._cond:
+            self._event_seq += 1
+            self._events.append((self._event_seq, event_type, data))
+            self._cond.notify_all()
+
+    def close(self):
+        """关闭推送流，结束所有订阅连接"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def subscribe(self, min_interval=0.2):
+        """生成SSE数据流，供单个客户端连接使用
+
+        首条消息为完整状态，之后只推送变化的字段。
+
+        Args:
+            min_interval: 两次状态推送之间的最小间隔（秒）
+
+        Yields:
+            str: SSE格式的消息
+        """
+        with self._cond:
+            self.subscriber_count += 1
+            sent_state = {}
+            sent_version = -1
+            event_cursor = self._event_seq
+        last_push = 0.0
+
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(
+                        lambda: self._closed or self._version != sent_version or self._event_seq > event_cursor,
+                        timeout=self.keepalive_interval)
+                    if self._closed:
+                        break
+                    events = [event for event in self._events if event[0] > event_cursor]
+                    if events:
+                        event_cursor = events[-1][0]
+
+                for seq, event_type, data in events:
+                    yield _format_sse(event_type, data, seq)
+
+                # 限制状态推送频率：间隔未到时等待，期间的变化在下一次推送中合并发送
+                wait = last_push + min_interval - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+
+                with self._cond:
+                    version = self._version
+                    diff = {key: value for key, value in self._state.items()
+                            if sent_state.get(key, _MISSING) != value}
+
+                if version != sent_version and diff:
+                    sent_state.update(diff)
+                    last_push = time.monotonic()
+                    yield _format_sse('status', diff)
+                elif not events and version == sent_version:
+                    # 心跳，保持连接
+                    yield ': keepalive\n\n'
+                sent_version = version
+        finally:
+            with self._cond:
+                self.subscriber_count -= 1
+
+
+def _format_sse(event_type, data, event_id=None):
+    """将数据格式化为一条SSE消息
+
+    Args:
+        event_type: 事件类型
+        data: 事件数据
+        event_id: 事件ID（可选）
+
+    Returns:
+        str: SSE消息
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
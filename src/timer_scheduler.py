@@ -0,0 +1,241 @@
+# src/timer_scheduler.py - 定时器调度器，所有会话的定时任务共用一个线程和一个最小堆
+import heapq
+import threading
+import time
+
+from logging_utils import get_logger
+
+logger = get_logger("timer")
+
+
+class ScheduledTimer:
+    """一个定时任务 - 到期后在调度线程中执行回调，设置了间隔时会周期执行"""
+
+    def __init__(self, key, deadline, callback, interval=None):
+        """初始化定时任务
+
+        Args:
+            key: 任务键（同一个键同时只有一个有效任务）
+            deadline: 到期时间（time.monotonic()）
+            callback: 到期时执行的函数（无参数）
+            interval: 周期执行的间隔（秒），None表示只执行一次
+        """
+        self.key = key
+        self.deadline = deadline
+        self.callback = callback
+        self.interval = interval
+        self.cancelled = False
+        self.fired = 0
+
+    @property
+    def active(self):
+        """任务是否仍在等待执行"""
+        return not self.cancelled and (self.interval is not None or self.fired == 0)
+
+    def remaining(self):
+        """距离到期的剩余时间
+
+        Returns:
+            float: 剩余秒数，已到期时为0
+        """
+        return max(0.0, self.deadline - time.monotonic())
+
+
+class TimerScheduler:
+    """定时器调度器 - 以到期时间为序的最小堆，单个线程等待最早到期的任务
+
+    取消和重新安排任务时不从堆中删除旧条目，只在弹出时跳过已失效的条目。
+    回调在调度线程中执行，应当很快返回（如把语音请求放入队列、推送事件）。
+    """
+
+    def __init__(self, name="timer-scheduler"):
+        """初始化调度器并启动调度线程
+
+        Args:
+            name: 调度线程名称
+        """
+        self._heap = []  # 元素为 (到期时间, 序号, 任务)
+        self._seq = 0
+        self._timers = {}  # 任务键 -> 当前有效的任务
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def schedule(self, key, delay, callback, interval=None):
+        """安排定时任务，同一个键已有任务时替换旧任务
+
+        Args:
+            key: 任务键，建议使用 (所属对象, 名称, ...) 形式的元组，便于按所属对象批量取消
+            delay: 延迟时间（秒）
+            callback: 到期时执行的函数（无参数）
+            interval: 周期执行的间隔（秒），None表示只执行一次
+
+        Returns:
+            ScheduledTimer: 任务句柄
+        """
+        timer = ScheduledTimer(key, time.monotonic() + delay, callback, interval)
+        with self._cond:
+            previous = self._timers.get(key)
+            if previous is not None:
+                previous.cancelled = True
+            self._timers[key] = timer
+            self._push(timer)
+        return timer
+
+    def reschedule(self, key, delay):
+        """推迟或提前已有任务的到期时间
+
+        Args:
+            key: 任务键
+            delay: 从现在起的新延迟时间（秒）
+
+        Returns:
+            bool: 是否存在该任务
+        """
+        with self._cond:
+            timer = self._timers.get(key)
+            if timer is None or not timer.active:
+                return False
+            # 旧的堆条目在弹出时会因到期时间不一致而被跳过
+            timer.deadline = time.monotonic() + delay
+            self._push(timer)
+        return True
+
+    def cancel(self, key):
+        """取消任务
+
+        Args:
+            key: 任务键
+
+        Returns:
+            bool: 是否取消了一个等待中的任务
+        """
+        with self._cond:
+            timer = self._timers.pop(key, None)
+            if timer is None or not timer.active:
+                return False
+            timer.cancelled = True
+        return True
+
+    def cancel_owner(self, owner):
+        """取消某个对象的所有任务（任务键为以该对象开头的元组）
+
+        Args:
+            owner: 所属对象
+
+        Returns:
+            int: 取消的任务数量
+        """
+        with self._cond:
+            keys = [key for key in self._timers if isinstance(key, tuple) and key and key[0] is owner]
+            for key in keys:
+                self._timers.pop(key).cancelled = True
+        return len(keys)
+
+    def get(self, key):
+        """获取等待中的任务
+
+        Args:
+            key: 任务键
+
+        Returns:
+            ScheduledTimer: 任务句柄，不存在或已执行完时返回None
+        """
+        with self._cond:
+            timer = self._timers.get(key)
+        return timer if timer is not None and timer.active else None
+
+    def is_scheduled(self, key):
+        """判断任务是否在等待执行
+
+        Args:
+            key: 任务键
+
+        Returns:
+            bool: 是否在等待执行
+        """
+        return self.get(key) is not None
+
+    @property
+    def pending_count(self):
+        """等待执行的任务数量"""
+        with self._cond:
+            return len(self._timers)
+
+    def close(self):
+        """停止调度线程，未执行的任务全部丢弃"""
+        with self._cond:
+            self._closed = True
+            for timer in self._timers.values():
+                timer.cancelled = True
+            self._timers.clear()
+            self._heap.clear()
+            self._cond.notify_all()
+        self._thread.join(timeout=1)
+
+    def _push(self, timer):
+        """把任务放入堆，新任务比当前最早的任务更早到期时唤醒调度线程（调用方需持有锁）
+
+        Args:
+            timer: 定时任务
+        """
+        self._seq += 1
+        heapq.heappush(self._heap, (timer.deadline, self._seq, timer))
+        if self._heap[0][2] is timer:
+            self._cond.notify()
+
+    def _run(self):
+        """调度线程：等待最早到期的任务，到期后执行回调"""
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    deadline, _, timer = self._heap[0]
+                    if timer.cancelled or deadline != timer.deadline:
+                        # 已取消或已被重新安排的旧条目
+                        heapq.heappop(self._heap)
+                        continue
+                    wait_time = deadline - time.monotonic()
+                    if wait_time <= 0:
+                        break
+                    self._cond.wait(wait_time)
+                if self._closed:
+                    return
+
+                heapq.heappop(self._heap)
+                timer.fired += 1
+                if timer.interval is not None:
+                    timer.deadline += timer.interval
+                    # 回调耗时过长错过多个周期时，从现在起重新计时，避免连续补发
+                    now = time.monotonic()
+                    if timer.deadline <= now:
+                        timer.deadline = now + timer.interval
+                    self._push(timer)
+                elif self._timers.get(timer.key) is timer:
+                    del self._timers[timer.key]
+
+            try:
+                timer.callback()
+            except Exception as e:
+                logger.warning("⚠️ 定时任务执行失败 %s: %s", timer.key, e)
+
+
+_default_scheduler = None
+_default_lock = threading.Lock()
+
+
+def get_scheduler():
+    """获取进程内共享的调度器（首次调用时创建）
+
+    Returns:
+        TimerScheduler: 调度器
+    """
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = TimerScheduler()
+        return _default_scheduler
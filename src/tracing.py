@@ -0,0 +1,159 @@
+# src/tracing.py - 逐帧分阶段耗时追踪，导出为 Chrome trace-event 格式
+"""
+每个会话一个 Tracer，记录摄像头循环、检测器、评分等各阶段的起止时间到有界环形缓冲区。
+导出的JSON可在 chrome://tracing 或 Perfetto 中打开，查看单个慢帧的时间花在哪里。
+
+关闭时 begin() 只读取一个布尔属性并返回0，end() 收到0直接返回，几乎没有额外开销；
+运行时可随时开关（INTERVIEW_TRACING 设置默认值）。
+"""
+import os
+import threading
+import time
+from collections import deque
+
+# 默认是否开启追踪
+TRACING_ENABLED = os.environ.get('INTERVIEW_TRACING', '0') == '1'
+
+# 每个会话保留的事件数上限（约30帧/秒 × 每帧十余个阶段，可覆盖最近约1分钟）
+TRACE_CAPACITY = int(os.environ.get('INTERVIEW_TRACE_CAPACITY', 20000))
+
+
+class _NullSpan:
+    """追踪关闭时使用的空上下文"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """一个追踪区间（上下文管理器形式）"""
+
+    __slots__ = ('tracer', 'name', 'args', 'start')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.end(self.name, self.start, self.args)
+        return False
+
+
+class Tracer:
+    """分阶段追踪器 - 事件写入有界缓冲区，写满后覆盖最早的事件"""
+
+    def __init__(self, capacity=TRACE_CAPACITY, enabled=TRACING_ENABLED):
+        """初始化追踪器
+
+        Args:
+            capacity: 保留的事件数上限
+            enabled: 是否开启追踪
+        """
+        self.enabled = enabled
+        self._events = deque(maxlen=capacity)  # 元素为 (名称, 开始纳秒, 结束纳秒, 线程ID, 参数)
+        self._thread_names = {}
+
+    def begin(self):
+        """开始一个区间
+
+        Returns:
+            int: 开始时间（纳秒），追踪关闭时为0
+        """
+        if not self.enabled:
+            return 0
+        return time.perf_counter_ns()
+
+    def end(self, name, start, args=None):
+        """结束由 begin() 开始的区间并记录
+
+        Args:
+            name: 阶段名称
+            start: begin() 的返回值，为0时不记录
+            args: 附加信息（可选，如帧序号）
+        """
+        if not start:
+            return
+        thread = threading.current_thread()
+        if thread.ident not in self._thread_names:
+            self._thread_names[thread.ident] = thread.name
+        # deque.append 是原子操作，检测线程池中的线程可以同时写入
+        self._events.append((name, start, time.perf_counter_ns(), thread.ident, args))
+
+    def span(self, name, args=None):
+        """以上下文管理器形式记录一个区间
+
+        Args:
+            name: 阶段名称
+            args: 附加信息（可选）
+
+        Returns:
+            object: 上下文管理器
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def set_enabled(self, enabled):
+        """开启或关闭追踪
+
+        Args:
+            enabled: 是否开启
+        """
+        self.enabled = bool(enabled)
+
+    def clear(self):
+        """清空已记录的事件"""
+        self._events.clear()
+
+    def __len__(self):
+        return len(self._events)
+
+    def to_chrome_trace(self, seconds=None, pid=0, process_name=None):
+        """导出为 Chrome trace-event 格式
+
+        Args:
+            seconds: 只导出最近多少秒的事件（默认全部）
+            pid: 写入事件的进程ID（用于在同一文件中区分会话）
+            process_name: 进程名称（可选，显示在追踪查看器中）
+
+        Returns:
+            dict: 可直接序列化为JSON的追踪数据
+        """
+        events = list(self._events)
+        if seconds is not None:
+            cutoff = time.perf_counter_ns() - int(seconds * 1e9)
+            events = [event for event in events if event[2] >= cutoff]
+
+        trace_events = []
+        if process_name:
+            trace_events.append({'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                                 'args': {'name': process_name}})
+        for tid in sorted({event[3] for event in events}):
+            trace_events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                                 'args': {'name': self._thread_names.get(tid, str(tid))}})
+        for name, start, end, tid, args in events:
+            event = {
+                'name': name,
+                'cat': 'frame',
+                'ph': 'X',
+                'ts': start / 1000.0,
+                'dur': (end - start) / 1000.0,
+                'pid': pid,
+                'tid': tid
+            }
+            if args:
+                event['args'] = args
+            trace_events.append(event)
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
@@ -0,0 +1,170 @@
+# src/tts_cache.py - 语音合成结果缓存，按内容寻址持久化到磁盘，热点条目解码后常驻内存
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+
+class TTSCache:
+    """语音合成缓存 - 以文本、说话人和语速的哈希作为键
+
+    磁盘层保存合成得到的原始音频（MP3），进程重启和网络不可用时仍可使用；
+    内存层按LRU保存解码后的音频对象，命中时无需读取文件和解码即可直接播放。
+    """
+
+    def __init__(self, cache_dir, max_memory_entries=64, extension="mp3"):
+        """初始化缓存
+
+        Args:
+            cache_dir: 磁盘缓存目录
+            max_memory_entries: 内存中保留的已解码音频数量上限
+            extension: 音频文件扩展名
+        """
+        self.cache_dir = cache_dir
+        self.max_memory_entries = max_memory_entries
+        self.extension = extension
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(text, voice, rate):
+        """计算缓存键
+
+        Args:
+            text: 文本
+            voice: 说话人
+            rate: 语速
+
+        Returns:
+            str: 十六进制哈希值
+        """
+        content = f"{voice}\n{rate}\n{text}".encode('utf-8')
+        return hashlib.sha256(content).hexdigest()
+
+    def path_for(self, key):
+        """获取缓存键对应的音频文件路径
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            str: 文件路径
+        """
+        return os.path.join(self.cache_dir, f"{key}.{self.extension}")
+
+    def contains(self, key):
+        """判断缓存中是否已有该条目
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            bool: 是否存在
+        """
+        with self._lock:
+            if key in self._memory:
+                return True
+        path = self.path_for(key)
+        return os.path.exists(path) and os.path.getsize(path) > 0
+
+    def get_bytes(self, key):
+        """读取磁盘上的原始音频
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            bytes: 音频数据，不存在时返回None
+        """
+        try:
+            with open(self.path_for(key), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        return data or None
+
+    def put(self, key, data):
+        """写入原始音频（先写临时文件再替换，避免并发读到不完整的文件）
+
+        Args:
+            key: 缓存键
+            data: 音频数据
+
+        Returns:
+            str: 文件路径
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path_for(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        return path
+
+    def get_decoded(self, key, decoder):
+        """获取解码后的音频，内存未命中时从磁盘读取并解码
+
+        Args:
+            key: 缓存键
+            decoder: 解码函数，接收音频字节数据，返回可播放的音频对象
+
+        Returns:
+            object: 解码后的音频对象，磁盘上也没有该条目时返回None
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+
+        data = self.get_bytes(key)
+        if data is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        decoded = decoder(data)
+        with self._lock:
+            self.disk_hits += 1
+            self._memory[key] = decoded
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+        return decoded
+
+    def remove(self, key):
+        """删除缓存条目（内存和磁盘）
+
+        Args:
+            key: 缓存键
+        """
+        with self._lock:
+            self._memory.pop(key, None)
+        try:
+            os.remove(self.path_for(key))
+        except OSError:
+            pass
+
+    def clear_memory(self):
+        """清空内存层（磁盘缓存保留）"""
+        with self._lock:
+            self._memory.clear()
+
+    def get_stats(self):
+        """获取缓存统计信息
+
+        Returns:
+            dict: 内存条目数和各层命中次数
+        """
+        with self._lock:
+            return {
+                'memory_entries': len(self._memory),
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses
+            }
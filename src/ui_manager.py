@@ -279,13 +279,13 @@ class UIManager:
             color: 颜色
             radius: 点的半径
         """
-        if landmarks is None:
+        if landmarks is None or len(landmarks) == 0:
             return frame
             
-        for point in landmarks:
-            if point:
-                x, y = int(point[0]), int(point[1])
-                cv2.circle(frame, (x, y), radius, color, -1)
+        # 一次性转换为整数像素坐标，避免逐点构造元组
+        points = np.asarray(landmarks)[:, :2].astype(np.int32)
+        for x, y in points.tolist():
+            cv2.circle(frame, (x, y), radius, color, -1)
                 
         return frame
     
@@ -0,0 +1,250 @@
+# src/video_recorder.py - 流式视频录制器，边录制边分段写入磁盘，内存占用与录制时长无关
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+import cv2
+
+from logging_utils import get_logger, PER_FRAME
+
+logger = get_logger("recorder")
+
+
+class VideoRecorder:
+    """流式视频录制器 - 帧经有界队列交给写入线程，按时间分段增量编码到磁盘
+
+    摄像头线程调用 write() 提交帧：按录制帧率抽帧，队列满时直接丢弃，从不阻塞调用方。
+    写入线程负责缩放和编码，每个分段达到 segment_seconds 后关闭并开始下一个分段。
+    """
+
+    def __init__(self, output_dir, fps=8, resolution=(320, 240), segment_seconds=60,
+                 queue_size=32, fourcc="MJPG"):
+        """初始化录制器
+
+        Args:
+            output_dir: 视频保存目录
+            fps: 录制帧率
+            resolution: 录制分辨率（宽, 高）
+            segment_seconds: 每个分段的时长（秒）
+            queue_size: 待写入帧队列的最大长度
+            fourcc: 视频编码格式
+        """
+        self.output_dir = output_dir
+        self.fps = fps
+        self.resolution = tuple(resolution)
+        self.segment_seconds = segment_seconds
+        self.fourcc = fourcc
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._writer_thread = None
+        self._writer = None
+        self._segment_frames = 0
+        self._next_frame_time = 0.0
+        self.is_recording = False
+
+        # 当前录制的信息
+        self.recording_id = None
+        self.segments = []
+        self.frames_written = 0
+        self.frames_dropped = 0
+
+    def start(self):
+        """开始新的录制（如果正在录制，先结束之前的录制）"""
+        self.finalize()
+        with self._lock:
+            os.makedirs(self.output_dir, exist_ok=True)
+            self.recording_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+            self.segments = []
+            self.frames_written = 0
+            self.frames_dropped = 0
+            self._next_frame_time = 0.0
+            self.is_recording = True
+            self._writer_thread = threading.Thread(target=self._write_loop, name="video-recorder")
+            self._writer_thread.daemon = True
+            self._writer_thread.start()
+        logger.info("视频录制已开始: %s", self.recording_id)
+
+    def write(self, frame):
+        """提交一帧（按录制帧率抽帧，队列满时丢弃，不阻塞）
+
+        Args:
+            frame: 图像帧（提交后调用方不应再修改）
+
+        Returns:
+            bool: 该帧是否被接收
+        """
+        if not self.is_recording or frame is None:
+            return False
+
+        now = time.monotonic()
+        if now < self._next_frame_time:
+            return False
+        # 以计划时间推进，避免累积漂移；落后过多时重新对齐
+        self._next_frame_time = max(self._next_frame_time + 1.0 / self.fps, now)
+
+        try:
+            self._queue.put_nowait(frame)
+            return True
+        except queue.Full:
+            self.frames_dropped += 1
+            return False
+
+    def stop(self):
+        """停止接收新帧（不等待写入完成，已排队的帧由 finalize() 写完）"""
+        self.is_recording = False
+
+    def finalize(self, timeout=10, progress_callback=None):
+        """停止录制，等待队列中的帧写完并关闭当前分段
+
+        Args:
+            timeout: 等待写入线程结束的最长时间（秒）
+            progress_callback: 进度回调，参数为已写完的比例（0到1）
+
+        Returns:
+            dict: 本次录制的结果（分段文件列表、写入帧数、丢弃帧数）
+        """
+        with self._lock:
+            thread = self._writer_thread
+            self._writer_thread = None
+            if thread is not None:
+                self.is_recording = False
+                # 队列满时也要保证结束标记能送达
+                self._queue.put(None)
+        if thread is not None and thread is not threading.current_thread():
+            pending = self._queue.qsize()
+            deadline = time.monotonic() + timeout
+            while thread.is_alive() and time.monotonic() < deadline:
+                thread.join(timeout=0.1)
+                if progress_callback and pending:
+                    progress_callback(1.0 - self._queue.qsize() / pending)
+        return self.get_result()
+
+    def get_result(self):
+        """获取当前录制的结果
+
+        Returns:
+            dict: 录制结果
+        """
+        return {
+            'recording_id': self.recording_id,
+            'segments': list(self.segments),
+            'frames_written': self.frames_written,
+            'frames_dropped': self.frames_dropped,
+            'fps': self.fps,
+            'resolution': self.resolution
+        }
+
+    def concatenate(self, progress_callback=None, remove_segments=True):
+        """把本次录制的所有分段按顺序合并为一个完整的视频文件（需在 finalize() 之后调用）
+
+        分段使用相同的编码、帧率和分辨率，逐帧读出后写入新文件即可。
+
+        Args:
+            progress_callback: 进度回调，参数为已合并的比例（0到1）
+            remove_segments: 合并成功后是否删除分段文件
+
+        Returns:
+            str: 完整视频的路径，没有分段时返回None
+
+        Raises:
+            IOError: 无法创建合并后的视频文件
+        """
+        segments = [path for path in self.segments if os.path.exists(path)]
+        if not segments:
+            return None
+        output_path = os.path.join(self.output_dir, f"interview_{self.recording_id}.avi")
+        if len(segments) == 1:
+            # 只有一个分段时直接改名
+            os.replace(segments[0], output_path)
+            self.segments = [output_path]
+            if progress_callback:
+                progress_callback(1.0)
+            return output_path
+
+        writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, self.resolution)
+        if not writer.isOpened():
+            raise IOError(f"无法创建视频文件: {output_path}")
+        frames = 0
+        try:
+            for index, path in enumerate(segments):
+                cap = cv2.VideoCapture(path)
+                try:
+                    while True:
+                        ret, frame = cap.read()
+                        if not ret:
+                            break
+                        writer.write(frame)
+                        frames += 1
+                finally:
+                    cap.release()
+                if progress_callback:
+                    progress_callback((index + 1) / len(segments))
+        finally:
+            writer.release()
+        logger.info("已合并 %d 个分段，共 %d 帧: %s", len(segments), frames, output_path)
+
+        if remove_segments:
+            for path in segments:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.warning("删除分段文件失败 %s: %s", path, e)
+            self.segments = [output_path]
+        return output_path
+
+    @property
+    def queue_depth(self):
+        """待写入的帧数"""
+        return self._queue.qsize()
+
+    def _write_loop(self):
+        """写入线程：从队列取帧，缩放后写入当前分段"""
+        try:
+            while True:
+                frame = self._queue.get()
+                if frame is None:
+                    break
+                try:
+                    self._write_frame(frame)
+                except Exception as e:
+                    logger.warning("录制帧写入失败: %s", e, extra=PER_FRAME)
+        finally:
+            self._close_segment()
+            logger.info("视频录制已结束: %s，共写入 %d 帧，%d 个分段",
+                        self.recording_id, self.frames_written, len(self.segments))
+
+    def _write_frame(self, frame):
+        """写入一帧，必要时切换到新的分段
+
+        Args:
+            frame: 图像帧
+        """
+        if self._writer is not None and self._segment_frames >= self.segment_seconds * self.fps:
+            self._close_segment()
+        if self._writer is None:
+            self._open_segment()
+
+        if frame.shape[1] != self.resolution[0] or frame.shape[0] != self.resolution[1]:
+            frame = cv2.resize(frame, self.resolution)
+        self._writer.write(frame)
+        self._segment_frames += 1
+        self.frames_written += 1
+
+    def _open_segment(self):
+        """打开一个新的分段文件"""
+        path = os.path.join(self.output_dir,
+                            f"interview_{self.recording_id}_{len(self.segments) + 1:03d}.avi")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, self.resolution)
+        if not writer.isOpened():
+            raise IOError(f"无法创建视频文件: {path}")
+        self._writer = writer
+        self._segment_frames = 0
+        self.segments.append(path)
+
+    def _close_segment(self):
+        """关闭当前分段文件"""
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
@@ -8,6 +8,21 @@ import io
 import winsound
 import subprocess
 import asyncio
+import heapq
+import queue
+import wave
+from collections import deque
+
+import numpy as np
+
+from audio_stream import create_mp3_decoder
+from cosyvoice_client import CosyVoiceClient
+from timer_scheduler import get_scheduler
+from tts_cache import TTSCache
+from logging_utils import get_logger
+from metrics import TTS_FIRST_AUDIO_SECONDS, TTS_PLAYBACK_SECONDS, TTS_REQUESTS, TTS_SYNTHESIS_SECONDS
+
+logger = get_logger("voice")
 
 # 尝试导入 pygame 用于后台播放 MP3
 try:
@@ -15,25 +30,227 @@ try:
     pygame_available = True
 except ImportError:
     pygame_available = False
-    print("⚠️ pygame 库不可用，将使用系统播放器")
+    logger.warning("⚠️ pygame 库不可用，将使用系统播放器")
 
 # 尝试导入Edge TTS
 try:
     import edge_tts
     edgetts_available = True
-    print("✅ Edge TTS库可用，将作为首选语音合成方案")
+    logger.info("✅ Edge TTS库可用，将作为首选语音合成方案")
 except ImportError:
     edgetts_available = False
-    print("⚠️ Edge TTS库不可用")
+    logger.warning("⚠️ Edge TTS库不可用")
 
 # 导入pyttsx3作为备用语音合成方案
 try:
     import pyttsx3
     pyttsx3_available = True
-    print("✅ pyttsx3库可用，将作为备用语音合成方案")
+    logger.info("✅ pyttsx3库可用，将作为备用语音合成方案")
 except ImportError:
     pyttsx3_available = False
-    print("⚠️ pyttsx3备用方案不可用")
+    logger.warning("⚠️ pyttsx3备用方案不可用")
+
+# Edge TTS 说话人和语速
+EDGE_TTS_VOICE = os.environ.get('INTERVIEW_TTS_VOICE', 'zh-CN-XiaoxiaoNeural')  # 中文女声
+EDGE_TTS_RATE = os.environ.get('INTERVIEW_TTS_RATE', '+0%')
+
+# 语音缓存目录，以及内存中保留的已解码语音条数
+TTS_CACHE_DIR = os.environ.get(
+    'INTERVIEW_TTS_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tts_cache'))
+TTS_MEMORY_ENTRIES = int(os.environ.get('INTERVIEW_TTS_MEMORY_ENTRIES', 64))
+
+# 首选语音合成后端：edge（Edge TTS）或 cosyvoice（本机常驻的CosyVoice合成服务，见 cosyvoice_server.py）
+TTS_BACKEND = os.environ.get('INTERVIEW_TTS_BACKEND', 'edge')
+COSYVOICE_SPEAKER = os.environ.get('INTERVIEW_COSYVOICE_SPEAKER', '中文女')
+COSYVOICE_SPEED = float(os.environ.get('INTERVIEW_COSYVOICE_SPEED', 1.0))
+
+# 混音器参数，与Edge TTS和CosyVoice输出的采样率一致，流式播放时通常无需重采样
+MIXER_FREQUENCY = 24000
+
+# 语音请求优先级（数值越小越优先）：提问 > 紧急纠正提示 > 鼓励等普通提示
+PRIORITY_QUESTION = 0
+PRIORITY_URGENT = 1
+PRIORITY_NORMAL = 2
+
+# 提示的有效期（秒），排队超过该时间仍未播放则丢弃；提问不过期
+PROMPT_MAX_AGE = {
+    PRIORITY_URGENT: 3.0,
+    PRIORITY_NORMAL: 8.0
+}
+
+
+def format_question_prompt(question, position=""):
+    """构建提问语音的文本
+    
+    Args:
+        question: 问题文本
+        position: 面试岗位（可选）
+        
+    Returns:
+        str: 语音文本
+    """
+    question_text = f"{question}，你有5分钟的时间作答"
+    if position:
+        question_text = f"{position}面试问题：{question_text}"
+    return question_text
+
+
+def format_next_question_prompt(question):
+    """构建切换到下一个问题时的语音文本
+    
+    Args:
+        question: 问题文本
+        
+    Returns:
+        str: 语音文本
+    """
+    return f"下一个问题：{question}，你有5分钟的时间作答"
+
+
+async def stream_edge_tts(text, voice=EDGE_TTS_VOICE, rate=EDGE_TTS_RATE):
+    """调用Edge TTS合成语音，逐块返回收到的MP3数据
+    
+    Args:
+        text: 文本
+        voice: 说话人
+        rate: 语速
+        
+    Yields:
+        bytes: MP3音频数据块
+    """
+    communicate = edge_tts.Communicate(text, voice=voice, rate=rate)
+    async for chunk in communicate.stream():
+        if chunk["type"] == "audio":
+            yield chunk["data"]
+
+
+async def synthesize_edge_tts(text, voice=EDGE_TTS_VOICE, rate=EDGE_TTS_RATE):
+    """调用Edge TTS合成语音，直接在内存中收集音频数据
+    
+    Args:
+        text: 文本
+        voice: 说话人
+        rate: 语速
+        
+    Returns:
+        bytes: MP3音频数据
+    """
+    chunks = []
+    async for data in stream_edge_tts(text, voice, rate):
+        chunks.append(data)
+    return b"".join(chunks)
+
+
+class SpeechCancelled(Exception):
+    """语音请求在合成或播放过程中被取消"""
+
+
+class SpeechTruncated(Exception):
+    """语音已开始播放后合成中途失败，播放内容不完整"""
+
+
+class SpeechRequest:
+    """语音请求 - speak() 立即返回该对象，可用于查询状态、等待播放结束或取消
+    
+    状态依次为 pending、speaking，最终为 done、failed、cancelled
+    或 dropped（冷却中、已过期或被同类新提示取代）。
+    请求本身也是取消令牌：合成和播放过程中会持续检查，取消后立即中断网络请求并停止播放。
+    """
+    
+    def __init__(self, text, priority, urgent, cooldown, category=None, max_age=None):
+        """初始化语音请求
+        
+        Args:
+            text: 要说的文本
+            priority: 优先级（数值越小越优先）
+            urgent: 是否为紧急提示
+            cooldown: 冷却时间（秒）
+            category: 提示类别（可选）
+            max_age: 最长排队时间（秒），None表示不过期
+        """
+        self.text = text
+        self.priority = priority
+        self.urgent = urgent
+        self.cooldown = cooldown
+        self.category = category
+        self.max_age = max_age
+        self.created_at = time.monotonic()
+        self.status = 'pending'
+        self.reason = ''
+        self.started_at = None
+        self.first_audio_at = None
+        self._done = threading.Event()
+        self._cancelled = threading.Event()
+    
+    @property
+    def first_audio_latency(self):
+        """从开始处理到发出第一个声音的时间（秒），尚未发声时为None"""
+        if self.started_at is None or self.first_audio_at is None:
+            return None
+        return self.first_audio_at - self.started_at
+    
+    def mark_first_audio(self):
+        """记录开始发声的时间（只记录第一次）"""
+        if self.first_audio_at is None:
+            self.first_audio_at = time.monotonic()
+    
+    @property
+    def cancelled(self):
+        """是否已被取消"""
+        return self._cancelled.is_set()
+    
+    def cancel(self, reason='cancelled'):
+        """取消请求：尚未播放的直接结束，正在合成或播放的由语音工作线程尽快中断
+        
+        Args:
+            reason: 取消原因
+        """
+        if self.finished:
+            return
+        self.reason = reason
+        self._cancelled.set()
+        if self.status == 'pending':
+            self._finish('cancelled', reason)
+    
+    def check_cancelled(self):
+        """已被取消时抛出 SpeechCancelled"""
+        if self._cancelled.is_set():
+            raise SpeechCancelled(self.reason)
+    
+    @property
+    def finished(self):
+        """请求是否已结束"""
+        return self._done.is_set()
+    
+    @property
+    def success(self):
+        """是否已成功播放"""
+        return self.status == 'done'
+    
+    def wait(self, timeout=None):
+        """等待请求结束
+        
+        Args:
+            timeout: 最长等待时间（秒）
+            
+        Returns:
+            bool: 是否成功播放
+        """
+        self._done.wait(timeout)
+        return self.success
+    
+    def _finish(self, status, reason=''):
+        """结束请求
+        
+        Args:
+            status: 最终状态
+            reason: 原因说明
+        """
+        self.status = status
+        self.reason = reason
+        TTS_REQUESTS.inc(status=status)
+        self._done.set()
 
 
 class VoiceFeedback:
@@ -66,6 +283,10 @@ class VoiceFeedback:
             "很好，接下来是下一个问题",
             "回答得很全面，继续下一个问题"
         ]
+        self.on_question_timeout = None  # 作答超时时的回调（可选），参数为问题文本
+        
+        # 定时任务（问题计时、反馈冷却、定期鼓励）交给进程内共享的调度线程，任务键以本对象开头
+        self.timers = get_scheduler()
         
         # 预设反馈语料
         self.gaze_feedback = [
@@ -98,26 +319,70 @@ class VoiceFeedback:
         
         # 初始化Edge TTS
         self.edgetts_available = edgetts_available
+        self.tts_voice = EDGE_TTS_VOICE
+        self.tts_rate = EDGE_TTS_RATE
+        
+        # 语音缓存：相同文本只合成一次，之后直接从内存或磁盘播放
+        self.audio_cache = TTSCache(TTS_CACHE_DIR, max_memory_entries=TTS_MEMORY_ENTRIES)
+        
+        # CosyVoice后端：通过本机合成服务流式合成，结果以WAV格式缓存
+        self.tts_backend = TTS_BACKEND
+        self.cosyvoice = CosyVoiceClient() if TTS_BACKEND == 'cosyvoice' else None
+        self.cosyvoice_speaker = COSYVOICE_SPEAKER
+        self.cosyvoice_speed = COSYVOICE_SPEED
+        self.cosyvoice_cache = TTSCache(TTS_CACHE_DIR, max_memory_entries=TTS_MEMORY_ENTRIES, extension="wav")
+        
+        # pygame 混音器只初始化一次（None表示尚未尝试初始化）
+        self._mixer_ready = None
+        self._mixer_lock = threading.Lock()
         
         # 初始化pyttsx3引擎（备用方案）
         self.pyttsx3_engine = None
+        self._pyttsx3_active = False
         if pyttsx3_available:
             try:
                 self.pyttsx3_engine = pyttsx3.init()
                 self.pyttsx3_engine.setProperty('rate', 160)
                 self.pyttsx3_engine.setProperty('volume', 0.8)
-                print("✅ pyttsx3引擎初始化成功")
+                logger.info("✅ pyttsx3引擎初始化成功")
             except Exception as e:
-                print(f"⚠️ pyttsx3引擎初始化失败: {e}")
+                logger.warning("⚠️ pyttsx3引擎初始化失败: %s", e)
                 self.pyttsx3_engine = None
         
-        print("✅ 语音反馈系统已初始化")
+        # 语音工作线程：所有请求经优先级队列串行合成和播放，speak() 不阻塞调用方
+        self._queue = []  # 堆，元素为 (优先级, 序号, 请求)
+        self._queue_cond = threading.Condition()
+        self._queue_seq = 0
+        self._pending_by_category = {}
+        self._current = None  # 正在合成或播放的请求
+        self._closed = False
+        
+        # 首音延迟统计（从开始处理请求到发出第一个声音）
+        self.first_audio_latencies = deque(maxlen=100)
+        
+        self._worker = threading.Thread(target=self._speech_loop, name="speech-worker")
+        self._worker.daemon = True
+        self._worker.start()
+        
+        # 预取线程：在后台提前合成即将播放的问题，切换问题时可直接播放
+        self._prefetch_cond = threading.Condition()
+        self._prefetch_pending = None
+        self._prefetch_generation = 0
+        self._prefetch_keep_key = None
+        self._prefetched = {}  # 缓存键 -> 是否由预取新合成
+        self._prefetch_thread = threading.Thread(target=self._prefetch_loop, name="speech-prefetch")
+        self._prefetch_thread.daemon = True
+        self._prefetch_thread.start()
+        
+        logger.info("✅ 语音反馈系统已初始化")
+        if self.cosyvoice is not None:
+            logger.info("🔄 将优先使用CosyVoice合成服务: %s:%s", self.cosyvoice.host, self.cosyvoice.port)
         if self.edgetts_available:
-            print(f"🔄 将使用Edge TTS生成语音")
+            logger.info("🔄 将使用Edge TTS生成语音")
         if self.pyttsx3_engine:
-            print("🔧 已准备pyttsx3作为备用语音合成方案")
+            logger.info("🔧 已准备pyttsx3作为备用语音合成方案")
         else:
-            print("⚠️ pyttsx3备用方案不可用")
+            logger.warning("⚠️ pyttsx3备用方案不可用")
         
     def ask_question(self, question, position=""):
         """根据职业提问
@@ -127,71 +392,171 @@ class VoiceFeedback:
             position: 面试岗位（可选）
             
         Returns:
-            bool: 是否成功播放语音
+            SpeechRequest: 语音请求句柄
         """
-        # 设置当前问题和开始时间
-        self.current_question = question
-        self.question_start_time = datetime.now().timestamp()
-        
         # 构建问题文本
-        question_text = f"{question}，你有5分钟的时间作答"
-        if position:
-            question_text = f"{position}面试问题：{question_text}"
+        question_text = format_question_prompt(question, position)
         
         # 播放问题
-        result = self.speak(question_text, urgent=False, cooldown=0)  # 提问时无冷却
+        result = self.speak(question_text, cooldown=0, category="question", priority=PRIORITY_QUESTION)  # 提问时无冷却
         
-        # 启动5分钟倒计时线程
-        self._start_question_timer()
+        # 开始作答计时（上一个问题的计时随之取消）
+        self.start_question_timer(question)
         
         return result
+    
+    def start_question_timer(self, question=None, duration=None):
+        """开始当前问题的作答计时，之前问题未到期的计时被替换
         
-    def _start_question_timer(self):
-        """启动问题倒计时计时器
+        Args:
+            question: 问题文本（可选，默认沿用当前问题）
+            duration: 作答时间（秒），默认使用 question_duration
+            
+        Returns:
+            ScheduledTimer: 计时任务句柄
         """
-        def timer_thread():
-            # 等待5分钟
-            time.sleep(self.question_duration)
+        if question is not None:
+            self.current_question = question
+        self.question_start_time = datetime.now().timestamp()
+        question = self.current_question
+        
+        def on_timeout():
+            # 计时到期的同时切换了问题时，不再提示上一个问题
+            if self.current_question == question:
+                self._on_question_timeout(question)
+        
+        return self.timers.schedule((self, 'question'), duration or self.question_duration, on_timeout)
+    
+    def cancel_question_timer(self):
+        """取消当前问题的作答计时
+        
+        Returns:
+            bool: 是否取消了等待中的计时
+        """
+        return self.timers.cancel((self, 'question'))
+    
+    def _on_question_timeout(self, question):
+        """作答时间到：给出提示并通知回调
+        
+        Args:
+            question: 超时的问题
+        """
+        self._give_question_feedback()
+        if self.on_question_timeout is not None:
+            self.on_question_timeout(question)
+    
+    def feedback_ready(self, category):
+        """判断某类反馈是否已过冷却期
+        
+        Args:
+            category: 反馈类别
             
-            # 5分钟后给出反馈
-            self._give_question_feedback()
+        Returns:
+            bool: 是否可以给出该类反馈
+        """
+        return not self.timers.is_scheduled((self, 'cooldown', category))
+    
+    def start_feedback_cooldown(self, category, interval):
+        """开始某类反馈的冷却期（应在提示被语音队列接受后调用）
         
-        # 创建并启动线程
-        thread = threading.Thread(target=timer_thread)
-        thread.daemon = True
-        thread.start()
+        Args:
+            category: 反馈类别
+            interval: 冷却时间（秒）
+        """
+        self.timers.schedule((self, 'cooldown', category), interval, lambda: None)
+    
+    def reset_feedback_cooldown(self, category):
+        """提前结束某类反馈的冷却期
+        
+        Args:
+            category: 反馈类别
+        """
+        self.timers.cancel((self, 'cooldown', category))
+    
+    def start_encouragement(self, interval, condition=None):
+        """开始定期鼓励
+        
+        Args:
+            interval: 间隔时间（秒）
+            condition: 返回是否应当鼓励的函数（可选），每次到期时调用
+            
+        Returns:
+            ScheduledTimer: 定时任务句柄
+        """
+        def encourage():
+            if condition is None or condition():
+                self.give_encouragement(urgent=False)
+        
+        return self.timers.schedule((self, 'encouragement'), interval, encourage, interval=interval)
+    
+    def stop_encouragement(self):
+        """停止定期鼓励"""
+        self.timers.cancel((self, 'encouragement'))
+    
+    def cancel_timers(self):
+        """取消本对象的所有定时任务（问题计时、反馈冷却、定期鼓励）
+        
+        Returns:
+            int: 取消的任务数量
+        """
+        return self.timers.cancel_owner(self)
         
     def _give_question_feedback(self):
         """给出问题反馈
         """
         # 随机选择一个反馈
         feedback = random.choice(self.question_feedback)
-        self.speak(feedback, urgent=False, cooldown=0)
+        self.speak(feedback, cooldown=0, category="question_feedback")
     
-    def stop_speaking(self):
-        """停止当前正在播放的语音
+    def stop_speaking(self, clear_queue=False):
+        """立即停止当前语音：中断进行中的合成请求并停止播放，语音工作线程随即处理下一个请求
         
-        注意：CosyVoice API是异步的，无法直接停止正在播放的语音
-        这里仅更新状态标记
+        Args:
+            clear_queue: 是否同时取消队列中尚未播放的请求
+            
+        Returns:
+            bool: 是否有正在进行的语音被停止
         """
-        with self.voice_lock:
-            if self.is_speaking:
-                print(f"⏹️  已标记语音播放为停止状态")
-                self.is_speaking = False
+        with self._queue_cond:
+            current = self._current
+            if clear_queue:
+                for _, _, request in self._queue:
+                    if request.status == 'pending':
+                        request._finish('cancelled', 'stopped')
+                self._pending_by_category.clear()
+        if current is None or current.finished:
+            return False
+        self._cancel_current(current, 'stopped')
+        logger.info("⏹️  已停止语音: %s", current.text)
+        return True
     
-    def speak(self, text, urgent=False, cooldown=None):
-        """语音输出（带冷却时间）
+    def _cancel_current(self, request, reason):
+        """取消正在进行的请求（pyttsx3 需要主动停止引擎）
+        
+        Args:
+            request: 正在进行的请求
+            reason: 取消原因
+        """
+        request.cancel(reason)
+        if self._pyttsx3_active and self.pyttsx3_engine:
+            try:
+                self.pyttsx3_engine.stop()
+            except Exception as e:
+                logger.warning("⚠️ 停止pyttsx3失败: %s", e)
+    
+    def speak(self, text, urgent=False, cooldown=None, category=None, priority=None):
+        """提交语音请求（不阻塞，由语音工作线程按优先级合成和播放）
         
         Args:
             text: 要说的文本
-            urgent: 是否为紧急提示（影响冷却时间）
+            urgent: 是否为紧急提示（优先播放，使用较短的冷却时间）
             cooldown: 自定义冷却时间（覆盖默认值）
+            category: 提示类别，同类别的新请求会取代尚未播放的旧请求
+            priority: 自定义优先级（数值越小越优先），默认由 urgent 决定
             
         Returns:
-            bool: 是否成功播放语音
+            SpeechRequest: 请求句柄
         """
-        current_time = datetime.now().timestamp()
-        
         # 确定冷却时间
         if cooldown is not None:
             actual_cooldown = cooldown
@@ -200,151 +565,700 @@ class VoiceFeedback:
         else:
             actual_cooldown = self.default_cooldown
         
-        # 打印调试信息
-        print(f"🔊 语音调试: 准备播放 '{text}'")
-        print(f"🔊 语音调试: 当前时间 {current_time}, 上次说话时间 {self.last_speak_time}")
-        print(f"🔊 语音调试: 冷却时间设置 {actual_cooldown}, 时间差 {current_time - self.last_speak_time}")
+        if priority is None:
+            priority = PRIORITY_URGENT if urgent else PRIORITY_NORMAL
+        
+        request = SpeechRequest(text, priority, urgent, actual_cooldown,
+                                category=category, max_age=PROMPT_MAX_AGE.get(priority))
+        
+        # 冷却时间内的提示直接丢弃，不进入队列
+        if self._in_cooldown(request):
+            request._finish('dropped', 'cooldown')
+            return request
+        
+        with self._queue_cond:
+            if self._closed:
+                request._finish('dropped', 'closed')
+                return request
+            # 同类别尚未播放的旧提示已过时，由新提示取代
+            if category:
+                previous = self._pending_by_category.get(category)
+                if previous is not None and previous.status == 'pending':
+                    previous._finish('dropped', 'superseded')
+                self._pending_by_category[category] = request
+            self._queue_seq += 1
+            heapq.heappush(self._queue, (priority, self._queue_seq, request))
+            self._queue_cond.notify()
+            # 打断正在进行的语音：更高优先级的请求，或同类别的新请求（如跳过问题）
+            current = self._current
+            preempt = current is not None and not current.finished and (
+                priority < current.priority or (category and current.category == category))
+        
+        if preempt:
+            self._cancel_current(current, 'preempted')
+        
+        logger.debug("🔊 语音提示: %s", text)
+        return request
+    
+    @property
+    def pending_count(self):
+        """队列中等待播放的请求数"""
+        with self._queue_cond:
+            return sum(1 for _, _, request in self._queue if request.status == 'pending')
+    
+    def close(self):
+        """停止语音工作线程和预取线程，丢弃尚未播放的请求和定时任务"""
+        self.cancel_timers()
+        with self._queue_cond:
+            self._closed = True
+            for _, _, request in self._queue:
+                if request.status == 'pending':
+                    request._finish('dropped', 'closed')
+            self._queue.clear()
+            self._pending_by_category.clear()
+            self._queue_cond.notify_all()
+        with self._prefetch_cond:
+            self._prefetch_pending = None
+            self._prefetch_cond.notify_all()
+    
+    def prefetch(self, text):
+        """在后台提前合成语音（只保留最新一次预取，尚未开始的旧预取被取代）
+        
+        Args:
+            text: 即将播放的文本
+        """
+        # CosyVoice服务流式合成，首个音频块即开始播放，无需预取
+        if self.cosyvoice is not None:
+            return
+        with self._prefetch_cond:
+            self._prefetch_pending = text
+            self._prefetch_cond.notify()
+    
+    def discard_prefetch(self, keep_text=None):
+        """结束一轮预取：与实际播放的文本不同的预取语音被丢弃，由预取新合成的缓存条目会被删除
+        
+        Args:
+            keep_text: 仍需保留的文本（与实际要播放的文本一致的预取不丢弃）
+        """
+        keep_key = self._cache_key(keep_text) if keep_text is not None else None
+        with self._prefetch_cond:
+            if self._prefetch_pending is not None and self._cache_key(self._prefetch_pending) != keep_key:
+                self._prefetch_pending = None
+            self._prefetch_generation += 1
+            self._prefetch_keep_key = keep_key
+            # 与实际文本一致的预取已被使用，不再跟踪
+            discarded = [key for key, created in self._prefetched.items() if key != keep_key and created]
+            self._prefetched = {}
+        for key in discarded:
+            self.audio_cache.remove(key)
+        if discarded:
+            logger.info("🗑️ 已丢弃 %d 条未使用的预取语音", len(discarded))
+    
+    def _prefetch_loop(self):
+        """预取线程：合成最新的预取文本，并解码到内存缓存"""
+        while True:
+            with self._prefetch_cond:
+                while self._prefetch_pending is None and not self._closed:
+                    self._prefetch_cond.wait()
+                if self._closed:
+                    break
+                text = self._prefetch_pending
+                self._prefetch_pending = None
+                generation = self._prefetch_generation
+            
+            key = self._cache_key(text)
+            created = not self.audio_cache.contains(key)
+            try:
+                if created and self._prepare_audio(text) is None:
+                    continue
+                if self._ensure_mixer():
+                    self.audio_cache.get_decoded(key, self._decode_sound)
+            except Exception as e:
+                logger.warning("⚠️ 语音预取失败: %s", e)
+                continue
+            
+            with self._prefetch_cond:
+                if generation == self._prefetch_generation:
+                    self._prefetched[key] = self._prefetched.get(key, False) or created
+                    continue
+                if key == self._prefetch_keep_key:
+                    continue
+            # 预取期间这一轮已结束且预测落空
+            if created:
+                self.audio_cache.remove(key)
+    
+    def _in_cooldown(self, request):
+        """判断请求是否处于冷却时间内（紧急提示和提问不受全局冷却限制）
         
-        # 检查冷却时间
-        if current_time - self.last_speak_time < actual_cooldown and not urgent:
-            print(f"🔊 语音提示: 冷却时间内，跳过播放 '{text}'")
+        Args:
+            request: 语音请求
+            
+        Returns:
+            bool: 是否需要丢弃
+        """
+        if request.urgent or request.priority <= PRIORITY_URGENT:
             return False
+        return request.cooldown > 0 and datetime.now().timestamp() - self.last_speak_time < request.cooldown
+    
+    def _speech_loop(self):
+        """语音工作线程：按优先级取出请求，丢弃过期的请求，其余依次合成和播放（冷却时间在 speak 提交时判断）"""
+        while True:
+            with self._queue_cond:
+                while not self._queue and not self._closed:
+                    self._queue_cond.wait()
+                if self._closed:
+                    break
+                _, _, request = heapq.heappop(self._queue)
+                if request.status != 'pending' or request.cancelled:
+                    continue
+                if self._pending_by_category.get(request.category) is request:
+                    del self._pending_by_category[request.category]
+                
+                if request.max_age is not None and time.monotonic() - request.created_at > request.max_age:
+                    request._finish('dropped', 'stale')
+                    continue
+                request.status = 'speaking'
+                request.started_at = time.monotonic()
+                self._current = request
+            
+            try:
+                success = self._speak_now(request)
+            except SpeechCancelled:
+                success = None
+            except Exception as e:
+                logger.warning("⚠️ 语音播放异常: %s", e)
+                success = False
+            finally:
+                with self._queue_cond:
+                    self._current = None
+            
+            if success is None:
+                request._finish('cancelled', request.reason)
+            elif success:
+                self._record_feedback(request)
+                TTS_PLAYBACK_SECONDS.observe(time.monotonic() - request.started_at)
+                latency = request.first_audio_latency
+                if latency is not None:
+                    self.first_audio_latencies.append(latency)
+                    TTS_FIRST_AUDIO_SECONDS.observe(latency)
+                    logger.info("⏱️ 首音延迟 %.0f ms: %s", latency * 1000, request.text)
+                request._finish('done')
+            else:
+                request._finish('failed')
+    
+    def _record_feedback(self, request):
+        """记录成功播放的提示，并更新最后说话时间
         
-        print(f"🔊 语音提示: {text}")
-        success = False
+        Args:
+            request: 语音请求
+        """
+        current_time = datetime.now().timestamp()
+        self.last_speak_time = current_time
         
-        # 停止当前正在播放的语音
-        self.stop_speaking()
+        # 记录反馈历史
+        self.feedback_history.append({
+            'time': current_time,
+            'text': request.text,
+            'urgent': request.urgent
+        })
+        
+        # 限制历史记录大小
+        if len(self.feedback_history) > self.max_history:
+            self.feedback_history.pop(0)
+    
+    def _speak_now(self, request):
+        """在语音工作线程中合成并播放语音，直到播放结束或请求被取消
         
+        Args:
+            request: 语音请求（同时作为取消令牌）
+            
+        Returns:
+            bool: 是否成功播放语音
+            
+        Raises:
+            SpeechCancelled: 请求在合成或播放过程中被取消
+        """
+        text = request.text
+        success = False
         try:
             with self.voice_lock:
                 self.is_speaking = True
             
-            # 优先使用Edge TTS
-            if self.edgetts_available:
-                print(f"🔄 使用Edge TTS生成语音，说话人: 中文女")
-                temp_filename = None
+            # 配置了CosyVoice合成服务时优先使用（流式播放，首个音频块到达即开始）
+            if self.cosyvoice is not None:
                 try:
-                    # 创建临时文件
-                    import tempfile
-                    with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as temp_file:
-                        temp_filename = temp_file.name
-                    
-                    # 生成语音
-                    async def generate_and_play():
-                        communicate = edge_tts.Communicate(text, voice="zh-CN-XiaoxiaoNeural")  # 中文女声
-                        await communicate.save(temp_filename)
-                    
-                    # 运行异步函数
-                    asyncio.run(generate_and_play())
-                    
-                    # 播放音频文件
-                    print("播放语音...")
+                    success = self._speak_cosyvoice(request)
+                except SpeechTruncated as e:
+                    # 已经播放了一部分，不再用其他方案从头重播，本次请求按失败处理
+                    logger.warning("⚠️ CosyVoice语音播放不完整: %s", e)
+                    return False
+            
+            # CosyVoice不可用时使用Edge TTS（含缓存），网络不可用时仍可播放已缓存的语音
+            if not success:
+                if self.edgetts_available or self.audio_cache.contains(self._cache_key(text)):
                     try:
-                        if temp_filename and os.path.exists(temp_filename) and os.path.getsize(temp_filename) > 0:
-                            # 确保文件存在且不为空
-                            print(f"音频文件大小: {os.path.getsize(temp_filename)} 字节")
-                            
-                            # 优先使用 pygame 后台播放
-                            if pygame_available:
-                                print("使用 pygame 后台播放...")
-                                try:
-                                    # 初始化 pygame 混音器
-                                    pygame.mixer.init()
-                                    pygame.mixer.music.load(temp_filename)
-                                    pygame.mixer.music.play()
-                                    
-                                    # 等待播放完成
-                                    while pygame.mixer.music.get_busy():
-                                        time.sleep(0.1)
-                                    
-                                    print("✅ pygame 后台播放完成")
-                                    success = True
-                                    print(f"✅ Edge TTS调用成功")
-                                except Exception as pygame_e:
-                                    print(f"⚠️ pygame 播放失败: {pygame_e}")
-                                    # 回退到系统播放器
-                                    if os.name == 'nt':
-                                        os.startfile(temp_filename)
-                                        print("✅ 系统播放器已启动")
-                                        # 等待播放完成
-                                        estimated_duration = len(text) / 5 + 2
-                                        time.sleep(estimated_duration)
-                                        success = True
-                                        print(f"✅ Edge TTS调用成功")
-                                    else:
-                                        success = False
-                            else:
-                                # 使用系统默认播放器
-                                print("使用系统播放器播放...")
-                                if os.name == 'nt':
-                                    os.startfile(temp_filename)
-                                    print("✅ 系统播放器已启动")
-                                    # 等待播放完成
-                                    estimated_duration = len(text) / 5 + 2
-                                    time.sleep(estimated_duration)
-                                    success = True
-                                    print(f"✅ Edge TTS调用成功")
-                                else:
-                                    success = False
-                        else:
-                            print(f"⚠️ 音频文件不存在或为空: {temp_filename}")
-                            success = False
-                    except Exception as play_e:
-                        print(f"⚠️ 播放音频失败: {play_e}")
+                        success = self._speak_edge_tts(request)
+                    except SpeechCancelled:
+                        raise
+                    except Exception as e:
+                        logger.warning("⚠️ Edge TTS调用失败，切换到pyttsx3: %s", e)
                         success = False
-                except Exception as e:
-                    print(f"⚠️ Edge TTS调用失败，切换到pyttsx3: {e}")
+                else:
+                    logger.warning("⚠️ Edge TTS不可用，使用pyttsx3")
                     success = False
-                finally:
-                    # 删除临时文件
-                    try:
-                        if temp_filename and os.path.exists(temp_filename):
-                            # 等待额外时间确保播放器已读取文件
-                            time.sleep(1)
-                            os.unlink(temp_filename)
-                            print(f"✅ 临时文件已清理: {temp_filename}")
-                    except Exception as del_e:
-                        print(f"⚠️ 删除临时文件失败: {del_e}")
-            else:
-                print(f"⚠️ Edge TTS不可用，使用pyttsx3")
-                success = False
             
             # 如果Edge TTS失败，使用pyttsx3作为备用方案
             if not success and self.pyttsx3_engine:
-                print(f"🔄 尝试使用pyttsx3作为备用语音方案")
+                request.check_cancelled()
+                logger.debug("🔄 尝试使用pyttsx3作为备用语音方案")
                 try:
+                    self._pyttsx3_active = True
+                    request.mark_first_audio()
                     self.pyttsx3_engine.say(text)
                     self.pyttsx3_engine.runAndWait()
+                    request.check_cancelled()
                     success = True
-                    print(f"✅ pyttsx3语音播放成功")
+                    logger.debug("✅ pyttsx3语音播放成功")
+                except SpeechCancelled:
+                    raise
                 except Exception as pyttsx3_e:
-                    print(f"⚠️ pyttsx3语音播放失败: {pyttsx3_e}")
+                    logger.warning("⚠️ pyttsx3语音播放失败: %s", pyttsx3_e)
                     success = False
+                finally:
+                    self._pyttsx3_active = False
             
             if not success:
-                print(f"⚠️ 语音合成失败，跳过播放")
-                success = False
+                logger.warning("⚠️ 语音合成失败，跳过播放")
         finally:
             with self.voice_lock:
                 self.is_speaking = False
         
-        if success:
-            # 更新最后说话时间
-            self.last_speak_time = current_time
+        return success
+    
+    def _speak_edge_tts(self, request):
+        """使用Edge TTS播放语音：已缓存时直接播放，否则尽量边合成边播放
+        
+        Args:
+            request: 语音请求（同时作为取消令牌）
             
-            # 记录反馈历史
-            self.feedback_history.append({
-                'time': current_time,
-                'text': text,
-                'urgent': urgent
-            })
+        Returns:
+            bool: 是否成功播放
             
-            # 限制历史记录大小
-            if len(self.feedback_history) > self.max_history:
-                self.feedback_history.pop(0)
+        Raises:
+            SpeechCancelled: 合成或播放过程中被取消
+        """
+        text = request.text
+        key = self._cache_key(text)
+        if not self.audio_cache.contains(key) and self.edgetts_available and self._ensure_mixer():
+            decoder = create_mp3_decoder(pygame.mixer.get_init()[0])
+            if decoder is not None:
+                return self._stream_edge_tts(key, request, decoder)
         
-        return success
+        # 没有可用的流式解码器时，先完整合成再播放
+        key = self._prepare_audio(text, request)
+        return key is not None and self._play_cached_audio(key, text, request)
+    
+    def _stream_edge_tts(self, key, request, decoder):
+        """边接收Edge TTS音频块边解码播放，第一块解码完成即开始发声，完整的语音写入缓存
+        
+        Args:
+            key: 缓存键
+            request: 语音请求（同时作为取消令牌）
+            decoder: MP3增量解码器
+            
+        Returns:
+            bool: 是否成功播放
+            
+        Raises:
+            SpeechCancelled: 合成或播放过程中被取消
+        """
+        sample_rate = pygame.mixer.get_init()[0]
+        mp3_chunks = []
+        
+        def decode():
+            for data in self._iter_edge_tts(request.text, request):
+                mp3_chunks.append(data)
+                pcm = decoder.feed(data)
+                if pcm:
+                    yield sample_rate, pcm
+            pcm = decoder.flush()
+            if pcm:
+                yield sample_rate, pcm
+        
+        logger.debug("🔄 使用Edge TTS流式生成语音，说话人: %s", self.tts_voice)
+        try:
+            played = self._play_pcm_stream(decode(), request) is not None
+        finally:
+            decoder.close()
+        
+        if played and mp3_chunks:
+            self.audio_cache.put(key, b"".join(mp3_chunks))
+        return played
+    
+    def _iter_edge_tts(self, text, token=None):
+        """在后台线程运行Edge TTS流式合成，逐块返回MP3数据
+        
+        Args:
+            text: 文本
+            token: 取消令牌（可选），取消时中断网络请求
+            
+        Yields:
+            bytes: MP3音频数据块
+            
+        Raises:
+            SpeechCancelled: 合成过程中被取消
+        """
+        chunks = queue.Queue()
+        
+        async def produce():
+            async for data in stream_edge_tts(text, self.tts_voice, self.tts_rate):
+                chunks.put(data)
+        
+        def run():
+            try:
+                start = time.perf_counter()
+                self._run_cancellable(produce(), token)
+                TTS_SYNTHESIS_SECONDS.observe(time.perf_counter() - start, backend="edge")
+                chunks.put(None)
+            except BaseException as e:
+                chunks.put(e)
+        
+        thread = threading.Thread(target=run, name="edge-tts-stream")
+        thread.daemon = True
+        thread.start()
+        while True:
+            item = chunks.get()
+            if item is None:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    
+    def get_tts_stats(self):
+        """获取语音合成统计信息
+        
+        Returns:
+            dict: 首音延迟（毫秒）和缓存命中情况
+        """
+        latencies = sorted(self.first_audio_latencies)
+        stats = {
+            'first_audio_count': len(latencies),
+            'first_audio_last_ms': None,
+            'first_audio_avg_ms': None,
+            'first_audio_p95_ms': None,
+            'pending': self.pending_count,
+            'cache': self.audio_cache.get_stats()
+        }
+        if latencies:
+            stats['first_audio_last_ms'] = round(self.first_audio_latencies[-1] * 1000, 1)
+            stats['first_audio_avg_ms'] = round(sum(latencies) / len(latencies) * 1000, 1)
+            stats['first_audio_p95_ms'] = round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1)
+        return stats
+    
+    def _speak_cosyvoice(self, request):
+        """通过CosyVoice合成服务流式合成并播放，播放完整的语音写入缓存
+        
+        Args:
+            request: 语音请求（同时作为取消令牌）
+            
+        Returns:
+            bool: 是否成功播放（服务不可用时返回False，由调用方回退到其他方案）
+            
+        Raises:
+            SpeechCancelled: 合成或播放过程中被取消
+            SpeechTruncated: 已开始播放后合成中途失败
+        """
+        text = request.text
+        key = TTSCache.make_key(text, f"cosyvoice:{self.cosyvoice_speaker}", self.cosyvoice_speed)
+        if self.cosyvoice_cache.contains(key):
+            return self._play_cached_audio(key, text, request, cache=self.cosyvoice_cache)
+        if not self._ensure_mixer():
+            return False
+        
+        chunks = []
+        sample_rate = None
+        
+        def receive():
+            nonlocal sample_rate
+            start = time.perf_counter()
+            for sample_rate, pcm in self.cosyvoice.stream(text, self.cosyvoice_speaker, self.cosyvoice_speed,
+                                                          cancel_check=lambda: request.cancelled):
+                chunks.append(pcm)
+                yield sample_rate, pcm
+            if chunks and not request.cancelled:
+                TTS_SYNTHESIS_SECONDS.observe(time.perf_counter() - start, backend="cosyvoice")
+        
+        try:
+            self._play_pcm_stream(receive(), request)
+        except ConnectionError as e:
+            # 合成中途失败时已播放的部分不完整，不写入缓存
+            if chunks:
+                raise SpeechTruncated(e) from e
+            logger.warning("⚠️ CosyVoice合成服务调用失败: %s", e)
+            return False
+        request.check_cancelled()
+        
+        if chunks:
+            self.cosyvoice_cache.put(key, self._pcm_to_wav(b"".join(chunks), sample_rate))
+        return bool(chunks)
+    
+    def _play_pcm_stream(self, chunks, token=None):
+        """边接收边播放PCM音频块：第一块到达即开始播放，后续块依次排入同一声道
+        
+        Args:
+            chunks: 可迭代对象，元素为 (采样率, 16位单声道PCM字节数据)
+            token: 取消令牌（可选），取消时立即停止播放
+            
+        Returns:
+            float: 开始播放的时间（time.monotonic()），没有收到音频时返回None
+            
+        Raises:
+            SpeechCancelled: 播放过程中被取消
+        """
+        channel = None
+        first_audio_time = None
+        for sample_rate, pcm in chunks:
+            if token is not None:
+                token.check_cancelled()
+            if not pcm:
+                continue
+            sound = self._pcm_to_sound(pcm, sample_rate)
+            if channel is None:
+                channel = pygame.mixer.find_channel(True)
+                channel.play(sound)
+                first_audio_time = time.monotonic()
+                if token is not None:
+                    token.mark_first_audio()
+            else:
+                # 每个声道只能排队一个声音，等上一个排队的声音开始播放后再排入
+                self._wait_playback(lambda: channel.get_queue() is not None, channel.stop, token)
+                channel.queue(sound)
+        if token is not None:
+            token.check_cancelled()
+        if channel is not None:
+            self._wait_playback(channel.get_busy, channel.stop, token)
+        return first_audio_time
+    
+    @staticmethod
+    def _pcm_to_sound(pcm, sample_rate):
+        """将16位单声道PCM数据转换为与混音器格式一致的 pygame Sound 对象
+        
+        Args:
+            pcm: PCM字节数据
+            sample_rate: 采样率
+            
+        Returns:
+            pygame.mixer.Sound: 音频对象
+        """
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        frequency, _, channels = pygame.mixer.get_init()
+        if sample_rate != frequency and len(samples) > 1:
+            count = int(round(len(samples) * frequency / sample_rate))
+            positions = np.linspace(0, len(samples) - 1, count)
+            samples = np.interp(positions, np.arange(len(samples)), samples).astype(np.int16)
+        if channels > 1:
+            samples = np.repeat(samples[:, None], channels, axis=1)
+        return pygame.mixer.Sound(buffer=np.ascontiguousarray(samples).tobytes())
+    
+    @staticmethod
+    def _pcm_to_wav(pcm, sample_rate):
+        """将16位单声道PCM数据封装为WAV格式
+        
+        Args:
+            pcm: PCM字节数据
+            sample_rate: 采样率
+            
+        Returns:
+            bytes: WAV数据
+        """
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(sample_rate)
+            wav_file.writeframes(pcm)
+        return buffer.getvalue()
+    
+    def _cache_key(self, text):
+        """计算文本在当前说话人和语速下的缓存键
+        
+        Args:
+            text: 文本
+            
+        Returns:
+            str: 缓存键
+        """
+        return TTSCache.make_key(text, self.tts_voice, self.tts_rate)
+    
+    def _prepare_audio(self, text, token=None):
+        """确保文本对应的语音已在缓存中，未缓存时调用Edge TTS合成
+        
+        Args:
+            text: 文本
+            token: 取消令牌（语音请求），取消时中断进行中的网络请求
+            
+        Returns:
+            str: 缓存键，合成失败时返回None
+            
+        Raises:
+            SpeechCancelled: 合成过程中被取消
+        """
+        key = self._cache_key(text)
+        if self.audio_cache.contains(key):
+            return key
+        if not self.edgetts_available:
+            return None
+        
+        logger.debug("🔄 使用Edge TTS生成语音，说话人: %s", self.tts_voice)
+        start = time.perf_counter()
+        audio = self._run_cancellable(synthesize_edge_tts(text, self.tts_voice, self.tts_rate), token)
+        TTS_SYNTHESIS_SECONDS.observe(time.perf_counter() - start, backend="edge")
+        if not audio:
+            logger.warning("⚠️ Edge TTS未返回音频数据")
+            return None
+        self.audio_cache.put(key, audio)
+        return key
+    
+    @staticmethod
+    def _run_cancellable(coro, token=None):
+        """运行协程，取消令牌被触发时立即取消协程
+        
+        Args:
+            coro: 协程
+            token: 取消令牌（可选）
+            
+        Returns:
+            object: 协程的返回值
+            
+        Raises:
+            SpeechCancelled: 运行过程中被取消
+        """
+        if token is None:
+            return asyncio.run(coro)
+        
+        async def run_with_token():
+            task = asyncio.ensure_future(coro)
+            while not task.done():
+                if token.cancelled:
+                    task.cancel()
+                    break
+                await asyncio.wait({task}, timeout=0.05)
+            return await task
+        
+        try:
+            return asyncio.run(run_with_token())
+        except asyncio.CancelledError:
+            raise SpeechCancelled(token.reason)
+    
+    def _ensure_mixer(self):
+        """初始化 pygame 混音器（只初始化一次）
+        
+        Returns:
+            bool: 混音器是否可用
+        """
+        if self._mixer_ready is not None:
+            return self._mixer_ready
+        with self._mixer_lock:
+            if self._mixer_ready is None:
+                if not pygame_available:
+                    self._mixer_ready = False
+                else:
+                    try:
+                        if not pygame.mixer.get_init():
+                            pygame.mixer.init(frequency=MIXER_FREQUENCY, size=-16, channels=1)
+                        self._mixer_ready = True
+                    except Exception as e:
+                        logger.warning("⚠️ pygame 混音器初始化失败: %s", e)
+                        self._mixer_ready = False
+        return self._mixer_ready
+    
+    @staticmethod
+    def _decode_sound(data):
+        """将音频数据（MP3或WAV）解码为 pygame Sound 对象
+        
+        Args:
+            data: 音频数据
+            
+        Returns:
+            pygame.mixer.Sound: 音频对象
+        """
+        return pygame.mixer.Sound(file=io.BytesIO(data))
+    
+    def _play_cached_audio(self, key, text, token=None, cache=None):
+        """播放缓存中的语音并等待播放完成
+        
+        Args:
+            key: 缓存键
+            text: 文本（用于估计系统播放器的播放时长）
+            token: 取消令牌（可选），取消时立即停止播放
+            cache: 语音所在的缓存（默认为Edge TTS语音缓存）
+            
+        Returns:
+            bool: 是否成功播放
+            
+        Raises:
+            SpeechCancelled: 播放过程中被取消
+        """
+        cache = cache or self.audio_cache
+        if self._ensure_mixer():
+            try:
+                sound = cache.get_decoded(key, self._decode_sound)
+                if sound is None:
+                    return False
+                if token is not None:
+                    token.check_cancelled()
+                channel = sound.play()
+                if token is not None:
+                    token.mark_first_audio()
+                if channel is not None:
+                    self._wait_playback(channel.get_busy, channel.stop, token)
+                return True
+            except SpeechCancelled:
+                raise
+            except Exception as pygame_e:
+                logger.warning("⚠️ pygame Sound 播放失败，改用 music 流式播放: %s", pygame_e)
+                try:
+                    pygame.mixer.music.load(io.BytesIO(cache.get_bytes(key)), cache.extension)
+                    pygame.mixer.music.play()
+                    if token is not None:
+                        token.mark_first_audio()
+                    self._wait_playback(pygame.mixer.music.get_busy, pygame.mixer.music.stop, token)
+                    return True
+                except SpeechCancelled:
+                    raise
+                except Exception as music_e:
+                    logger.warning("⚠️ pygame 播放失败: %s", music_e)
+
+        # 回退到系统播放器，直接播放缓存文件（外部播放器无法中途停止，只能提前结束等待）
+        if os.name == 'nt':
+            os.startfile(cache.path_for(key))
+            logger.debug("✅ 系统播放器已启动")
+            if token is not None:
+                token.mark_first_audio()
+            # 等待播放完成
+            estimated_end = time.monotonic() + len(text) / 5 + 2
+            self._wait_playback(lambda: time.monotonic() < estimated_end, lambda: None, token)
+            return True
+        return False
+    
+    @staticmethod
+    def _wait_playback(is_busy, stop, token=None, poll_interval=0.02):
+        """等待播放结束，期间取消令牌被触发时停止播放
+        
+        Args:
+            is_busy: 返回是否仍在播放的函数
+            stop: 停止播放的函数
+            token: 取消令牌（可选）
+            poll_interval: 检查间隔（秒）
+            
+        Raises:
+            SpeechCancelled: 播放过程中被取消
+        """
+        while is_busy():
+            if token is not None and token.cancelled:
+                stop()
+                token.check_cancelled()
+            time.sleep(poll_interval)
     
     def give_gaze_feedback(self, urgent=True):
         """提供视线反馈
@@ -353,11 +1267,11 @@ class VoiceFeedback:
             urgent: 是否为紧急提示
             
         Returns:
-            bool: 是否成功播放语音
+            SpeechRequest: 语音请求句柄
         """
         # 随机选择一个反馈语
         feedback = random.choice(self.gaze_feedback)
-        return self.speak(feedback, urgent=urgent)
+        return self.speak(feedback, urgent=urgent, category="gaze")
     
     def give_pose_feedback(self, pose_type, urgent=True):
         """提供姿态反馈
@@ -367,11 +1281,11 @@ class VoiceFeedback:
             urgent: 是否为紧急提示
             
         Returns:
-            bool: 是否成功播放语音
+            SpeechRequest: 语音请求句柄
         """
         # 获取对应的反馈语
         feedback = self.pose_feedback.get(pose_type, "请保持正确姿势")
-        return self.speak(feedback, urgent=urgent)
+        return self.speak(feedback, urgent=urgent, category="pose")
     
     def give_gesture_feedback(self, gesture_type, urgent=True):
         """提供手势反馈
@@ -381,11 +1295,11 @@ class VoiceFeedback:
             urgent: 是否为紧急提示
             
         Returns:
-            bool: 是否成功播放语音
+            SpeechRequest: 语音请求句柄
         """
         # 获取对应的反馈语
         feedback = self.gesture_feedback.get(gesture_type, "请避免不必要的小动作")
-        return self.speak(feedback, urgent=urgent)
+        return self.speak(feedback, urgent=urgent, category="gesture")
     
     def give_encouragement(self, urgent=False):
         """提供鼓励反馈
@@ -394,11 +1308,11 @@ class VoiceFeedback:
             urgent: 是否为紧急提示
             
         Returns:
-            bool: 是否成功播放语音
+            SpeechRequest: 语音请求句柄
         """
         # 随机选择一个鼓励语
         feedback = random.choice(self.encouragement_feedback)
-        return self.speak(feedback, urgent=urgent)
+        return self.speak(feedback, urgent=urgent, category="encouragement")
     
     def start_session(self, position="Python开发工程师"):
         """开始会话的欢迎语
@@ -407,25 +1321,27 @@ class VoiceFeedback:
             position: 面试岗位
             
         Returns:
-            bool: 是否成功播放语音
+            SpeechRequest: 语音请求句柄
         """
-        return self.speak(f"{position}面试练习开始，请保持专业姿态", urgent=False, cooldown=0)
+        return self.speak(f"{position}面试练习开始，请保持专业姿态", cooldown=0, category="session", priority=PRIORITY_QUESTION)
     
     def end_session(self):
         """结束会话的结束语
         
         Returns:
-            bool: 是否成功播放语音
+            SpeechRequest: 语音请求句柄
         """
-        return self.speak("面试练习结束，感谢您的使用", urgent=False)
+        # 会话结束后不再有作答超时提示和定期鼓励
+        self.cancel_timers()
+        return self.speak("面试练习结束，感谢您的使用", cooldown=0, category="session", priority=PRIORITY_QUESTION)
     
     def test_voice(self):
         """测试语音功能
         
         Returns:
-            bool: 是否成功播放语音
+            SpeechRequest: 语音请求句柄
         """
-        return self.speak("这是语音测试，系统工作正常", urgent=False)
+        return self.speak("这是语音测试，系统工作正常", cooldown=0, category="test")
     
     def get_feedback_count(self, time_window=300):
         """获取指定时间窗口内的反馈次数
@@ -462,7 +1378,7 @@ class VoiceFeedback:
         if urgent is not None:
             self.urgent_cooldown = urgent
         
-        print(f"语音冷却时间已更新: 默认{self.default_cooldown}秒, 紧急{self.urgent_cooldown}秒")
+        logger.info("语音冷却时间已更新: 默认%s秒, 紧急%s秒", self.default_cooldown, self.urgent_cooldown)
     
     def get_latest_feedback(self):
         """获取最新的反馈内容